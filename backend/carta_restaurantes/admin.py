@@ -3,6 +3,7 @@ from django.http import HttpResponseRedirect
 from django.urls import reverse
 from adminsortable2.admin import SortableAdminMixin
 from .models import Restaurante, Categoria, Subcategoria, Comida
+from .cambios import registrar_cambios
 
 # Helper function para obtener el restaurante del usuario
 def get_user_restaurant(user):
@@ -52,6 +53,14 @@ class MultiTenantAdminMixin:
         
         return form
 
+# Mixin para avisar cambios en el reordenamiento drag & drop
+class SortableCambiosMixin:
+    def _update_order(self, updated_items, extra_model_filters):
+        """adminsortable2 reordena con bulk_update(), que no dispara señales"""
+        num_updated = super()._update_order(updated_items, extra_model_filters)
+        registrar_cambios(self.model, [item[0] for item in updated_items])
+        return num_updated
+
 @admin.register(Restaurante)
 class RestauranteAdmin(admin.ModelAdmin):
     list_display = ['nombre', 'slug', 'propietario', 'activo', 'fecha_creacion']
@@ -79,7 +88,7 @@ class RestauranteAdmin(admin.ModelAdmin):
         return request.user.is_superuser
 
 @admin.register(Categoria)
-class CategoriaAdmin(MultiTenantAdminMixin, SortableAdminMixin, admin.ModelAdmin):
+class CategoriaAdmin(MultiTenantAdminMixin, SortableCambiosMixin, SortableAdminMixin, admin.ModelAdmin):
     list_display = ['nombre', 'imagen', 'restaurante', 'orden']
     list_display_links = ['nombre']
     search_fields = ['nombre']
@@ -105,7 +114,7 @@ class CategoriaAdmin(MultiTenantAdminMixin, SortableAdminMixin, admin.ModelAdmin
         return []
 
 @admin.register(Subcategoria)
-class SubcategoriaAdmin(MultiTenantAdminMixin, SortableAdminMixin, admin.ModelAdmin):
+class SubcategoriaAdmin(MultiTenantAdminMixin, SortableCambiosMixin, SortableAdminMixin, admin.ModelAdmin):
     list_display = ['nombre', 'categoria', 'restaurante', 'orden']
     list_display_links = ['nombre']
     list_filter = ['categoria', 'restaurante']
@@ -6,26 +6,74 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db import transaction
+from django.db.models import Prefetch
 from .models import Categoria, Subcategoria, Comida
 from.serializers import CategoriaSerializer, SubcategoriaSerializer, ComidaSerializer
 from .admin_helpers import get_user_restaurant
+from .cambios import registrar_cambios
+from .pagination import ComidaCursorPagination
+from .campos import CamposMixin
+from . import serializacion_rapida
+
+
+# Querysets preparados para los serializers: sin N+1 sin importar el tamaño del menú.
+# - CategoriaSerializer anida subcategorías (el Prefetch por FK inversa ya deja
+#   cacheada subcategoria.categoria para categoria_nombre)
+# - SubcategoriaSerializer lee categoria.nombre
+# - ComidaSerializer lee categoria.nombre y subcategoria.nombre
+
+def categorias_qs(con_subcategorias=True):
+    if not con_subcategorias:
+        return Categoria.objects.all()
+    return Categoria.objects.prefetch_related(
+        # categoria primero para usar el índice (categoria, orden, nombre); por categoría queda (orden, nombre)
+        Prefetch('subcategorias', queryset=Subcategoria.objects.order_by('categoria_id', 'orden', 'nombre'))
+    )
+
+
+def subcategorias_qs():
+    return Subcategoria.objects.select_related('categoria')
+
+
+def comidas_qs():
+    return Comida.objects.select_related('categoria', 'subcategoria')
+
+
+# ?fields= / ?omit= en GET (ver campos.py)
+
+class CategoriaCamposMixin(CamposMixin):
+    campos_disponibles = serializacion_rapida.CAMPOS_CATEGORIA
+    columnas_por_campo = serializacion_rapida.COLUMNAS_CAMPO_CATEGORIA
+
+
+class SubcategoriaCamposMixin(CamposMixin):
+    campos_disponibles = serializacion_rapida.CAMPOS_SUBCATEGORIA
+    columnas_por_campo = serializacion_rapida.COLUMNAS_CAMPO_SUBCATEGORIA
+
+
+class ComidaCamposMixin(CamposMixin):
+    campos_disponibles = serializacion_rapida.CAMPOS_COMIDA
+    columnas_por_campo = serializacion_rapida.COLUMNAS_CAMPO_COMIDA
+    # El cursor de ComidaCursorPagination lee orden
+    columnas_siempre = ('orden',)
 
 
 # ============================================================================
 # CRUD - CATEGORÍAS
 # ============================================================================
 
-class AdminCategoriaList(generics.ListCreateAPIView):
+class AdminCategoriaList(CategoriaCamposMixin, generics.ListCreateAPIView):
     """Lista y creación de categorías con aislamiento multi-tenant."""
     serializer_class = CategoriaSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
         user_restaurant = get_user_restaurant(self.request.user)
+        categorias = categorias_qs(self.incluye('subcategorias'))
         if user_restaurant:
-            return Categoria.objects.filter(restaurante=user_restaurant).order_by('orden')
+            return categorias.filter(restaurante=user_restaurant).order_by('orden')
         elif self.request.user.is_superuser:
-            return Categoria.objects.all().order_by('orden')
+            return categorias.order_by('orden')
         else:
             return Categoria.objects.none()
     
@@ -42,17 +90,18 @@ class AdminCategoriaList(generics.ListCreateAPIView):
             raise PermissionError("Usuario sin restaurante asignado")
 
 
-class AdminCategoriaDetail(generics.RetrieveUpdateDestroyAPIView):
+class AdminCategoriaDetail(CategoriaCamposMixin, generics.RetrieveUpdateDestroyAPIView):
     """Detalle, actualización y eliminación de categorías."""
     serializer_class = CategoriaSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
         user_restaurant = get_user_restaurant(self.request.user)
+        categorias = categorias_qs(self.incluye('subcategorias'))
         if user_restaurant:
-            return Categoria.objects.filter(restaurante=user_restaurant)
+            return categorias.filter(restaurante=user_restaurant)
         elif self.request.user.is_superuser:
-            return Categoria.objects.all()
+            return categorias
         else:
             return Categoria.objects.none()
     
@@ -71,7 +120,7 @@ class AdminCategoriaDetail(generics.RetrieveUpdateDestroyAPIView):
 # CRUD - SUBCATEGORÍAS
 # ============================================================================
 
-class AdminSubcategoriaList(generics.ListCreateAPIView):
+class AdminSubcategoriaList(SubcategoriaCamposMixin, generics.ListCreateAPIView):
     """Lista y creación de subcategorías."""
     serializer_class = SubcategoriaSerializer
     permission_classes = [IsAuthenticated]
@@ -79,8 +128,8 @@ class AdminSubcategoriaList(generics.ListCreateAPIView):
     def get_queryset(self):
         categoria_id = self.kwargs.get('categoria_id')
         if categoria_id:
-            return Subcategoria.objects.filter(categoria_id=categoria_id).order_by('orden')
-        return Subcategoria.objects.all().order_by('categoria__orden', 'orden')
+            return subcategorias_qs().filter(categoria_id=categoria_id).order_by('orden')
+        return subcategorias_qs().order_by('categoria__orden', 'orden')
     
     def perform_create(self, serializer):
         if not self.request.user.is_staff:
@@ -88,9 +137,9 @@ class AdminSubcategoriaList(generics.ListCreateAPIView):
         serializer.save()
 
 
-class AdminSubcategoriaDetail(generics.RetrieveUpdateDestroyAPIView):
+class AdminSubcategoriaDetail(SubcategoriaCamposMixin, generics.RetrieveUpdateDestroyAPIView):
     """Detalle, actualización y eliminación de subcategorías."""
-    queryset = Subcategoria.objects.all()
+    queryset = subcategorias_qs()
     serializer_class = SubcategoriaSerializer
     permission_classes = [IsAuthenticated]
     
@@ -109,20 +158,26 @@ class AdminSubcategoriaDetail(generics.RetrieveUpdateDestroyAPIView):
 # CRUD - COMIDAS
 # ============================================================================
 
-class AdminComidaList(generics.ListCreateAPIView):
-    """Lista y creación de comidas."""
+class AdminComidaList(ComidaCamposMixin, generics.ListCreateAPIView):
+    """
+    Lista y creación de comidas.
+
+    Con ?page_size= o ?cursor= pagina por cursor (ver pagination.py); útil para
+    el listado global del superadmin.
+    """
     serializer_class = ComidaSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ComidaCursorPagination
     
     def get_queryset(self):
         subcategoria_id = self.kwargs.get('subcategoria_id')
         categoria_id = self.kwargs.get('categoria_id')
         
         if subcategoria_id:
-            return Comida.objects.filter(subcategoria_id=subcategoria_id).order_by('orden')
+            return comidas_qs().filter(subcategoria_id=subcategoria_id).order_by('orden', 'id')
         elif categoria_id:
-            return Comida.objects.filter(categoria_id=categoria_id).order_by('orden')
-        return Comida.objects.all().order_by('orden')
+            return comidas_qs().filter(categoria_id=categoria_id).order_by('orden', 'id')
+        return comidas_qs().order_by('orden', 'id')
     
     def perform_create(self, serializer):
         if not self.request.user.is_staff:
@@ -130,9 +185,9 @@ class AdminComidaList(generics.ListCreateAPIView):
         serializer.save()
 
 
-class AdminComidaDetail(generics.RetrieveUpdateDestroyAPIView):
+class AdminComidaDetail(ComidaCamposMixin, generics.RetrieveUpdateDestroyAPIView):
     """Detalle, actualización y eliminación de comidas."""
-    queryset = Comida.objects.all()
+    queryset = comidas_qs()
     serializer_class = ComidaSerializer
     permission_classes = [IsAuthenticated]
     
@@ -168,6 +223,9 @@ def update_categoria_orden(request):
                 nuevo_orden = item.get('orden')
                 if categoria_id and nuevo_orden is not None:
                     Categoria.objects.filter(id=categoria_id).update(orden=nuevo_orden)
+            
+            # update() no dispara señales: avisar del cambio explícitamente
+            registrar_cambios(Categoria, [item.get('id') for item in categoria_orders])
         
         return Response({'message': 'Orden actualizado correctamente'})
     except Exception as e:
@@ -191,6 +249,9 @@ def update_subcategoria_orden(request):
                 nuevo_orden = item.get('orden')
                 if subcategoria_id and nuevo_orden is not None:
                     Subcategoria.objects.filter(id=subcategoria_id).update(orden=nuevo_orden)
+            
+            # update() no dispara señales: avisar del cambio explícitamente
+            registrar_cambios(Subcategoria, [item.get('id') for item in subcategoria_orders])
         
         return Response({'message': 'Orden actualizado correctamente'})
     except Exception as e:
@@ -214,6 +275,9 @@ def update_comida_orden(request):
                 nuevo_orden = item.get('orden')
                 if comida_id and nuevo_orden is not None:
                     Comida.objects.filter(id=comida_id).update(orden=nuevo_orden)
+            
+            # update() no dispara señales: avisar del cambio explícitamente
+            registrar_cambios(Comida, [item.get('id') for item in comida_orders])
         
         return Response({'message': 'Orden actualizado correctamente'})
     except Exception as e:
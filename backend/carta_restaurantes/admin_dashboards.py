@@ -1,13 +1,140 @@
 """
 Admin Dashboards - Vistas de dashboard para diferentes tipos de usuarios
 """
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Prefetch, Q, prefetch_related_objects
+from django.utils.text import slugify
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
-from .models import Categoria, Subcategoria, Comida, Restaurante
+from .models import Categoria, Restaurante
 from .admin_helpers import get_user_restaurant
+from .normalizacion import normalizar
+from .pagination import RestauranteCursorPagination
+from . import cache_por_restaurante, estadisticas
+
+
+# Mayor que cualquier carácter: `campo >= p AND campo < p + FIN_DE_PREFIJO` son los que empiezan con p
+FIN_DE_PREFIJO = '\U0010ffff'
+
+
+def estadisticas_restaurante(restaurante_id):
+    """Cantidad de categorías, subcategorías y comidas del restaurante (ver estadisticas.py)."""
+    return estadisticas.como_dict(estadisticas.leer(restaurante_id))
+
+
+def _prefijo(campo, prefijo):
+    # Rango y no startswith: en SQLite LIKE no usa índices y recorre la tabla entera
+    return Q(**{f'{campo}__gte': prefijo, f'{campo}__lt': prefijo + FIN_DE_PREFIJO})
+
+
+def buscar_restaurantes(restaurantes, texto):
+    """
+    Restaurantes cuyo nombre (sin acentos ni mayúsculas), slug o usuario del
+    propietario empiezan con `texto`. Cada condición es un rango de un índice:
+    texto_busqueda, el slug único y el username único de auth_user.
+    """
+    propietarios = User.objects.filter(_prefijo('username', texto)).values('pk')
+    condiciones = Q(propietario__in=propietarios)
+    if normalizar(texto):
+        condiciones |= _prefijo('texto_busqueda', normalizar(texto))
+    if slugify(texto):
+        condiciones |= _prefijo('slug', slugify(texto))
+    return restaurantes.filter(condiciones)
+
+
+def estadisticas_globales():
+    """
+    Totales de todos los restaurantes (una query por tabla, sin recorrerlos en
+    Python), guardados en el cache DASHBOARD_TOTALES_SEGUNDOS: cada página
+    del directorio los muestra sin volver a sumar la tabla entera.
+    """
+    def calcular():
+        contadores = estadisticas.totales()
+        return {
+            'total_restaurantes': Restaurante.objects.count(),
+            'total_categorias': contadores.categorias,
+            'total_subcategorias': contadores.subcategorias,
+            'total_comidas': contadores.comidas,
+        }
+    return cache.get_or_set('dashboard:estadisticas_globales', calcular, settings.DASHBOARD_TOTALES_SEGUNDOS)
+
+
+def pagina_de_restaurantes(request):
+    """
+    Una página del directorio de restaurantes, con propietario y contadores en
+    la misma query: ?q= (búsqueda por prefijo), ?orden=, ?page_size= y ?cursor=
+    (ver RestauranteCursorPagination).
+
+    Returns:
+        (restaurantes de la página, paginador)
+    """
+    restaurantes = Restaurante.objects.select_related('propietario', 'estadisticas_menu')
+    texto = request.query_params.get('q', '').strip()
+    if texto:
+        restaurantes = buscar_restaurantes(restaurantes, texto)
+
+    paginador = RestauranteCursorPagination()
+    pagina = paginador.paginate_queryset(restaurantes, request)
+    # Sin contadores (creados con bulk_create o loaddata): se calculan los de esta
+    # página sin guardarlos; los crea reconciliar_estadisticas, no un GET
+    faltantes = [restaurante.id for restaurante in pagina if not hasattr(restaurante, 'estadisticas_menu')]
+    if faltantes:
+        contadores = estadisticas.calcular(faltantes)
+        for restaurante in pagina:
+            if restaurante.id in contadores:
+                restaurante.estadisticas_menu = contadores[restaurante.id]
+    return pagina, paginador
+
+
+def paginacion(request, paginador):
+    """Datos para pedir la página siguiente del directorio (ver pagina_de_restaurantes)."""
+    return {
+        'q': request.query_params.get('q', '').strip(),
+        'orden': paginador.orden,
+        'page_size': paginador.page_size_actual,
+        'siguiente': paginador.get_next_link(),
+    }
+
+
+def dashboard_superadmin(request, usuario):
+    """
+    Respuesta del dashboard global del superadmin (admin_dashboard y
+    test_dashboard): los totales y una página del directorio de restaurantes.
+    """
+    pagina, paginador = pagina_de_restaurantes(request)
+    restaurantes_data = [
+        {
+            'id': restaurante.id,
+            'nombre': restaurante.nombre,
+            'slug': restaurante.slug,
+            'descripcion': restaurante.descripcion,
+            'propietario': restaurante.propietario.username,
+            'fecha_creacion': restaurante.fecha_creacion,
+            'estadisticas': estadisticas.como_dict(restaurante.estadisticas_menu),
+            'carta_virtual_url': f'https://cartas-para-negocios.vercel.app/?restaurante={restaurante.slug}',
+            'admin_url': f'/api/admin/restaurantes/{restaurante.id}/'
+        }
+        for restaurante in pagina
+    ]
+
+    return {
+        'usuario': usuario.username,
+        'tipo': 'Super Admin',
+        'restaurantes': restaurantes_data,
+        'paginacion': paginacion(request, paginador),
+        'estadisticas_globales': estadisticas_globales(),
+        'mensaje': 'Dashboard Super Admin - Todos los restaurantes',
+        'urls_disponibles': {
+            'categorias': '/api/admin/categorias/',
+            'subcategorias': '/api/admin/subcategorias/',
+            'comidas': '/api/admin/comidas/'
+        }
+    }
 
 
 @api_view(['GET'])
@@ -17,26 +144,19 @@ def admin_dashboard(request):
     Dashboard principal para usuarios autenticados.
     
     - Propietarios: Ven solo su restaurante y sus estadísticas
-    - Superadmin: Ve todos los restaurantes con estadísticas globales
+    - Superadmin: Ve las estadísticas globales y el directorio de restaurantes,
+      paginado (?cursor=, ?page_size=), ordenado (?orden=nombre|fecha|comidas,
+      con "-" descendente) y con búsqueda por prefijo (?q=)
     """
     user_restaurant = get_user_restaurant(request.user)
     
     if user_restaurant:
         # Usuario propietario de restaurante
-        categorias = Categoria.objects.filter(restaurante=user_restaurant).count()
-        categorias_del_restaurante = Categoria.objects.filter(restaurante=user_restaurant)
-        subcategorias = Subcategoria.objects.filter(categoria__in=categorias_del_restaurante).count()
-        comidas = Comida.objects.filter(restaurante=user_restaurant).count()
-        
         return Response({
             'usuario': request.user.username,
             'restaurante': user_restaurant.nombre,
             'slug': user_restaurant.slug,
-            'estadisticas': {
-                'categorias': categorias,
-                'subcategorias': subcategorias,
-                'comidas': comidas
-            },
+            'estadisticas': estadisticas_restaurante(user_restaurant.id),
             'mensaje': f'Bienvenido a {user_restaurant.nombre}! Solo ves datos de tu restaurante.',
             'urls_disponibles': {
                 'categorias': '/api/admin/categorias/',
@@ -47,55 +167,7 @@ def admin_dashboard(request):
         
     elif request.user.is_superuser:
         # Superuser: dashboard global
-        restaurantes = Restaurante.objects.all()
-        
-        restaurantes_data = []
-        total_categorias = 0
-        total_subcategorias = 0
-        total_comidas = 0
-        
-        for restaurante in restaurantes:
-            categorias_count = Categoria.objects.filter(restaurante=restaurante).count()
-            categorias_del_restaurante = Categoria.objects.filter(restaurante=restaurante)
-            subcategorias_count = Subcategoria.objects.filter(categoria__in=categorias_del_restaurante).count()
-            comidas_count = Comida.objects.filter(restaurante=restaurante).count()
-            
-            total_categorias += categorias_count
-            total_subcategorias += subcategorias_count
-            total_comidas += comidas_count
-            
-            restaurantes_data.append({
-                'id': restaurante.id,
-                'nombre': restaurante.nombre,
-                'slug': restaurante.slug,
-                'descripcion': restaurante.descripcion,
-                'propietario': restaurante.propietario.username,
-                'estadisticas': {
-                    'categorias': categorias_count,
-                    'subcategorias': subcategorias_count,
-                    'comidas': comidas_count
-                },
-                'carta_virtual_url': f'https://cartas-para-negocios.vercel.app/?restaurante={restaurante.slug}',
-                'admin_url': f'/api/admin/restaurantes/{restaurante.id}/'
-            })
-        
-        return Response({
-            'usuario': request.user.username,
-            'tipo': 'Super Admin',
-            'restaurantes': restaurantes_data,
-            'estadisticas_globales': {
-                'total_restaurantes': len(restaurantes_data),
-                'total_categorias': total_categorias,
-                'total_subcategorias': total_subcategorias,
-                'total_comidas': total_comidas
-            },
-            'mensaje': 'Dashboard Super Admin - Todos los restaurantes',
-            'urls_disponibles': {
-                'categorias': '/api/admin/categorias/',
-                'subcategorias': '/api/admin/subcategorias/',
-                'comidas': '/api/admin/comidas/'
-            }
-        })
+        return Response(dashboard_superadmin(request, request.user))
     else:
         return Response({
             'usuario': request.user.username,
@@ -106,30 +178,36 @@ def admin_dashboard(request):
 
 @api_view(['GET'])
 def simple_dashboard(request):
-    """Vista simple sin autenticación para testing rápido."""
-    restaurantes = Restaurante.objects.all()
+    """
+    Vista simple sin autenticación para testing rápido: una página del
+    directorio de restaurantes (mismos parámetros que el del superadmin, ver
+    pagina_de_restaurantes) con sus 3 primeras categorías.
+    """
+    restaurantes, paginador = pagina_de_restaurantes(request)
+    # Las 3 primeras categorías de los restaurantes de la página en una query (ventana por restaurante)
+    prefetch_related_objects(restaurantes, Prefetch(
+        'categorias', queryset=Categoria.objects.order_by('orden')[:3], to_attr='primeras_categorias'
+    ))
     
     data = {
         'message': '¡Sistema SaaS Multi-Tenant funcionando! 🎉',
-        'total_restaurantes': restaurantes.count(),
+        'total_restaurantes': estadisticas_globales()['total_restaurantes'],
+        'paginacion': paginacion(request, paginador),
         'restaurantes': []
     }
     
     for restaurant in restaurantes:
-        categorias = Categoria.objects.filter(restaurante=restaurant)
-        comidas = Comida.objects.filter(restaurante=restaurant)
-        
         data['restaurantes'].append({
             'nombre': restaurant.nombre,
             'slug': restaurant.slug,
             'propietario': restaurant.propietario.username,
             'stats': {
-                'categorias': categorias.count(),
-                'comidas': comidas.count()
+                'categorias': restaurant.estadisticas_menu.categorias,
+                'comidas': restaurant.estadisticas_menu.comidas
             },
             'categorias': [
                 {'nombre': cat.nombre, 'orden': cat.orden}
-                for cat in categorias.order_by('orden')[:3]
+                for cat in restaurant.primeras_categorias
             ]
         })
     
@@ -158,20 +236,11 @@ def test_dashboard(request):
         user_restaurant = get_user_restaurant(user)
         
         if user_restaurant:
-            categorias = Categoria.objects.filter(restaurante=user_restaurant).count()
-            categorias_del_restaurante = Categoria.objects.filter(restaurante=user_restaurant)
-            subcategorias = Subcategoria.objects.filter(categoria__in=categorias_del_restaurante).count()
-            comidas = Comida.objects.filter(restaurante=user_restaurant).count()
-            
             return Response({
                 'usuario': user.username,
                 'restaurante': user_restaurant.nombre,
                 'slug': user_restaurant.slug,
-                'estadisticas': {
-                    'categorias': categorias,
-                    'subcategorias': subcategorias,
-                    'comidas': comidas
-                },
+                'estadisticas': estadisticas_restaurante(user_restaurant.id),
                 'mensaje': f'Tenant isolation funcionando! Solo ves datos de {user_restaurant.nombre}.',
                 'urls_disponibles': {
                     'categorias': '/api/admin/categorias/',
@@ -181,55 +250,7 @@ def test_dashboard(request):
             })
             
         elif user.is_superuser:
-            restaurantes = Restaurante.objects.all()
-            
-            restaurantes_data = []
-            total_categorias = 0
-            total_subcategorias = 0
-            total_comidas = 0
-            
-            for restaurante in restaurantes:
-                categorias_count = Categoria.objects.filter(restaurante=restaurante).count()
-                categorias_del_restaurante = Categoria.objects.filter(restaurante=restaurante)
-                subcategorias_count = Subcategoria.objects.filter(categoria__in=categorias_del_restaurante).count()
-                comidas_count = Comida.objects.filter(restaurante=restaurante).count()
-                
-                total_categorias += categorias_count
-                total_subcategorias += subcategorias_count
-                total_comidas += comidas_count
-                
-                restaurantes_data.append({
-                    'id': restaurante.id,
-                    'nombre': restaurante.nombre,
-                    'slug': restaurante.slug,
-                    'descripcion': restaurante.descripcion,
-                    'propietario': restaurante.propietario.username,
-                    'estadisticas': {
-                        'categorias': categorias_count,
-                        'subcategorias': subcategorias_count,
-                        'comidas': comidas_count
-                    },
-                    'carta_virtual_url': f'https://cartas-para-negocios.vercel.app/?restaurante={restaurante.slug}',
-                    'admin_url': f'/api/admin/restaurantes/{restaurante.id}/'
-                })
-            
-            return Response({
-                'usuario': user.username,
-                'tipo': 'Super Admin',
-                'restaurantes': restaurantes_data,
-                'estadisticas_globales': {
-                    'total_restaurantes': len(restaurantes_data),
-                    'total_categorias': total_categorias,
-                    'total_subcategorias': total_subcategorias,
-                    'total_comidas': total_comidas
-                },
-                'mensaje': 'Dashboard Super Admin - Todos los restaurantes',
-                'urls_disponibles': {
-                    'categorias': '/api/admin/categorias/',
-                    'subcategorias': '/api/admin/subcategorias/',
-                    'comidas': '/api/admin/comidas/'
-                }
-            })
+            return Response(dashboard_superadmin(request, user))
         else:
             return Response({
                 'usuario': user.username,
@@ -242,3 +263,51 @@ def test_dashboard(request):
             'error': 'Token inválido',
             'help': 'Haz login primero para obtener un token válido'
         }, status=401)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def estadisticas_cache(request):
+    """Aciertos y fallos del cache por restaurante, sumados entre workers (solo superadmin)."""
+    if not request.user.is_superuser:
+        return Response({'error': 'Solo para superadmin'}, status=status.HTTP_403_FORBIDDEN)
+    return Response(cache_por_restaurante.estadisticas())
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def estadisticas_dashboard(request):
+    """
+    Contadores del dashboard (los pide static/admin/script.js cada 30 segundos).
+
+    - Propietarios: los de su restaurante, una lectura por clave primaria
+    - Superadmin: los de ?restaurante=<id>, o la suma de todos
+    """
+    user_restaurant = get_user_restaurant(request.user)
+    restaurante_id = request.GET.get('restaurante')
+
+    if user_restaurant:
+        contadores = estadisticas.leer(user_restaurant.id)
+    elif request.user.is_superuser and restaurante_id:
+        if not restaurante_id.isdigit():
+            return Response({'error': 'restaurante debe ser un id'}, status=status.HTTP_400_BAD_REQUEST)
+        contadores = estadisticas.leer(int(restaurante_id))
+        if contadores is None:
+            return Response({'error': 'Restaurante no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+    elif request.user.is_superuser:
+        contadores = estadisticas.totales()
+    else:
+        return Response({
+            'error': 'Usuario sin restaurante asignado',
+            'mensaje': 'Contacta al administrador para asignar un restaurante'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    return Response({
+        'stats': {
+            'total_categorias': contadores.categorias,
+            'total_subcategorias': contadores.subcategorias,
+            'total_comidas': contadores.comidas,
+            'promedio_precio': contadores.promedio_precio,
+        },
+        'actualizado': contadores.actualizado,
+    })
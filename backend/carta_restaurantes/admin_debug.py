@@ -9,6 +9,7 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 from .models import Categoria, Subcategoria, Comida, Restaurante
 from .admin_helpers import get_user_restaurant
+from . import estadisticas
 
 
 @api_view(['GET'])
@@ -144,19 +145,12 @@ def debug_current_user(request):
         stats_info = {}
         if user_restaurant:
             stats_info = {
-                'categorias': Categoria.objects.filter(restaurante=user_restaurant).count(),
-                'subcategorias': Subcategoria.objects.filter(restaurante=user_restaurant).count(),
-                'comidas': Comida.objects.filter(restaurante=user_restaurant).count(),
+                **estadisticas.como_dict(estadisticas.leer(user_restaurant.id)),
                 'tipo_vista': 'Propietario de Restaurante - Solo su restaurante'
             }
         elif user.is_superuser:
-            total_categorias = Categoria.objects.count()
-            total_subcategorias = Subcategoria.objects.count()
-            total_comidas = Comida.objects.count()
             stats_info = {
-                'categorias': total_categorias,
-                'subcategorias': total_subcategorias, 
-                'comidas': total_comidas,
+                **estadisticas.como_dict(estadisticas.totales()),
                 'tipo_vista': 'Super Admin - Todos los restaurantes (ESTADÍSTICAS GLOBALES)'
             }
         
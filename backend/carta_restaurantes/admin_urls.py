@@ -7,6 +7,8 @@ urlpatterns = [
     path('', admin_views.admin_dashboard, name='admin_dashboard'),
     path('simple/', admin_views.simple_dashboard, name='simple_dashboard'),  # Nueva vista sin auth
     path('test/', admin_views.test_dashboard, name='test_dashboard'),  # Vista con token por URL
+    path('dashboard/stats/', admin_views.estadisticas_dashboard, name='estadisticas_dashboard'),  # Contadores (static/admin/script.js)
+    path('cache/', admin_views.estadisticas_cache, name='estadisticas_cache'),  # Aciertos/fallos del cache
     
     # Autenticación
     path('auth/login/', admin_views.admin_login, name='admin_login'),
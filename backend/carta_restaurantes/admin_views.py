@@ -7,7 +7,7 @@ ARCHIVO DE COMPATIBILIDAD - Re-exporta vistas desde módulos organizados:
 Estructura modular:
 - admin_helpers.py      → Funciones auxiliares (get_user_restaurant)
 - admin_auth.py         → Autenticación (admin_login, verify_token)
-- admin_dashboards.py   → Dashboards (admin_dashboard, simple_dashboard, test_dashboard)
+- admin_dashboards.py   → Dashboards (admin_dashboard, simple_dashboard, test_dashboard, estadisticas_dashboard, estadisticas_cache)
 - admin_crud.py         → CRUD (AdminCategoria*, AdminSubcategoria*, AdminComida*, update_*_orden)
 - admin_debug.py        → Debug endpoints (setup_test_users, debug_*)
 
@@ -27,7 +27,9 @@ from .admin_auth import (
 from .admin_dashboards import (
     admin_dashboard,
     simple_dashboard,
-    test_dashboard
+    test_dashboard,
+    estadisticas_dashboard,
+    estadisticas_cache
 )
 
 # CRUD
@@ -62,6 +64,8 @@ __all__ = [
     'admin_dashboard',
     'simple_dashboard',
     'test_dashboard',
+    'estadisticas_dashboard',
+    'estadisticas_cache',
     # CRUD - Categorías
     'AdminCategoriaList',
     'AdminCategoriaDetail',
@@ -1,9 +1,28 @@
+from django.conf import settings
 from django.urls import path
 from . import views
+from .replicas import en_replica
+
+
+def publica(vista):
+    """
+    Vista pública con snapshot: su versión async con VISTAS_ASYNC (toda la
+    API bajo ASGI, ver settings.py), la DRF si no. Lee de las réplicas, si
+    hay (ver replicas.py).
+    """
+    if settings.VISTAS_ASYNC:
+        return en_replica(views.SnapshotAsync.as_view(vista=vista))
+    return en_replica(vista.as_view())
+
 
 urlpatterns = [
-    path('categorias/', views.CategoriaList.as_view()),
-    path('categorias/<int:categoria_id>/subcategorias/', views.SubcategoriaList.as_view()),
-    path('subcategorias/<int:subcategoria_id>/comidas/', views.ComidaPorSubcategoria.as_view()),
-    path('comidas/', views.ComidaList.as_view()),
+    path('categorias/', publica(views.CategoriaList)),
+    path('menu/', publica(views.MenuCompleto)),
+    path('menu/cambios/', en_replica(views.CambiosMenu.as_view())),
+    path('menu/eventos/', en_replica(views.EventosMenu.as_view())),
+    path('menus/', en_replica(views.MenusLoteAsync.as_view() if settings.VISTAS_ASYNC else views.MenusLote.as_view())),
+    path('categorias/<int:categoria_id>/subcategorias/', publica(views.SubcategoriaList)),
+    path('subcategorias/<int:subcategoria_id>/comidas/', publica(views.ComidaPorSubcategoria)),
+    path('comidas/', publica(views.ComidaList)),
+    path('buscar/', en_replica(views.BuscarComidas.as_view())),
 ]
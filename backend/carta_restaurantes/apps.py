@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class CartaRestaurantesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'carta_restaurantes'
+
+    def ready(self):
+        # Registrar señales que mantienen snapshots y datos derivados del menú
+        from . import signals  # noqa: F401
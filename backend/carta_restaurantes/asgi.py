@@ -1 +1,13 @@
-# ASGI placeholder
\ No newline at end of file
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'carta_restaurantes.settings')
+# Proceso eventos del Procfile: el proxy le manda solo /api/menu/eventos/, que necesita
+# ASGI. El resto de la API va por waitress (wsgi.py), que con un solo CPU atiende más
+# requests por segundo. Para servir toda la API con ASGI, VISTAS_ASYNC=True (settings.py)
+
+application = get_asgi_application()
+
+# Falla al arrancar si la base no responde (ver conexiones.py)
+from carta_restaurantes.conexiones import autotest  # noqa: E402
+autotest()
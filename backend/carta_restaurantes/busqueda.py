@@ -0,0 +1,304 @@
+"""
+Búsqueda - Búsqueda de comidas con índice de texto completo por restaurante
+
+IndiceBusqueda guarda, por comida disponible, su nombre y descripción junto
+con los nombres de su categoría y subcategoría, normalizados sin acentos ni
+mayúsculas (normalizacion.py). Al commitear cada cambio de menú (ver
+cambios.py) se actualizan solo las comidas afectadas (reindexar_cambios).
+
+Primero se buscan palabras: los términos por prefijo ("marg" encuentra
+"Margherita") y todos deben aparecer (AND). Si no hay ninguna coincidencia,
+se repite con la raíz de cada término, sin las dos últimas letras
+("milanesa napolitana" encuentra "Milanesa de carne napolitano"). Si
+tampoco, se buscan coincidencias aproximadas por trigramas ("muzarela"
+encuentra "Muzzarella"), que cuestan más: la comida tiene que contener la
+mayoría de los trigramas de la búsqueda (UMBRAL_SIMILITUD) y, si hay varios
+términos, una parte de los de cada uno (UMBRAL_TERMINO).
+
+Los índices dependen del motor:
+- SQLite: tablas virtuales FTS5 mantenidas por triggers sobre IndiceBusqueda
+  (migraciones 0014 y 0015), una de palabras y otra con tokenizer trigram.
+  El id del restaurante es una columna más de cada índice, así el filtro por
+  tenant también lo resuelve FTS5. Ranking con bm25(); los candidatos por
+  trigramas (a lo sumo CANDIDATOS_TRIGRAMAS, sin ordenar) se confirman y
+  ordenan con normalizacion.similitud().
+- PostgreSQL: índice GIN sobre el tsvector ponderado (nombre > categoría y
+  subcategoría > descripción) y GIN de pg_trgm sobre `texto`. Ranking con
+  ts_rank() y word_similarity().
+"""
+import itertools
+import math
+from django.db import connection, transaction
+from django.db.models import F
+from .models import Categoria, Comida, IndiceBusqueda, Restaurante, Subcategoria
+from .normalizacion import normalizar, similitud, trigramas
+
+
+TABLA = IndiceBusqueda._meta.db_table
+TABLA_FTS = f'{TABLA}_fts'
+TABLA_TRIGRAMAS = f'{TABLA}_trigramas'
+MAXIMO_TERMINOS = 8
+# Fracción de los trigramas de la búsqueda que tiene que contener una comida
+# (el umbral por defecto de word_similarity en pg_trgm)
+UMBRAL_SIMILITUD = 0.6
+# Con varios términos, fracción de los trigramas de cada uno: sin esto, en
+# "licuado de durasno" bastaría con "licuado" y los candidatos serían todos
+# los licuados. Más bajo que UMBRAL_SIMILITUD porque en una palabra corta un
+# error de tipeo se lleva la mitad de sus trigramas ("durasno": 2 de 5)
+UMBRAL_TERMINO = 0.4
+# Candidatos por trigramas que se confirman con similitud()
+CANDIDATOS_TRIGRAMAS = 500
+# Conectores que aparecen en casi todo el menú ("Licuado de durazno"): como
+# prefijo coinciden con medio índice y no aportan al ranking
+PALABRAS_VACIAS = {'a', 'al', 'con', 'de', 'del', 'e', 'el', 'en', 'la', 'las', 'lo', 'los', 'o', 'u', 'un', 'una', 'y'}
+
+# Raíz de un término para la segunda búsqueda por palabras: sin las últimas
+# letras (género y número: "napolitana", "napolitanos" → "napolita"), nunca
+# más corta que LARGO_MINIMO_RAIZ
+LETRAS_RAIZ = 2
+LARGO_MINIMO_RAIZ = 4
+
+# SQLite: pesos de bm25() por columna del FTS5 (restaurante, nombre, descripcion, categoria, subcategoria)
+_PESOS_FTS = (0.0, 10.0, 2.0, 5.0, 5.0)
+
+# PostgreSQL: la consulta tiene que usar exactamente la expresión indexada en 0014
+VECTOR_PG = (
+    "setweight(to_tsvector('spanish', nombre), 'A') || "
+    "setweight(to_tsvector('spanish', categoria || ' ' || subcategoria), 'B') || "
+    "setweight(to_tsvector('spanish', descripcion), 'C')"
+)
+
+
+def terminos(texto):
+    """
+    Palabras de la búsqueda, sin signos (nunca llegan a la sintaxis de FTS5 ni
+    de tsquery) ni conectores, salvo que la búsqueda sea solo conectores.
+    """
+    palabras = normalizar(texto).split()
+    significativas = [palabra for palabra in palabras if palabra not in PALABRAS_VACIAS]
+    return (significativas or palabras)[:MAXIMO_TERMINOS]
+
+
+def raiz(palabra):
+    """Prefijo de `palabra` que tolera otra terminación: 'napolitana' → 'napolita'."""
+    return palabra[:max(LARGO_MINIMO_RAIZ, len(palabra) - LETRAS_RAIZ)]
+
+
+def _crear_filas(restaurante_id, comidas):
+    """Agrega al índice las comidas disponibles de `comidas` (de un restaurante activo)."""
+    filas = (
+        comidas.filter(restaurante__activo=True, disponible=True)
+        .values_list('id', 'nombre', 'descripcion', 'texto_busqueda', 'categoria__texto_busqueda', 'subcategoria__texto_busqueda')
+    )
+    IndiceBusqueda.objects.bulk_create([
+        IndiceBusqueda(
+            comida_id=comida_id, restaurante_id=restaurante_id, nombre=normalizar(nombre),
+            descripcion=normalizar(descripcion), categoria=categoria or '', subcategoria=subcategoria or '',
+            texto=' '.join(filter(None, [texto, categoria, subcategoria])),
+        )
+        for comida_id, nombre, descripcion, texto, categoria, subcategoria in filas
+    ], batch_size=500)
+
+
+def reindexar_restaurante(restaurante_id):
+    """Reemplaza las filas del índice de un restaurante por sus comidas disponibles actuales."""
+    with transaction.atomic():
+        IndiceBusqueda.objects.filter(restaurante_id=restaurante_id).delete()
+        _crear_filas(restaurante_id, Comida.objects.filter(restaurante_id=restaurante_id))
+
+
+def reindexar_comidas(restaurante_id, comida_ids):
+    """
+    Reemplaza las filas del índice de las comidas `comida_ids`: las que ya no
+    existen o no están disponibles salen, las demás quedan con su texto actual.
+    """
+    comida_ids = list(comida_ids)
+    if not comida_ids:
+        return
+    with transaction.atomic():
+        IndiceBusqueda.objects.filter(restaurante_id=restaurante_id, comida_id__in=comida_ids).delete()
+        _crear_filas(restaurante_id, Comida.objects.filter(restaurante_id=restaurante_id, id__in=comida_ids))
+
+
+def _comidas_con_nombre_viejo(modelo, ids):
+    """
+    Comidas indexadas de las categorías (o subcategorías) `ids` cuyo índice
+    tiene otro nombre que el actual: las que hay que reindexar si el cambio
+    fue un renombre. Si solo cambió el orden, no devuelve ninguna.
+    """
+    campo = 'categoria' if modelo is Categoria else 'subcategoria'
+    return (
+        Comida.objects.filter(**{f'{campo}_id__in': ids}, indice_busqueda__isnull=False)
+        .exclude(**{f'indice_busqueda__{campo}': F(f'{campo}__texto_busqueda')})
+        .values_list('id', flat=True)
+    )
+
+
+def reindexar_cambios(restaurante_id, ids_por_modelo):
+    """
+    Actualiza el índice de un restaurante tras un cambio de menú. Lo llama
+    registrar_cambio al commitear.
+
+    `ids_por_modelo` ({modelo: ids} de las filas cambiadas, o None si no se
+    sabe cuáles) decide qué se reindexa:
+    - Comida: esas comidas.
+    - Categoria / Subcategoria: sus comidas, solo si cambió el nombre.
+    - Restaurante: nada, salvo que haya cambiado `activo` (se vacía el índice
+      o se arma completo).
+    - Sin detalle: el restaurante completo.
+    """
+    if ids_por_modelo is None:
+        reindexar_restaurante(restaurante_id)
+        return
+    if Restaurante in ids_por_modelo:
+        if not Restaurante.objects.filter(pk=restaurante_id, activo=True).exists():
+            IndiceBusqueda.objects.filter(restaurante_id=restaurante_id).delete()
+            return
+        # Activo y sin filas: recién creado o reactivado
+        if not IndiceBusqueda.objects.filter(restaurante_id=restaurante_id).exists():
+            reindexar_restaurante(restaurante_id)
+            return
+    comida_ids = set(ids_por_modelo.get(Comida, ()))
+    for modelo in (Categoria, Subcategoria):
+        if ids_por_modelo.get(modelo):
+            comida_ids.update(_comidas_con_nombre_viejo(modelo, ids_por_modelo[modelo]))
+    reindexar_comidas(restaurante_id, comida_ids)
+
+
+def _sql_sqlite(restaurante_id, palabras, limite):
+    # Cada palabra como frase con prefijo ("marg"*); el restaurante, como filtro de columna
+    frases = ' '.join(f'"{palabra}"*' for palabra in palabras)
+    consulta = f'restaurante : "{restaurante_id}" AND {{nombre descripcion categoria subcategoria}} : ({frases})'
+    return (
+        f'SELECT rowid FROM {TABLA_FTS} WHERE {TABLA_FTS} MATCH %s '
+        f'ORDER BY bm25({TABLA_FTS}, {", ".join(map(str, _PESOS_FTS))}), rowid LIMIT %s',
+        [consulta, limite]
+    )
+
+
+def _sql_postgresql(restaurante_id, palabras, limite):
+    consulta = ' & '.join(f'{palabra}:*' for palabra in palabras)
+    return (
+        f"SELECT comida_id FROM {TABLA} "
+        f"WHERE restaurante_id = %s AND ({VECTOR_PG}) @@ to_tsquery('spanish', %s) "
+        f"ORDER BY ts_rank(({VECTOR_PG}), to_tsquery('spanish', %s)) DESC, comida_id LIMIT %s",
+        [restaurante_id, consulta, consulta, limite]
+    )
+
+
+def sql_busqueda(restaurante_id, texto, limite=20, por_raiz=False):
+    """
+    (sql, params) de la búsqueda para el motor de la conexión, o None si
+    `texto` no tiene palabras. Con `por_raiz`, busca la raíz de cada término
+    (None si ninguno se acorta: sería la misma búsqueda).
+    """
+    palabras = terminos(texto)
+    if por_raiz:
+        raices = [raiz(palabra) for palabra in palabras]
+        palabras = raices if raices != palabras else []
+    if not palabras:
+        return None
+    return {'sqlite': _sql_sqlite, 'postgresql': _sql_postgresql}[connection.vendor](restaurante_id, palabras, limite)
+
+
+def _pares_fts(buscados, umbral):
+    """
+    Condición FTS5 que cumple todo texto con al menos `umbral` de los
+    trigramas `buscados`: si de los n le pueden faltar f, de cualesquiera
+    f + 2 de ellos tiene al menos dos. Pedir pares descarta muchas más filas
+    que pedir uno solo.
+    """
+    buscados = sorted(buscados)
+    faltantes = len(buscados) - math.ceil(len(buscados) * umbral)
+    muestra = buscados[:faltantes + 2]
+    if len(muestra) < 2:
+        return ' OR '.join(f'"{trigrama}"' for trigrama in buscados)
+    return ' OR '.join(f'("{a}" AND "{b}")' for a, b in itertools.combinations(muestra, 2))
+
+
+def _trigramas_fts(palabras):
+    """
+    Condición FTS5 de los candidatos: con un término, UMBRAL_SIMILITUD de sus
+    trigramas; con varios, UMBRAL_TERMINO de los de cada uno, que descarta
+    más filas y cuesta menos que la condición sobre todos juntos.
+    """
+    por_termino = [trigramas(palabra) for palabra in palabras if trigramas(palabra)]
+    if len(por_termino) == 1:
+        return _pares_fts(por_termino[0], UMBRAL_SIMILITUD)
+    return ' AND '.join(f'({_pares_fts(buscados, UMBRAL_TERMINO)})' for buscados in por_termino)
+
+
+def _sql_trigramas_sqlite(restaurante_id, palabras, limite):
+    # Sin ORDER BY: bm25() sobre cientos de coincidencias costaba más que confirmarlas
+    return (
+        f'SELECT rowid, texto FROM {TABLA_TRIGRAMAS} WHERE {TABLA_TRIGRAMAS} MATCH %s LIMIT %s',
+        [f'restaurante : "#{restaurante_id}#" AND texto : ({_trigramas_fts(palabras)})',
+         max(limite, CANDIDATOS_TRIGRAMAS)]
+    )
+
+
+def _sql_trigramas_postgresql(restaurante_id, palabras, limite):
+    # <% usa el índice GIN de pg_trgm con pg_trgm.word_similarity_threshold;
+    # UMBRAL_TERMINO se confirma después, con similitud()
+    consulta = ' '.join(palabras)
+    return (
+        f'SELECT comida_id, texto FROM {TABLA} WHERE restaurante_id = %s AND %s <%% texto '
+        f'ORDER BY word_similarity(%s, texto) DESC, comida_id LIMIT %s',
+        [restaurante_id, consulta, consulta, max(limite, CANDIDATOS_TRIGRAMAS)]
+    )
+
+
+def sql_busqueda_aproximada(restaurante_id, texto, limite=20):
+    """
+    (sql, params) de la búsqueda por trigramas, o None si `texto` no tiene
+    palabras de al menos 3 letras. Devuelve filas (id, texto) a confirmar
+    con similitud().
+    """
+    palabras = terminos(texto)
+    if not trigramas(' '.join(palabras)):
+        return None
+    return {
+        'sqlite': _sql_trigramas_sqlite, 'postgresql': _sql_trigramas_postgresql,
+    }[connection.vendor](restaurante_id, palabras, limite)
+
+
+def buscar_aproximado(restaurante_id, texto, limite=20):
+    """
+    Ids de las comidas cuyo texto contiene la mayoría de los trigramas de
+    `texto` y parte de los de cada término (tolera acentos y errores de
+    tipeo), de mayor a menor similitud.
+    """
+    sql = sql_busqueda_aproximada(restaurante_id, texto, limite)
+    if sql is None:
+        return []
+    palabras = [palabra for palabra in terminos(texto) if trigramas(palabra)]
+    consulta = ' '.join(palabras)
+    # Con un solo término, UMBRAL_SIMILITUD ya es más exigente que UMBRAL_TERMINO
+    por_termino = palabras if len(palabras) > 1 else []
+    with connection.cursor() as cursor:
+        cursor.execute(*sql)
+        candidatos = [
+            (similitud(consulta, texto_comida), comida_id) for comida_id, texto_comida in cursor.fetchall()
+            if all(similitud(palabra, texto_comida) >= UMBRAL_TERMINO for palabra in por_termino)
+        ]
+    candidatos = [candidato for candidato in candidatos if candidato[0] >= UMBRAL_SIMILITUD]
+    candidatos.sort(key=lambda candidato: (-candidato[0], candidato[1]))
+    return [comida_id for _, comida_id in candidatos[:limite]]
+
+
+def buscar(restaurante_id, texto, limite=20):
+    """
+    Ids de las comidas del restaurante que coinciden con `texto`, de mayor a
+    menor relevancia. Si ninguna contiene todas las palabras, las que
+    contienen sus raíces; si tampoco, las coincidencias aproximadas.
+    """
+    for por_raiz in (False, True):
+        consulta = sql_busqueda(restaurante_id, texto, limite, por_raiz)
+        if consulta is None:
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(*consulta)
+            ids = [fila[0] for fila in cursor.fetchall()]
+        if ids:
+            return ids
+    return buscar_aproximado(restaurante_id, texto, limite)
@@ -0,0 +1,243 @@
+"""
+Cache por restaurante - Respuestas cacheadas con invalidación por generación
+
+Cada restaurante tiene una generación vigente, y cada entrada guarda la
+generación con la que se calculó:
+
+    r<restaurante_id>:<huella de la clave> → (generacion, fresca_hasta, valor)
+
+Al commitear cualquier cambio del menú, cambios.registrar_cambio incrementa la
+generación del restaurante: todas sus entradas quedan viejas de una vez, en
+O(1), sin recorrer ni borrar claves (las desaloja el backend por TTL o por
+espacio). Las de los demás restaurantes no se tocan.
+
+Una entrada se recalcula una sola vez aunque la pidan muchos a la vez (al
+vencer CACHE_TTL o tras un cambio, en plena hora pico): el primero toma un
+lock en el backend (cache.add) y los demás no repiten el cálculo.
+- Vencida por CACHE_TTL, con la generación vigente: los datos no cambiaron.
+  Se sirve la copia a todos y el que tomó el lock la recalcula en un hilo.
+- De una generación anterior: el que tomó el lock la recalcula antes de
+  responder (quien acaba de guardar un cambio lo ve en el request siguiente)
+  y los demás reciben la copia anterior mientras tanto. Con réplicas, quien
+  lee de la primaria tras un cambio (ver replicas.py) espera la nueva.
+- Sin copia: los demás esperan hasta CACHE_CALCULO_SEGUNDOS a que aparezca;
+  si no aparece, la calculan ellos.
+Las copias viejas se conservan CACHE_VIEJA_SEGUNDOS más allá de CACHE_TTL.
+
+El backend es el cache `default` de settings.CACHES, elegido con CACHE_URL:
+memoria del proceso, archivos compartidos por los workers de gunicorn de un
+mismo equipo, o un servidor externo (Redis, Memcached) para varios equipos.
+En memoria, la invalidación y el lock solo valen en el proceso que los
+escribe: sirve con un único proceso (runserver, uvicorn, waitress);
+gunicorn.conf.py usa archivos. Con archivos, add() no es atómico entre
+procesos: en el peor caso dos workers calculan la misma entrada.
+
+Una generación nueva arranca con un valor tomado del reloj: si el backend
+desaloja el contador, el que lo reemplaza no coincide con el de entradas
+viejas que sigan guardadas.
+
+Con réplicas de lectura (ver replicas.py), tras un cambio las lecturas del
+restaurante van a la primaria por REPLICAS_PEGAJOSO_SEGUNDOS: la generación
+nueva se calcula con datos de una réplica atrasada solo si la réplica se
+atrasa más que eso, y CACHE_TTL acota cuánto dura.
+
+Aciertos, copias viejas servidas, esperas y cálculos se cuentan en cada
+proceso y se suman en el backend cada CACHE_CONTADORES_INTERVALO segundos:
+estadisticas() da el total de todos los workers que comparten el backend.
+"""
+import contextvars
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from . import replicas
+
+
+logger = logging.getLogger(__name__)
+
+CONTADORES = ('aciertos', 'viejas', 'esperas', 'fallos', 'calculos')
+# Cada cuánto vuelve a mirar el backend quien espera una entrada que calcula otro
+_INTERVALO_ESPERA = 0.02
+
+_contadores = Counter()  # contadores de este proceso aún no sumados al backend
+_lock = threading.Lock()
+_ultimo_volcado = time.monotonic()
+
+
+def _clave_generacion(restaurante_id):
+    return f'r{restaurante_id}:generacion'
+
+
+def _clave(restaurante_id, clave):
+    # Huella y no la clave tal cual: Memcached no acepta espacios ni claves largas
+    return f'r{restaurante_id}:{hashlib.md5(clave.encode()).hexdigest()}'
+
+
+def _clave_calculo(clave_completa):
+    return f'{clave_completa}:calculando'
+
+
+def _nueva_generacion(restaurante_id):
+    nueva = time.time_ns()
+    cache.add(_clave_generacion(restaurante_id), nueva, timeout=None)
+    # Si otro proceso la creó primero, vale la suya
+    return cache.get(_clave_generacion(restaurante_id), nueva)
+
+
+def generacion(restaurante_id):
+    """Generación vigente del restaurante; la crea si el backend no la tiene."""
+    actual = cache.get(_clave_generacion(restaurante_id))
+    return actual if actual is not None else _nueva_generacion(restaurante_id)
+
+
+def invalidar(restaurante_id):
+    """Deja viejas todas las entradas del restaurante. Lo llama registrar_cambio al commitear."""
+    try:
+        cache.incr(_clave_generacion(restaurante_id))
+    except ValueError:
+        # Sin contador no hay entradas vigentes: la próxima lectura crea uno nuevo
+        pass
+
+
+def obtener(restaurante_id, clave, calcular):
+    """
+    Valor de `clave` en el cache del restaurante; si no está vigente, lo
+    calcula con calcular() (una sola vez entre todos los que lo piden a la vez)
+    y lo guarda por CACHE_TTL segundos.
+
+    La generación se lee antes de calcular: si un cambio commitea mientras
+    tanto, el valor queda guardado con la generación anterior y la próxima
+    lectura lo recalcula.
+
+    calcular() devuelve un valor que el backend pueda serializar (no None);
+    si lanza una excepción, llega al llamador y no se guarda nada.
+    """
+    clave_generacion, clave_completa = _clave_generacion(restaurante_id), _clave(restaurante_id, clave)
+    guardadas = cache.get_many([clave_generacion, clave_completa])
+    vigente = guardadas.get(clave_generacion)
+    if vigente is None:
+        vigente = _nueva_generacion(restaurante_id)
+    entrada = guardadas.get(clave_completa)
+    misma_generacion = entrada is not None and entrada[0] == vigente
+
+    if misma_generacion and entrada[1] > time.time():
+        _contar('aciertos')
+        return entrada[2]
+
+    if cache.add(_clave_calculo(clave_completa), True, timeout=settings.CACHE_CALCULO_SEGUNDOS):
+        if misma_generacion:
+            # Solo venció el TTL: los datos son los mismos
+            _contar('viejas')
+            _recalcular_en_segundo_plano(calcular, vigente, clave_completa)
+            return entrada[2]
+        _contar('fallos')
+        return _calcular(calcular, vigente, clave_completa)
+
+    # Otro la está calculando
+    if entrada is not None and (misma_generacion or not replicas.lee_de_primaria()):
+        _contar('viejas')
+        return entrada[2]
+    return _esperar(calcular, vigente, clave_completa)
+
+
+def _calcular(calcular, generacion_calculo, clave_completa, con_lock=True):
+    try:
+        _contar('calculos')
+        valor = calcular()
+        cache.set(
+            clave_completa, (generacion_calculo, time.time() + settings.CACHE_TTL, valor),
+            timeout=settings.CACHE_TTL + settings.CACHE_VIEJA_SEGUNDOS,
+        )
+        return valor
+    finally:
+        if con_lock:
+            cache.delete(_clave_calculo(clave_completa))
+
+
+def _recalcular_en_segundo_plano(calcular, generacion_calculo, clave_completa):
+    # Con el contexto de la request: el router de réplicas decide igual que en ella
+    contexto = contextvars.copy_context()
+
+    def recalcular():
+        try:
+            contexto.run(_calcular, calcular, generacion_calculo, clave_completa)
+        except Exception:
+            logger.exception('No se pudo recalcular la entrada %s del cache', clave_completa)
+        finally:
+            # El hilo abrió sus propias conexiones
+            connections.close_all()
+
+    threading.Thread(target=recalcular, name=f'cache {clave_completa}', daemon=True).start()
+
+
+def _esperar(calcular, generacion_calculo, clave_completa):
+    """Espera la entrada que calcula otro; si no aparece a tiempo, la calcula."""
+    clave_calculo = _clave_calculo(clave_completa)
+    hasta = time.monotonic() + settings.CACHE_CALCULO_SEGUNDOS
+    while time.monotonic() < hasta:
+        time.sleep(_INTERVALO_ESPERA)
+        guardadas = cache.get_many([clave_completa, clave_calculo])
+        entrada = guardadas.get(clave_completa)
+        if entrada is not None and entrada[0] == generacion_calculo:
+            _contar('esperas')
+            return entrada[2]
+        if clave_calculo not in guardadas:
+            # Terminó sin guardarla (calcular() falló) o ya la reemplazó otra generación
+            break
+    _contar('fallos')
+    return _calcular(calcular, generacion_calculo, clave_completa, con_lock=False)
+
+
+def _contar(nombre):
+    global _ultimo_volcado
+    pendientes = None
+    with _lock:
+        _contadores[nombre] += 1
+        ahora = time.monotonic()
+        if ahora - _ultimo_volcado >= settings.CACHE_CONTADORES_INTERVALO:
+            pendientes, _ultimo_volcado = dict(_contadores), ahora
+            _contadores.clear()
+    if pendientes:
+        _volcar(pendientes)
+
+
+def _volcar(pendientes):
+    for nombre, cantidad in pendientes.items():
+        try:
+            cache.incr(f'contadores:{nombre}', cantidad)
+        except ValueError:
+            if not cache.add(f'contadores:{nombre}', cantidad, timeout=None):
+                cache.incr(f'contadores:{nombre}', cantidad)
+
+
+def estadisticas():
+    """
+    Contadores acumulados en el backend, con los de este proceso:
+    - aciertos: entradas vigentes
+    - viejas: copias servidas mientras otro las recalculaba
+    - esperas: lecturas que esperaron el cálculo de otro
+    - fallos: lecturas que calcularon la entrada antes de responder
+    - calculos: llamadas a calcular(), incluidas las de segundo plano
+
+    Returns:
+        dict {'backend', *CONTADORES, 'tasa_aciertos'}
+    """
+    with _lock:
+        pendientes = dict(_contadores)
+        _contadores.clear()
+    if pendientes:
+        _volcar(pendientes)
+    guardados = cache.get_many([f'contadores:{nombre}' for nombre in CONTADORES])
+    totales = {nombre: guardados.get(f'contadores:{nombre}', 0) for nombre in CONTADORES}
+    # Las viejas y las esperas también se respondieron sin calcular
+    sin_calcular = totales['aciertos'] + totales['viejas'] + totales['esperas']
+    pedidas = sin_calcular + totales['fallos']
+    return {
+        'backend': settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1],
+        **totales,
+        'tasa_aciertos': round(sin_calcular / pedidas, 4) if pedidas else None,
+    }
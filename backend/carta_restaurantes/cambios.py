@@ -0,0 +1,120 @@
+"""
+Cambios - Punto único de aviso cuando se modifica el menú de un restaurante
+
+Lo llaman las señales de los modelos (signals.py) y las vistas que hacen
+update() masivos, que no disparan señales (admin_crud.update_*_orden).
+"""
+import logging
+import threading
+import weakref
+from django.db import transaction
+from . import cache_por_restaurante, eventos, replicas
+from .busqueda import reindexar_cambios
+from .sincronizacion import TIPO_POR_MODELO, registrar_entradas
+from .restaurantes_cache import invalidar_restaurante
+from .snapshots import descartar_snapshots, reconstruir_snapshots
+from .versiones import incrementar_version
+
+
+logger = logging.getLogger(__name__)
+
+
+# Cambios de la transacción en curso de este hilo (cada hilo tiene su conexión)
+_local = threading.local()
+
+
+def _pendientes():
+    """
+    {restaurante_id: _CambioPendiente} de la transacción en curso.
+
+    Guarda referencias débiles: quien retiene el callback es la lista de
+    on_commit de la conexión. Si la transacción (o el savepoint que lo
+    registró) se revierte, Django lo descarta y el restaurante deja de estar
+    pendiente sin que haga falta enterarse del rollback.
+    """
+    if not hasattr(_local, 'pendientes'):
+        _local.pendientes = weakref.WeakValueDictionary()
+    return _local.pendientes
+
+
+class _CambioPendiente:
+    """Avisos de on_commit de un restaurante; uno solo por transacción."""
+
+    def __init__(self, restaurante_id):
+        self.restaurante_id = restaurante_id
+        # {modelo: ids} de las filas cambiadas, o None si algún aviso no dijo cuáles
+        self.ids_por_modelo = {}
+
+    def anotar(self, modelo, ids):
+        if modelo is None:
+            self.ids_por_modelo = None
+        elif self.ids_por_modelo is not None:
+            self.ids_por_modelo.setdefault(modelo, set()).update(ids)
+
+    def __call__(self):
+        restaurante_id = self.restaurante_id
+        if _pendientes().get(restaurante_id) is self:
+            del _pendientes()[restaurante_id]
+        # Antes que el resto: quien lea el menú nuevo (o recalcule su cache) lee de la primaria
+        replicas.marcar_cambio(restaurante_id)
+        invalidar_restaurante(restaurante_id)
+        # Los datos ya están commiteados: si falla, el request que guardó no
+        # tiene que terminar en un 500 ni dejar de avisar a los demás
+        try:
+            reindexar_cambios(restaurante_id, self.ids_por_modelo)
+        except Exception:
+            logger.exception('No se pudo reindexar la búsqueda del restaurante %s', restaurante_id)
+        try:
+            reconstruir_snapshots(restaurante_id)
+        except Exception:
+            logger.exception('No se pudieron reconstruir los snapshots del restaurante %s', restaurante_id)
+            descartar_snapshots(restaurante_id)
+        # Después de reconstruir: una entrada nueva no puede guardarse con el snapshot viejo
+        cache_por_restaurante.invalidar(restaurante_id)
+        eventos.publicar(restaurante_id)
+
+
+def registrar_cambio(restaurante_id, modelo=None, ids=(), borrado=False):
+    """
+    Marca el menú del restaurante como modificado.
+
+    Incrementa la versión dentro de la transacción en curso (el ETag cambia
+    atómicamente con los datos). Al commitear, manda por un rato a la primaria
+    las lecturas públicas del restaurante (ver replicas.py), invalida la
+    resolución del slug en este proceso, reindexa en la búsqueda las filas
+    cambiadas (ver busqueda.reindexar_cambios), reconstruye los snapshots,
+    invalida el cache del restaurante (ver cache_por_restaurante.py) y avisa
+    a las conexiones de eventos (ver eventos.py).
+
+    Con `modelo` e `ids`, además anota esas filas en el registro de cambios
+    (ver sincronizacion.py) con la versión nueva.
+
+    Si al commitear falla el reindexado o la reconstrucción, se registra el
+    error y el resto de los avisos sigue: sin snapshot, las vistas públicas
+    leen el menú por el ORM hasta el próximo cambio o hasta correr
+    reconstruir_snapshots.
+
+    Un borrado en cascada dispara una señal por fila: solo la primera de cada
+    restaurante en la transacción incrementa la versión y programa los avisos.
+    """
+    # Fuera de una transacción (save() en autocommit), una propia: la versión y
+    # sus entradas se ven juntas, y los avisos de on_commit corren después de ambas
+    with transaction.atomic(savepoint=False):
+        pendiente = _pendientes().get(restaurante_id)
+        if pendiente is None:
+            incrementar_version(restaurante_id)
+            pendiente = _CambioPendiente(restaurante_id)
+            transaction.on_commit(pendiente, robust=True)
+            _pendientes()[restaurante_id] = pendiente
+        pendiente.anotar(modelo, ids)
+        if modelo is not None and ids:
+            registrar_entradas(restaurante_id, TIPO_POR_MODELO[modelo], ids, borrado)
+
+
+def registrar_cambios(modelo, ids):
+    """Registra el cambio para cada restaurante dueño de las filas `ids` de `modelo`."""
+    ids_por_restaurante = {}
+    for objeto_id, restaurante_id in modelo.objects.filter(id__in=ids).values_list('id', 'restaurante_id'):
+        ids_por_restaurante.setdefault(restaurante_id, []).append(objeto_id)
+    for restaurante_id, objeto_ids in ids_por_restaurante.items():
+        registrar_cambio(restaurante_id, modelo, objeto_ids)
@@ -0,0 +1,109 @@
+"""
+Campos - Sparse fieldsets (?fields= / ?omit=) para los endpoints del menú
+
+    /api/comidas/?restaurante=<slug>&fields=id,nombre,precio
+    /api/menu/?restaurante=<slug>&omit=descripcion,restaurante
+
+Los campos acotan tanto el JSON como el SELECT: el camino rápido pide a
+.values() solo las columnas necesarias y el de DRF usa .only(), sin JOIN a
+las relaciones que no se muestran. Solo aplica a GET; las escrituras
+responden con el objeto completo.
+"""
+import hashlib
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from .serializacion_rapida import columnas
+
+
+PARAMETRO_CAMPOS = 'fields'
+PARAMETRO_OMITIR = 'omit'
+
+
+def _lista(valor):
+    return [campo.strip() for campo in valor.split(',') if campo.strip()]
+
+
+def campos_solicitados(query_params, disponibles):
+    """
+    Campos pedidos por ?fields= y ?omit=, en el orden del serializer.
+
+    Returns:
+        tupla de campos, o None si no se acota nada (respuesta completa)
+
+    Raises:
+        ValidationError: si se nombra un campo que el endpoint no tiene
+    """
+    incluir = _lista(query_params.get(PARAMETRO_CAMPOS, ''))
+    omitir = _lista(query_params.get(PARAMETRO_OMITIR, ''))
+    if not incluir and not omitir:
+        return None
+
+    desconocidos = [campo for campo in incluir + omitir if campo not in disponibles]
+    if desconocidos:
+        raise ValidationError({
+            PARAMETRO_CAMPOS: f'Campos desconocidos: {", ".join(desconocidos)}. '
+                              f'Disponibles: {", ".join(disponibles)}'
+        })
+
+    campos = tuple(
+        campo for campo in disponibles
+        if (not incluir or campo in incluir) and campo not in omitir
+    )
+    # Pedir todos los campos equivale a no pedir nada: misma respuesta, mismo snapshot
+    return None if campos == tuple(disponibles) else campos
+
+
+def variante(campos):
+    """Sufijo corto y estable para el ETag de una respuesta acotada, o None."""
+    if campos is None:
+        return None
+    return hashlib.md5(','.join(campos).encode()).hexdigest()[:8]
+
+
+def acotar_queryset(queryset, columnas_necesarias):
+    """.only() de esas columnas, con select_related solo de las relaciones que recorren."""
+    relaciones = {columna.split('__')[0] for columna in columnas_necesarias if '__' in columna}
+    queryset = queryset.select_related(None)
+    if relaciones:
+        # select_related() sin argumentos seguiría todas las FK
+        queryset = queryset.select_related(*relaciones)
+    return queryset.only(*columnas_necesarias)
+
+
+class CamposMixin:
+    """
+    Agrega ?fields= / ?omit= a una vista genérica de DRF.
+
+    - campos_disponibles: campos del serializer, en su orden
+    - columnas_por_campo: columnas de cada campo (ver serializacion_rapida)
+    - columnas_siempre: columnas que la vista lee aunque no se muestren
+
+    El serializer_class debe aceptar `campos` (ver serializers.CamposDinamicosMixin).
+    """
+    campos_disponibles = ()
+    columnas_por_campo = {}
+    columnas_siempre = ()
+
+    def get_campos(self):
+        if not hasattr(self, '_campos'):
+            self._campos = None
+            if self.request.method in SAFE_METHODS:
+                self._campos = campos_solicitados(self.request.query_params, self.campos_disponibles)
+        return self._campos
+
+    def incluye(self, campo):
+        campos = self.get_campos()
+        return campos is None or campo in campos
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        campos = self.get_campos()
+        if campos is None:
+            return queryset
+        return acotar_queryset(queryset, columnas(campos, self.columnas_por_campo, self.columnas_siempre))
+
+    def get_serializer(self, *args, **kwargs):
+        campos = self.get_campos()
+        if campos is not None:
+            kwargs.setdefault('campos', campos)
+        return super().get_serializer(*args, **kwargs)
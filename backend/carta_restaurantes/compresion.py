@@ -0,0 +1,73 @@
+"""
+Compresión - Variantes gzip y brotli de los snapshots del menú
+
+Los snapshots se comprimen una vez por cambio de menú (ver snapshots.py) y las
+vistas públicas eligen la variante según Accept-Encoding: en el request no se
+comprime nada.
+
+brotli es opcional (paquete Brotli, el mismo que usa WhiteNoise): sin él solo
+se guardan y sirven variantes gzip.
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+GZIP_NIVEL = 9
+# Calidad 11 tarda ~100 veces más que 9 en un menú grande y no comprime mejor JSON repetitivo
+BROTLI_CALIDAD = 9
+
+# Preferencia del servidor ante empate de q-values
+CODIFICACIONES = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def comprimir(contenido):
+    """
+    Variantes comprimidas de un payload. Una variante que no achica el
+    contenido (payloads diminutos) no se guarda: se sirve sin comprimir.
+
+    Returns:
+        (gzip o None, brotli o None)
+    """
+    # mtime=0: misma entrada, mismos bytes
+    comprimido_gzip = gzip.compress(contenido, compresslevel=GZIP_NIVEL, mtime=0)
+    comprimido_br = brotli.compress(contenido, quality=BROTLI_CALIDAD) if brotli is not None else None
+    return (
+        comprimido_gzip if len(comprimido_gzip) < len(contenido) else None,
+        comprimido_br if comprimido_br is not None and len(comprimido_br) < len(contenido) else None,
+    )
+
+
+def negociar(accept_encoding):
+    """
+    Codificación preferida por el cliente entre las que sabemos servir.
+
+    Respeta q-values (`gzip;q=0` la excluye) y `*`.
+
+    Returns:
+        'br', 'gzip' o None (sin comprimir)
+    """
+    aceptadas = {}
+    for parte in accept_encoding.split(','):
+        nombre, _, parametros = parte.partition(';')
+        nombre = nombre.strip().lower()
+        if not nombre:
+            continue
+        calidad = 1.0
+        parametro, _, valor = parametros.partition('=')
+        if parametro.strip().lower() == 'q':
+            try:
+                calidad = float(valor)
+            except ValueError:
+                calidad = 0.0
+        aceptadas[nombre] = calidad
+
+    mejor, mejor_calidad = None, 0.0
+    for codificacion in CODIFICACIONES:
+        calidad = aceptadas.get(codificacion, aceptadas.get('*', 0.0))
+        if calidad > mejor_calidad:
+            mejor, mejor_calidad = codificacion, calidad
+    return mejor
@@ -0,0 +1,93 @@
+"""
+Conexiones - Autotest de las bases al arrancar el servidor
+
+Con DATABASE_URL (ver settings.py) cada worker mantiene su conexión abierta
+CONN_MAX_AGE segundos y la reusa entre requests: solo el primero paga el
+handshake TCP + autenticación con PostgreSQL. Eso vale bajo WSGI (waitress,
+gunicorn); bajo ASGI hace falta DATABASE_POOL.
+
+- autotest(): lo llaman wsgi.py y asgi.py al cargar la aplicación, si el
+  proceso es un servidor (DATABASE_AUTOTEST, ver settings.py). Conecta a
+  cada base y ejecuta una query; si alguna no responde, el servidor no
+  arranca (el deploy falla en vez de contestar 500 a cada request). uvicorn
+  carga asgi.py dentro del event loop, donde el ORM sync no puede correr:
+  ahí el autotest corre en un hilo aparte.
+- calentar(): lo llama gunicorn.conf.py en cada worker recién creado, para
+  que el primer request ya encuentre la conexión abierta.
+
+La conexión del autotest se cierra enseguida: con preload_app el proceso
+hace fork después, y una conexión no se puede compartir entre procesos.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+def probar_bases():
+    """
+    Conecta a cada base configurada y ejecuta SELECT 1.
+
+    Returns:
+        lista de dict {'alias', 'vendor', 'conexion_ms', 'query_ms', 'conn_max_age', 'pool'}
+
+    Raises:
+        ImproperlyConfigured: si alguna base no responde
+    """
+    resultados = []
+    for alias in connections:
+        conexion = connections[alias]
+        inicio = time.perf_counter()
+        try:
+            conexion.ensure_connection()
+            conectada = time.perf_counter()
+            with conexion.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+        except Exception as error:
+            raise ImproperlyConfigured(f'La base {alias!r} no responde: {error}') from error
+        resultados.append({
+            'alias': alias,
+            'vendor': conexion.vendor,
+            'conexion_ms': (conectada - inicio) * 1000,
+            'query_ms': (time.perf_counter() - conectada) * 1000,
+            'conn_max_age': conexion.settings_dict['CONN_MAX_AGE'],
+            'pool': bool(conexion.settings_dict['OPTIONS'].get('pool')),
+        })
+    return resultados
+
+
+def autotest():
+    """Verifica las bases al cargar la aplicación (settings.DATABASE_AUTOTEST)."""
+    if not settings.DATABASE_AUTOTEST:
+        return
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return _autotest()
+    with ThreadPoolExecutor(max_workers=1) as hilo:
+        hilo.submit(_autotest).result()
+
+
+def _autotest():
+    try:
+        for resultado in probar_bases():
+            if resultado['vendor'] == 'postgresql' and not resultado['conn_max_age'] and not resultado['pool']:
+                logger.warning(
+                    'La base %r no tiene conexiones persistentes (DATABASE_CONN_MAX_AGE=0): '
+                    'cada request paga una conexión de %.0f ms', resultado['alias'], resultado['conexion_ms'],
+                )
+    finally:
+        connections.close_all()
+
+
+def calentar():
+    """Abre las conexiones de este hilo (el que atiende los requests en un worker sync de gunicorn)."""
+    for alias in connections:
+        connections[alias].ensure_connection()
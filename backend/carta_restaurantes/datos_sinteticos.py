@@ -0,0 +1,145 @@
+"""
+Datos Sintéticos - Menús generados y configuraciones de cache para los tests
+(carta_restaurantes/tests/) y los scripts de medición y verificación
+(backend/scripts/)
+
+Fuera del paquete de tests: los scripts no dependen de él.
+
+Los datos se crean con bulk_create (sin señales); los scripts los generan
+dentro de una transacción que descartan al terminar.
+"""
+from decimal import Decimal
+from django.contrib.auth.models import User
+from carta_restaurantes.estadisticas import reconciliar
+from carta_restaurantes.models import Categoria, Subcategoria, Comida, Restaurante
+
+
+PLATOS = [
+    'Pizza', 'Empanada', 'Milanesa', 'Ñoquis', 'Ravioles', 'Tarta', 'Ensalada', 'Sándwich',
+    'Hamburguesa', 'Lomito', 'Sorrentinos', 'Tallarines', 'Risotto', 'Licuado', 'Café', 'Helado',
+    'Flan', 'Budín', 'Medialuna', 'Tostado', 'Wok', 'Sopa', 'Guiso', 'Provoleta', 'Bife',
+    'Pollo', 'Omelette', 'Crepe', 'Waffle', 'Tostada',
+]
+INGREDIENTES = [
+    'jamón', 'queso', 'muzzarella', 'tomate', 'albahaca', 'durazno', 'frutilla', 'banana',
+    'calabaza', 'espinaca', 'ricota', 'nuez', 'cebolla', 'morrón', 'champiñones', 'palmitos',
+    'rúcula', 'parmesano', 'provolone', 'roquefort', 'anchoas', 'aceitunas', 'huevo', 'panceta',
+    'lomo', 'carne', 'pollo', 'salmón', 'atún', 'verduras', 'choclo', 'batata', 'papa',
+    'chocolate', 'dulce de leche', 'crema', 'limón', 'menta', 'vainilla', 'coco',
+]
+ESTILOS = ['casero', 'de la casa', 'especial', 'clásico', 'al horno', 'grillado', 'napolitano', 'criollo', 'veggie', 'light']
+
+# Para override_settings(CACHES=SIN_CACHE): las mediciones que cuentan queries o
+# latencia de la base no tienen que verse afectadas por el cache por restaurante
+SIN_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+# Para override_settings(CACHES=CACHE_LOCAL): lo que necesita un cache real en
+# memoria del proceso (cache por restaurante, marcas de réplicas)
+CACHE_LOCAL = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'}}
+
+
+def textos_variados(i):
+    """Nombre y descripción de menú real: vocabulario amplio y poco repetido."""
+    plato = PLATOS[i % len(PLATOS)]
+    ingrediente = INGREDIENTES[(i // len(PLATOS)) % len(INGREDIENTES)]
+    estilo = ESTILOS[(i // (len(PLATOS) * len(INGREDIENTES))) % len(ESTILOS)]
+    extras = [INGREDIENTES[(i * primo) % len(INGREDIENTES)] for primo in (7, 11, 13)]
+    return f'{plato} de {ingrediente} {estilo}', f'Con {", ".join(extras)}.'
+
+
+def textos_repetidos(i):
+    """Mismo texto en todas las comidas: peor caso para serializar (escapes, ñ, comillas)."""
+    return f'Ñoquis de la casa #{i}', 'Licuado de durazno, café y "comillas" ' * (i % 4)
+
+
+def _con_texto_busqueda(objetos):
+    # bulk_create() no pasa por save(), que es quien calcula texto_busqueda
+    for objeto in objetos:
+        objeto.actualizar_texto_busqueda()
+    return objetos
+
+
+def crear_menu_sintetico(slug, total_comidas, categorias=10, subcategorias_por_categoria=5, propietario=None,
+                         textos=textos_repetidos):
+    """
+    Crea un restaurante con `total_comidas` comidas repartidas en
+    categorías y subcategorías. `textos(i)` da nombre y descripción de la
+    comida i.
+
+    Returns:
+        Restaurante
+    """
+    if propietario is None:
+        propietario = User.objects.create_user(username=slug, is_staff=True)
+    restaurante = Restaurante.objects.create(nombre=f'Sintético {slug}', slug=slug, propietario=propietario)
+
+    cats = Categoria.objects.bulk_create(_con_texto_busqueda([
+        Categoria(restaurante=restaurante, nombre=f'Categoría {i}', orden=i % 3,
+                  imagen=f'categorias/{slug}_{i}.jpg' if i % 2 else None)
+        for i in range(categorias)
+    ]))
+    subs = Subcategoria.objects.bulk_create(_con_texto_busqueda([
+        Subcategoria(restaurante=restaurante, categoria=cat, nombre=f'Subcategoría {cat.id}-{j}', orden=j % 2)
+        for cat in cats
+        for j in range(subcategorias_por_categoria)
+    ]))
+    Comida.objects.bulk_create(_con_texto_busqueda([
+        Comida(
+            restaurante=restaurante,
+            categoria=subs[i % len(subs)].categoria,
+            # Algunas comidas sin subcategoría, como las cargadas antes de existir el campo
+            subcategoria=None if i % 50 == 0 else subs[i % len(subs)],
+            nombre=nombre,
+            descripcion=descripcion,
+            precio=Decimal(i % 3000) + Decimal('0.5'),
+            disponible=i % 7 != 0,
+            orden=i % 10,
+        )
+        for i, (nombre, descripcion) in enumerate(map(textos, range(total_comidas)))
+    ]))
+    # bulk_create no dispara las señales que mantienen los contadores
+    reconciliar([restaurante.id])
+    return restaurante
+
+
+def urls_de_verificacion(restaurante):
+    """
+    Endpoints públicos y del admin sobre un menú sintético, para los tests que los
+    recorren (tests/test_queries.py, tests/test_planes.py) y verificar_replicas.py.
+
+    Returns:
+        dict {'publico': [url, ...], 'admin': [url, ...]}
+    """
+    # Una comida visible en el menú, para que sus listados no salgan vacíos
+    comida = Comida.objects.filter(
+        restaurante=restaurante, subcategoria__isnull=False, disponible=True
+    ).select_related('categoria', 'subcategoria').order_by('id').first()
+    categoria, subcategoria = comida.categoria, comida.subcategoria
+    publico = f'?restaurante={restaurante.slug}'
+    return {
+        'publico': [
+            f'/api/menu/{publico}',
+            f'/api/categorias/{publico}',
+            f'/api/categorias/{categoria.id}/subcategorias/{publico}',
+            f'/api/subcategorias/{subcategoria.id}/comidas/{publico}',
+            f'/api/comidas/{publico}',
+            f'/api/comidas/{publico}&page_size=500',
+            f'/api/comidas/{publico}&fields=id,nombre,precio,subcategoria_nombre',
+            f'/api/comidas/{publico}&omit=descripcion&page_size=500',
+            f'/api/menu/{publico}&fields=id,nombre,precio',
+            f'/api/categorias/{publico}&omit=imagen',
+            f'/api/menus/?restaurantes={restaurante.slug}',
+            f'/api/menu/cambios/{publico}&desde=1',
+        ],
+        'admin': [
+            '/api/admin/categorias/',
+            f'/api/admin/categorias/{categoria.id}/',
+            f'/api/admin/categorias/{categoria.id}/subcategorias/',
+            f'/api/admin/subcategorias/{subcategoria.id}/',
+            f'/api/admin/categorias/{categoria.id}/comidas/',
+            f'/api/admin/subcategorias/{subcategoria.id}/comidas/',
+            '/api/admin/comidas/?page_size=500',
+            f'/api/admin/comidas/{comida.id}/',
+            '/api/admin/categorias/?omit=imagen',
+            '/api/admin/comidas/?fields=id,nombre,categoria_nombre&page_size=500',
+        ],
+    }
@@ -0,0 +1,163 @@
+"""
+Estadisticas - Contadores del menú por restaurante para los dashboards
+
+EstadisticasMenu guarda cuántas categorías, subcategorías y comidas tiene
+cada restaurante y la suma de los precios de sus comidas. Los dashboards la
+leen por clave primaria en vez de contar las tablas del menú.
+
+Las señales (signals.py) la actualizan de a incrementos en la misma
+transacción que el cambio: ConTextoBusqueda.save() es atómico y delete() ya
+manda post_delete dentro de la suya, también en los borrados en cascada.
+
+Lo que no pasa por save()/delete() (bulk_create, update(), loaddata, SQL a
+mano) desajusta los contadores: reconciliar() los recalcula contando, y el
+comando reconciliar_estadisticas lo corre para todos (periódicamente, p. ej.
+con cron, y en el release del Procfile después de loaddata).
+
+Las lecturas nunca escriben: a un restaurante sin fila (cargado con
+bulk_create o loaddata y todavía sin reconciliar) se le calculan los
+contadores en el momento, sin guardarlos (ver calcular()).
+"""
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import Categoria, Comida, EstadisticasMenu, Restaurante, Subcategoria
+
+
+CAMPO_POR_MODELO = {
+    Categoria: 'categorias',
+    Subcategoria: 'subcategorias',
+    Comida: 'comidas',
+}
+CAMPOS = ('categorias', 'subcategorias', 'comidas', 'suma_precios')
+
+
+def asegurar(restaurante_id):
+    """Crea los contadores (en cero) del restaurante si no los tiene. Se llama al guardar el Restaurante."""
+    EstadisticasMenu.objects.get_or_create(restaurante_id=restaurante_id)
+
+
+def sumar(restaurante_id, modelo, cantidad, precio=None):
+    """Suma `cantidad` (1 o -1) al contador de `modelo` y, para comidas, `precio` por cada una a la suma de precios."""
+    cambios = {CAMPO_POR_MODELO[modelo]: F(CAMPO_POR_MODELO[modelo]) + cantidad, 'actualizado': timezone.now()}
+    if precio:
+        cambios['suma_precios'] = F('suma_precios') + precio * cantidad
+    # Sin fila (restaurante borrándose o cargado con bulk_create) no hay nada que sumar
+    EstadisticasMenu.objects.filter(restaurante_id=restaurante_id).update(**cambios)
+
+
+def cambiar_precio(comida):
+    """
+    Ajusta la suma de precios por el precio nuevo de una comida existente, que
+    todavía no se guardó: el viejo se lee en la misma UPDATE.
+    """
+    precio_nuevo = Value(comida.precio, output_field=DecimalField())
+    # Sin fila guardada (pk asignado a mano en un alta) no hay diferencia: el alta suma el precio
+    precio_guardado = Coalesce(Subquery(Comida.objects.filter(pk=comida.pk).values('precio')[:1]), precio_nuevo)
+    EstadisticasMenu.objects.filter(restaurante_id=comida.restaurante_id).update(
+        suma_precios=F('suma_precios') + precio_nuevo - precio_guardado,
+        actualizado=timezone.now(),
+    )
+
+
+def _por_restaurante(queryset, expresion):
+    """Agregado correlacionado de `queryset` para cada restaurante de la consulta externa."""
+    return Subquery(
+        queryset.filter(restaurante=OuterRef('pk')).order_by().values('restaurante')
+        .annotate(valor=expresion).values('valor')
+    )
+
+
+def contar(restaurante_ids=None):
+    """
+    Contadores calculados desde las tablas del menú, en una sola query.
+
+    Returns:
+        dict {restaurante_id: {'categorias', 'subcategorias', 'comidas', 'suma_precios'}}
+    """
+    restaurantes = Restaurante.objects.all()
+    if restaurante_ids is not None:
+        restaurantes = restaurantes.filter(pk__in=restaurante_ids)
+    # Con prefijo: categorias, subcategorias y comidas son las relaciones inversas de Restaurante
+    filas = restaurantes.annotate(
+        contador_categorias=Coalesce(_por_restaurante(Categoria.objects.all(), Count('pk')), 0),
+        contador_subcategorias=Coalesce(_por_restaurante(Subcategoria.objects.all(), Count('pk')), 0),
+        contador_comidas=Coalesce(_por_restaurante(Comida.objects.all(), Count('pk')), 0),
+        contador_suma_precios=Coalesce(
+            _por_restaurante(Comida.objects.all(), Sum('precio')), Value(0), output_field=DecimalField()
+        ),
+    ).order_by().values_list('pk', *[f'contador_{campo}' for campo in CAMPOS])
+    return {fila[0]: dict(zip(CAMPOS, fila[1:])) for fila in filas}
+
+
+def reconciliar(restaurante_ids=None):
+    """
+    Recalcula los contadores (todos, o los de `restaurante_ids`) y crea los que
+    falten.
+
+    Las filas existentes se bloquean antes de contar: un alta concurrente que
+    todavía no commiteó espera para sumar su incremento sobre el valor
+    recalculado, que no la incluye.
+
+    Returns:
+        dict {restaurante_id: (antes o None, después)} de los que no coincidían
+    """
+    with transaction.atomic():
+        guardadas = EstadisticasMenu.objects.select_for_update()
+        if restaurante_ids is not None:
+            guardadas = guardadas.filter(restaurante_id__in=restaurante_ids)
+        antes = {fila[0]: dict(zip(CAMPOS, fila[1:])) for fila in guardadas.values_list('restaurante_id', *CAMPOS)}
+
+        diferencias = {}
+        ahora = timezone.now()
+        for restaurante_id, contadores in contar(restaurante_ids).items():
+            anteriores = antes.get(restaurante_id)
+            if anteriores == contadores:
+                continue
+            diferencias[restaurante_id] = (anteriores, contadores)
+            EstadisticasMenu.objects.update_or_create(
+                restaurante_id=restaurante_id, defaults={**contadores, 'actualizado': ahora}
+            )
+    return diferencias
+
+
+def calcular(restaurante_ids):
+    """
+    Contadores calculados desde las tablas del menú, sin guardarlos: para
+    mostrar los de restaurantes sin fila en un GET, que no escribe.
+
+    Returns:
+        dict {restaurante_id: EstadisticasMenu sin guardar}
+    """
+    return {
+        restaurante_id: EstadisticasMenu(restaurante_id=restaurante_id, **contadores)
+        for restaurante_id, contadores in contar(restaurante_ids).items()
+    }
+
+
+def leer(restaurante_id):
+    """
+    Contadores del restaurante (una lectura por clave primaria); si no tiene
+    fila, calculados sin guardarlos. None si el restaurante no existe.
+    """
+    fila = EstadisticasMenu.objects.filter(restaurante_id=restaurante_id).first()
+    if fila is None:
+        fila = calcular([restaurante_id]).get(restaurante_id)
+    return fila
+
+
+def totales():
+    """Suma de los contadores de todos los restaurantes, en una query."""
+    suma = EstadisticasMenu.objects.aggregate(
+        categorias=Coalesce(Sum('categorias'), 0),
+        subcategorias=Coalesce(Sum('subcategorias'), 0),
+        comidas=Coalesce(Sum('comidas'), 0),
+        suma_precios=Coalesce(Sum('suma_precios'), Value(0), output_field=DecimalField()),
+    )
+    return EstadisticasMenu(**suma)
+
+
+def como_dict(fila):
+    """Las cantidades con la forma que usan los dashboards."""
+    return {'categorias': fila.categorias, 'subcategorias': fila.subcategorias, 'comidas': fila.comidas}
@@ -0,0 +1,240 @@
+"""
+Eventos - Cambios del menú en vivo por Server-Sent Events
+
+    GET /api/menu/eventos/?restaurante=<slug>     (solo bajo ASGI: proceso eventos del Procfile)
+
+Cada conexión recibe primero la versión vigente del menú y después un evento
+por cada cambio commiteado (p. ej. una comida que se queda sin stock):
+
+    id: 42
+    event: menu
+    data: {"desde":41,"version":42,"comidas":[{"id":7,"disponible":false,"precio":"1200.00"}]}
+
+El evento es compacto: estado de disponibilidad y precio de las comidas
+tocadas, ids de las borradas y de las categorías y subcategorías tocadas. Si
+`desde` no es la versión que tiene el cliente (se perdió eventos, o le cambió
+algo más que disponibilidad y precio), el cliente pide el delta completo a
+/api/menu/cambios/?desde=<su versión> (ver sincronizacion.py). Al reconectar,
+el navegador manda Last-Event-ID y el primer evento le dice si quedó atrás.
+
+Fan-out: cada proceso tiene un broker (settings.EVENTOS_BROKER) con una cola
+acotada por conexión, agrupadas por restaurante. Una conexión ociosa es una
+corrutina esperando su cola; el mensaje de cada cambio se arma y se
+serializa una sola vez para todas las conexiones del restaurante. Si un
+cliente lento llena su cola, se descartan sus eventos más viejos (la
+diferencia de `desde` lo manda a pedir el delta).
+
+Brokers:
+- BrokerEnProceso: lo despierta registrar_cambio al commitear (ver
+  cambios.py). Alcanza con un solo proceso que atiende el admin y los
+  eventos, como en desarrollo.
+- BrokerBaseDeDatos: además consulta VersionMenu cada EVENTOS_INTERVALO
+  segundos, una query por proceso para todos sus restaurantes suscriptos, y
+  arma los eventos desde el registro de cambios. Así ve los cambios
+  commiteados por otros procesos o servidores (SQLite o PostgreSQL) sin un
+  pub/sub externo.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+from .models import Comida, VersionMenu
+from .serializacion_rapida import formatear_precio
+from .sincronizacion import CLAVES, ultimas_entradas
+
+
+logger = logging.getLogger(__name__)
+
+_broker = None
+
+
+def evento(restaurante_id, desde, version):
+    """
+    Datos del evento con los cambios entre las versiones `desde` (excluida) y
+    `version`.
+
+    Returns:
+        dict {'desde', 'version', y 'comidas', 'borrados', 'categorias',
+        'subcategorias', 'restaurante' si hubo cambios de ese tipo}
+    """
+    modificadas, borradas, otros = [], [], {}
+    for (tipo, objeto_id), borrado in ultimas_entradas(restaurante_id, desde, version).items():
+        if tipo == 'comida':
+            (borradas if borrado else modificadas).append(objeto_id)
+        elif tipo == 'restaurante':
+            otros['restaurante'] = True
+        else:
+            otros.setdefault(CLAVES[tipo], []).append(objeto_id)
+
+    datos = {'desde': desde, 'version': version}
+    if modificadas:
+        filas = Comida.objects.filter(restaurante_id=restaurante_id, id__in=modificadas).order_by('id').values_list(
+            'id', 'disponible', 'precio'
+        )
+        datos['comidas'] = [
+            {'id': comida_id, 'disponible': disponible, 'precio': formatear_precio(precio)}
+            for comida_id, disponible, precio in filas
+        ]
+        # Modificada según el registro pero ya no está: se borró después de `version`
+        presentes = {comida['id'] for comida in datos['comidas']}
+        borradas.extend(comida_id for comida_id in modificadas if comida_id not in presentes)
+    if borradas:
+        datos['borrados'] = sorted(borradas)
+    for clave, valor in otros.items():
+        datos[clave] = sorted(valor) if isinstance(valor, list) else valor
+    return datos
+
+
+def mensaje(tipo, datos, version=None):
+    """Bytes de un evento SSE; `version` va como id (lo devuelve el navegador en Last-Event-ID)."""
+    lineas = [f'id: {version}'] if version is not None else []
+    lineas += [f'event: {tipo}', f'data: {json.dumps(datos, separators=(",", ":"))}']
+    return ('\n'.join(lineas) + '\n\n').encode()
+
+
+def eventos_nuevos(versiones):
+    """
+    Mensajes de los restaurantes cuyo menú pasó la versión ya difundida.
+    Una query si no cambió ninguno.
+
+    Args:
+        versiones: dict {restaurante_id: última versión difundida}
+
+    Returns:
+        lista de (restaurante_id, version, mensaje)
+    """
+    nuevos = []
+    actuales = VersionMenu.objects.filter(restaurante_id__in=list(versiones)).values_list('restaurante_id', 'numero')
+    for restaurante_id, numero in actuales:
+        desde = versiones[restaurante_id]
+        if numero > desde:
+            nuevos.append((restaurante_id, numero, mensaje('menu', evento(restaurante_id, desde, numero), numero)))
+    return nuevos
+
+
+class BrokerEnProceso:
+    """
+    Fan-out de los eventos a las conexiones de este proceso. Los cambios los
+    avisa publicar() desde el hilo que commitea; la lectura de los eventos y
+    el reparto corren en una sola tarea del event loop.
+    """
+    # Segundos entre consultas a la base sin aviso de publicar() (None: solo avisos)
+    intervalo = None
+
+    def __init__(self):
+        self.suscriptores = {}  # restaurante_id → set de colas, una por conexión
+        self.versiones = {}     # restaurante_id → última versión difundida
+        self.loop = None
+        self.despertar = None
+        self.tarea = None
+
+    def suscribir(self, restaurante_id, version):
+        """Cola de mensajes de una conexión nueva; se llama desde el event loop."""
+        if self.loop is not asyncio.get_running_loop():
+            self.loop = asyncio.get_running_loop()
+            self.despertar = asyncio.Event()
+            self.tarea = None
+        if self.tarea is None or self.tarea.done():
+            # Contexto propio: la tarea no hereda el de la request que la crea
+            # (p. ej. la lectura en réplica de replicas.en_replica)
+            self.tarea = self.loop.create_task(self.difundir(), context=contextvars.Context())
+        cola = asyncio.Queue(maxsize=settings.EVENTOS_COLA_MAXIMA)
+        self.suscriptores.setdefault(restaurante_id, set()).add(cola)
+        self.versiones.setdefault(restaurante_id, version)
+        return cola
+
+    def desuscribir(self, restaurante_id, cola):
+        colas = self.suscriptores.get(restaurante_id)
+        if colas is None:
+            return
+        colas.discard(cola)
+        if not colas:
+            del self.suscriptores[restaurante_id]
+            self.versiones.pop(restaurante_id, None)
+
+    def publicar(self, restaurante_id):
+        """Avisa que el menú del restaurante cambió. Se puede llamar desde cualquier hilo."""
+        if self.loop is not None and restaurante_id in self.suscriptores:
+            self.loop.call_soon_threadsafe(self.despertar.set)
+
+    async def esperar(self):
+        try:
+            await asyncio.wait_for(self.despertar.wait(), self.intervalo)
+        except asyncio.TimeoutError:
+            pass
+        self.despertar.clear()
+
+    async def difundir(self):
+        while True:
+            await self.esperar()
+            if not self.versiones:
+                continue
+            try:
+                nuevos = await sync_to_async(eventos_nuevos)(dict(self.versiones))
+            except Exception:
+                logger.exception('No se pudieron leer los cambios del menú')
+                continue
+            for restaurante_id, version, datos in nuevos:
+                if restaurante_id not in self.suscriptores:
+                    continue
+                self.versiones[restaurante_id] = max(version, self.versiones.get(restaurante_id, 0))
+                for cola in self.suscriptores[restaurante_id]:
+                    entregar(cola, datos)
+
+
+class BrokerBaseDeDatos(BrokerEnProceso):
+    """BrokerEnProceso que además ve los cambios de otros procesos consultando la base."""
+
+    @property
+    def intervalo(self):
+        return settings.EVENTOS_INTERVALO
+
+
+def entregar(cola, datos):
+    # Cliente lento con la cola llena: pierde el evento más viejo, no bloquea a los demás
+    if cola.full():
+        cola.get_nowait()
+    cola.put_nowait(datos)
+
+
+def obtener_broker():
+    """Broker de este proceso (settings.EVENTOS_BROKER), creado al primer uso."""
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.EVENTOS_BROKER)()
+    return _broker
+
+
+def publicar(restaurante_id):
+    """
+    Lo llama registrar_cambio al commitear. En un proceso sin conexiones de
+    eventos (p. ej. un worker WSGI del admin) no hay broker y no hace nada.
+    """
+    if _broker is not None:
+        _broker.publicar(restaurante_id)
+
+
+async def flujo(restaurante_id, version):
+    """
+    Cuerpo de la respuesta SSE de una conexión: la versión vigente, los
+    eventos del menú y un comentario cada EVENTOS_LATIDO segundos para que
+    los proxies no corten la conexión ociosa. Al desconectarse el cliente,
+    el servidor ASGI cancela la iteración y la conexión se desuscribe.
+    """
+    broker = obtener_broker()
+    cola = broker.suscribir(restaurante_id, version)
+    try:
+        yield f'retry: {settings.EVENTOS_REINTENTO_MS}\n\n'.encode() + mensaje('version', {'version': version}, version)
+        while True:
+            # asyncio.timeout y no wait_for: no crea una tarea por espera de cada conexión
+            try:
+                async with asyncio.timeout(settings.EVENTOS_LATIDO):
+                    parte = await cola.get()
+            except TimeoutError:
+                parte = b': latido\n\n'
+            yield parte
+    finally:
+        broker.desuscribir(restaurante_id, cola)
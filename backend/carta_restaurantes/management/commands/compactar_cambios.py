@@ -0,0 +1,28 @@
+"""
+Compacta el registro de cambios del menú (ver sincronizacion.py).
+
+Borra las entradas de más de --dias días. Los clientes que pidan un delta
+desde una versión compactada reciben {"resincronizar": true} y vuelven a
+bajar el menú completo.
+
+Uso:
+    python manage.py compactar_cambios
+    python manage.py compactar_cambios --dias 7
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from carta_restaurantes.sincronizacion import compactar
+
+
+class Command(BaseCommand):
+    help = 'Borra las entradas viejas del registro de cambios del menú'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=30, help='Antigüedad máxima de las entradas que se conservan')
+
+    def handle(self, *args, **options):
+        if options['dias'] < 0:
+            raise CommandError('--dias no puede ser negativo')
+        borradas = compactar(timezone.now() - timedelta(days=options['dias']))
+        self.stdout.write(self.style.SUCCESS(f'Entradas del registro de cambios borradas: {borradas}'))
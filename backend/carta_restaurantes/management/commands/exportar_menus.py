@@ -0,0 +1,42 @@
+"""
+Exporta el menú de cada restaurante activo a archivos estáticos (JSON + HTML).
+
+Pensado para la fase release del Procfile, después de reconstruir_snapshots:
+solo reescribe los restaurantes cuyo menú cambió desde el export anterior.
+Ver menus_estaticos.py.
+
+Uso:
+    python manage.py exportar_menus
+    python manage.py exportar_menus --restaurante pizzeria-mario
+    python manage.py exportar_menus --destino /var/www/menus
+"""
+from django.core.management.base import BaseCommand, CommandError
+from carta_restaurantes.menus_estaticos import exportar_menus
+from carta_restaurantes.models import Restaurante
+
+
+class Command(BaseCommand):
+    help = 'Exporta los menús públicos a un directorio estático con nombres por hash de contenido'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurante', action='append', help='Slug de un restaurante (se puede repetir)')
+        parser.add_argument('--destino', help='Directorio de salida (por defecto MENUS_ESTATICOS_ROOT)')
+
+    def handle(self, *args, **options):
+        slugs = options['restaurante']
+        if slugs:
+            encontrados = set(Restaurante.objects.filter(slug__in=slugs, activo=True).values_list('slug', flat=True))
+            faltantes = [slug for slug in slugs if slug not in encontrados]
+            if faltantes:
+                raise CommandError(f"No existen restaurantes activos con slug: {', '.join(faltantes)}")
+
+        resultado = exportar_menus(raiz=options['destino'], slugs=slugs)
+
+        for slug in resultado['escritos']:
+            self.stdout.write(f'  escrito      {slug}')
+        for slug in resultado['eliminados']:
+            self.stdout.write(f'  eliminado    {slug}')
+        self.stdout.write(self.style.SUCCESS(
+            f"Menús exportados: {len(resultado['escritos'])} escritos, "
+            f"{len(resultado['sin_cambios'])} sin cambios, {len(resultado['eliminados'])} eliminados"
+        ))
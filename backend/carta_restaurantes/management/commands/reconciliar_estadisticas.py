@@ -0,0 +1,28 @@
+"""
+Reconcilia los contadores de los dashboards (ver estadisticas.py) con las
+tablas del menú.
+
+Los contadores se mantienen de a incrementos; lo que no pasa por save() o
+delete() (bulk_create, update(), loaddata) los desajusta. Este comando los
+recalcula contando y muestra los que no coincidían. Pensado para correr
+periódicamente (p. ej. una vez por día con cron).
+
+Uso:
+    python manage.py reconciliar_estadisticas
+    python manage.py reconciliar_estadisticas --restaurante 3 --restaurante 7
+"""
+from django.core.management.base import BaseCommand
+from carta_restaurantes.estadisticas import reconciliar
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los contadores de categorías, subcategorías y comidas de cada restaurante'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurante', type=int, action='append', help='Id; por defecto, todos')
+
+    def handle(self, *args, **options):
+        diferencias = reconciliar(options['restaurante'])
+        for restaurante_id, (antes, despues) in sorted(diferencias.items()):
+            self.stdout.write(f'  restaurante {restaurante_id}: {antes or "sin contadores"} → {despues}')
+        self.stdout.write(self.style.SUCCESS(f'Contadores corregidos: {len(diferencias)}'))
@@ -0,0 +1,38 @@
+"""
+Reconstruye los snapshots de menú de todos los restaurantes (o de uno por slug)
+y su índice de búsqueda, y crea el contador de versión a los que no lo
+tienen. En el release va después de loaddata, que guarda en modo raw y no
+dispara las signals.
+
+Uso:
+    python manage.py reconstruir_snapshots
+    python manage.py reconstruir_snapshots --restaurante pizzeria-mario
+"""
+from django.core.management.base import BaseCommand, CommandError
+from carta_restaurantes.busqueda import reindexar_restaurante
+from carta_restaurantes.models import Restaurante
+from carta_restaurantes.snapshots import reconstruir_snapshots
+from carta_restaurantes.versiones import asegurar_version
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los snapshots pre-serializados del menú público y el índice de búsqueda'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurante', help='Slug de un único restaurante')
+
+    def handle(self, *args, **options):
+        restaurantes = Restaurante.objects.all()
+        if options['restaurante']:
+            restaurantes = restaurantes.filter(slug=options['restaurante'])
+            if not restaurantes.exists():
+                raise CommandError(f"No existe el restaurante '{options['restaurante']}'")
+
+        total = 0
+        for restaurante_id in restaurantes.values_list('id', flat=True):
+            asegurar_version(restaurante_id)
+            reconstruir_snapshots(restaurante_id)
+            reindexar_restaurante(restaurante_id)
+            total += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Snapshots reconstruidos para {total} restaurante(s)'))
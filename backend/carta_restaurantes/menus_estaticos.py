@@ -0,0 +1,147 @@
+"""
+Menús estáticos - Export del menú público a archivos para WhiteNoise o un CDN
+
+Por cada restaurante activo se escribe en MENUS_ESTATICOS_ROOT:
+
+    <slug>/menu.<hash>.json    mismo JSON que /api/menu/
+    <slug>/index.<hash>.html   página mínima del menú
+    <slug>/menu.json, <slug>/index.html   copias con nombre fijo
+    manifest.json              slug → versión y nombres con hash vigentes
+
+Los nombres con hash de contenido son inmutables (WhiteNoise los sirve con
+caché "para siempre"); las copias de nombre fijo y el manifest son el punto de
+entrada. Cada archivo va acompañado de sus variantes .gz y .br, que WhiteNoise
+elige según Accept-Encoding.
+
+Solo se reescriben los restaurantes cuyo contenido cambió desde el export
+anterior (según el manifest). Se conserva la generación previa de archivos con
+hash para los clientes que todavía la referencian.
+"""
+import hashlib
+import json
+import os
+import shutil
+from django.conf import settings
+from django.template.loader import render_to_string
+from rest_framework.renderers import JSONRenderer
+from .models import Restaurante
+from . import compresion, serializacion_rapida, snapshots
+
+
+MANIFEST = 'manifest.json'
+LARGO_HASH = 12  # El mismo largo que reconoce WhiteNoise como archivo inmutable
+
+
+def _hash(contenido):
+    return hashlib.sha256(contenido).hexdigest()[:LARGO_HASH]
+
+
+def _escribir(ruta, contenido):
+    """Escritura atómica del archivo y de sus variantes comprimidas."""
+    contenido_gzip, contenido_br = compresion.comprimir(contenido)
+    variantes = {ruta: contenido, f'{ruta}.gz': contenido_gzip, f'{ruta}.br': contenido_br}
+    for destino, datos in variantes.items():
+        if datos is None:
+            if os.path.exists(destino):
+                os.remove(destino)
+            continue
+        temporal = f'{destino}.tmp'
+        with open(temporal, 'wb') as archivo:
+            archivo.write(datos)
+        os.replace(temporal, destino)
+
+
+def leer_manifest(raiz):
+    try:
+        with open(os.path.join(raiz, MANIFEST), encoding='utf-8') as archivo:
+            return json.load(archivo)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _menu_json(restaurante):
+    """JSON del menú: el snapshot si existe, si no se serializa en el momento."""
+    snapshot = snapshots.obtener_snapshot(restaurante.id, snapshots.CLAVE_MENU)
+    if snapshot is not None:
+        return snapshot[0]
+    return JSONRenderer().render(serializacion_rapida.menu(restaurante))
+
+
+def exportar_restaurante(restaurante, raiz, anterior=None):
+    """
+    Exporta el menú de un restaurante si cambió respecto de `anterior`
+    (su entrada del manifest).
+
+    Returns:
+        (entrada del manifest, True si se escribieron archivos)
+    """
+    contenido_json = _menu_json(restaurante)
+    archivo_json = f'menu.{_hash(contenido_json)}.json'
+    contenido_html = render_to_string('publico/menu.html', {
+        'menu': json.loads(contenido_json),
+        'archivo_json': archivo_json,
+    }).encode('utf-8')
+    archivo_html = f'index.{_hash(contenido_html)}.html'
+
+    entrada = {
+        'id': restaurante.id,
+        'version': getattr(getattr(restaurante, 'version_menu', None), 'numero', None),
+        'json': f'{restaurante.slug}/{archivo_json}',
+        'html': f'{restaurante.slug}/{archivo_html}',
+    }
+    directorio = os.path.join(raiz, restaurante.slug)
+    vigentes = {os.path.join(raiz, entrada['json']), os.path.join(raiz, entrada['html'])}
+    if anterior and anterior['json'] == entrada['json'] and anterior['html'] == entrada['html'] \
+            and all(os.path.exists(ruta) for ruta in vigentes):
+        return dict(anterior, version=entrada['version']), False
+
+    os.makedirs(directorio, exist_ok=True)
+    _escribir(os.path.join(directorio, archivo_json), contenido_json)
+    _escribir(os.path.join(directorio, archivo_html), contenido_html)
+    _escribir(os.path.join(directorio, 'menu.json'), contenido_json)
+    _escribir(os.path.join(directorio, 'index.html'), contenido_html)
+
+    # Se conservan la generación nueva y la anterior; el resto se borra
+    conservar = {os.path.basename(ruta) for ruta in vigentes} | {'menu.json', 'index.html'}
+    if anterior:
+        conservar |= {os.path.basename(anterior['json']), os.path.basename(anterior['html'])}
+    for nombre in os.listdir(directorio):
+        base = nombre[:-3] if nombre.endswith(('.gz', '.br')) else nombre
+        if base not in conservar:
+            os.remove(os.path.join(directorio, nombre))
+
+    return entrada, True
+
+
+def exportar_menus(raiz=None, slugs=None):
+    """
+    Exporta los menús de los restaurantes activos (o solo de `slugs`) y
+    actualiza el manifest. Sin `slugs`, borra los directorios de los
+    restaurantes que ya no están activos.
+
+    Returns:
+        dict con las listas 'escritos', 'sin_cambios' y 'eliminados' (slugs)
+    """
+    raiz = str(raiz or settings.MENUS_ESTATICOS_ROOT)
+    os.makedirs(raiz, exist_ok=True)
+    manifest = leer_manifest(raiz)
+    resultado = {'escritos': [], 'sin_cambios': [], 'eliminados': []}
+
+    restaurantes = Restaurante.objects.filter(activo=True).select_related('version_menu').order_by('slug')
+    if slugs:
+        restaurantes = restaurantes.filter(slug__in=slugs)
+
+    for restaurante in restaurantes:
+        entrada, escrito = exportar_restaurante(restaurante, raiz, manifest.get(restaurante.slug))
+        manifest[restaurante.slug] = entrada
+        resultado['escritos' if escrito else 'sin_cambios'].append(restaurante.slug)
+
+    if not slugs:
+        activos = {restaurante.slug for restaurante in restaurantes}
+        for slug in [slug for slug in manifest if slug not in activos]:
+            shutil.rmtree(os.path.join(raiz, slug), ignore_errors=True)
+            del manifest[slug]
+            resultado['eliminados'].append(slug)
+
+    _escribir(os.path.join(raiz, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return resultado
@@ -0,0 +1,35 @@
+"""
+Middleware - Adaptaciones del stack de middleware para el servidor ASGI
+
+WhiteNoiseMiddleware es solo sync: bajo ASGI, Django pasaría cada request por
+un hilo para atravesarlo y las vistas async de views.py perderían la ventaja
+de no ocupar uno mientras esperan. WhiteNoiseAsync atiende en el event loop
+todo lo que no es un archivo estático y lleva a un hilo solo los estáticos.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class WhiteNoiseAsync(WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            # DEBUG: busca el archivo en disco en cada request
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
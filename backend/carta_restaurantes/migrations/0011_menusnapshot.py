@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carta_restaurantes', '0010_comida_restaurante'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=100, verbose_name='Clave')),
+                ('contenido', models.BinaryField(verbose_name='Contenido')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('restaurante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='carta_restaurantes.restaurante', verbose_name='Restaurante')),
+            ],
+            options={
+                'verbose_name': 'Snapshot de menú',
+                'verbose_name_plural': 'Snapshots de menú',
+                'constraints': [models.UniqueConstraint(fields=('restaurante', 'clave'), name='snapshot_unico_por_clave')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def crear_versiones(apps, schema_editor):
+    Restaurante = apps.get_model('carta_restaurantes', 'Restaurante')
+    VersionMenu = apps.get_model('carta_restaurantes', 'VersionMenu')
+    VersionMenu.objects.bulk_create([
+        VersionMenu(restaurante_id=restaurante_id)
+        for restaurante_id in Restaurante.objects.values_list('id', flat=True)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carta_restaurantes', '0011_menusnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionMenu',
+            fields=[
+                ('restaurante', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='version_menu', serialize=False, to='carta_restaurantes.restaurante', verbose_name='Restaurante')),
+                ('numero', models.PositiveBigIntegerField(default=1, verbose_name='Número')),
+                ('actualizado', models.DateTimeField(auto_now_add=True, verbose_name='Actualizado')),
+            ],
+            options={
+                'verbose_name': 'Versión de menú',
+                'verbose_name_plural': 'Versiones de menú',
+            },
+        ),
+        migrations.AddField(
+            model_name='menusnapshot',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Versión del menú'),
+        ),
+        migrations.RunPython(crear_versiones, migrations.RunPython.noop),
+    ]
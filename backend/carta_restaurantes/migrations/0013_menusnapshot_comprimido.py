@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carta_restaurantes', '0012_versionmenu'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menusnapshot',
+            name='contenido_br',
+            field=models.BinaryField(blank=True, null=True, verbose_name='Contenido brotli'),
+        ),
+        migrations.AddField(
+            model_name='menusnapshot',
+            name='contenido_gzip',
+            field=models.BinaryField(blank=True, null=True, verbose_name='Contenido gzip'),
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# DDL del índice de texto completo (tabla FTS5 y triggers en SQLite, índice GIN en
+# PostgreSQL), escrito acá y no importado de busqueda.py para que la migración no cambie
+# si cambia ese módulo. VECTOR_PG es copia de busqueda.VECTOR_PG y deben coincidir para
+# que PostgreSQL use el índice.
+TABLA = 'carta_restaurantes_indicebusqueda'
+TABLA_FTS = 'carta_restaurantes_indicebusqueda_fts'
+COLUMNAS_FTS = 'restaurante, nombre, descripcion, categoria, subcategoria'
+VALORES_FTS = 'new.comida_id, new.restaurante_id, new.nombre, new.descripcion, new.categoria, new.subcategoria'
+VECTOR_PG = (
+    "setweight(to_tsvector('spanish', nombre), 'A') || "
+    "setweight(to_tsvector('spanish', categoria || ' ' || subcategoria), 'B') || "
+    "setweight(to_tsvector('spanish', descripcion), 'C')"
+)
+
+SQL_INDICE = {
+    'sqlite': [
+        f"CREATE VIRTUAL TABLE {TABLA_FTS} USING fts5({COLUMNAS_FTS}, tokenize = 'unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {TABLA_FTS}_insert AFTER INSERT ON {TABLA} BEGIN "
+        f"INSERT INTO {TABLA_FTS} (rowid, {COLUMNAS_FTS}) VALUES ({VALORES_FTS}); END",
+        f"CREATE TRIGGER {TABLA_FTS}_delete AFTER DELETE ON {TABLA} BEGIN "
+        f"DELETE FROM {TABLA_FTS} WHERE rowid = old.comida_id; END",
+        f"CREATE TRIGGER {TABLA_FTS}_update AFTER UPDATE ON {TABLA} BEGIN "
+        f"DELETE FROM {TABLA_FTS} WHERE rowid = old.comida_id; "
+        f"INSERT INTO {TABLA_FTS} (rowid, {COLUMNAS_FTS}) VALUES ({VALORES_FTS}); END",
+    ],
+    'postgresql': [
+        f"CREATE INDEX {TABLA}_documento_gin ON {TABLA} USING GIN (({VECTOR_PG}))",
+    ],
+}
+
+SQL_BORRAR_INDICE = {
+    'sqlite': [
+        f'DROP TRIGGER IF EXISTS {TABLA_FTS}_insert',
+        f'DROP TRIGGER IF EXISTS {TABLA_FTS}_delete',
+        f'DROP TRIGGER IF EXISTS {TABLA_FTS}_update',
+        f'DROP TABLE IF EXISTS {TABLA_FTS}',
+    ],
+    'postgresql': [
+        f'DROP INDEX IF EXISTS {TABLA}_documento_gin',
+    ],
+}
+
+
+def crear_indice(apps, schema_editor):
+    for sql in SQL_INDICE.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def borrar_indice(apps, schema_editor):
+    for sql in SQL_BORRAR_INDICE.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def poblar_indice(apps, schema_editor):
+    Comida = apps.get_model('carta_restaurantes', 'Comida')
+    IndiceBusqueda = apps.get_model('carta_restaurantes', 'IndiceBusqueda')
+    filas = Comida.objects.filter(restaurante__activo=True, disponible=True).values_list(
+        'id', 'restaurante_id', 'nombre', 'descripcion', 'categoria__nombre', 'subcategoria__nombre'
+    )
+    IndiceBusqueda.objects.bulk_create([
+        IndiceBusqueda(
+            comida_id=comida_id, restaurante_id=restaurante_id, nombre=nombre,
+            descripcion=descripcion, categoria=categoria or '', subcategoria=subcategoria or '',
+        )
+        for comida_id, restaurante_id, nombre, descripcion, categoria, subcategoria in filas
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carta_restaurantes', '0013_menusnapshot_comprimido'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndiceBusqueda',
+            fields=[
+                ('comida', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='indice_busqueda', serialize=False, to='carta_restaurantes.comida', verbose_name='Comida')),
+                ('nombre', models.CharField(max_length=100, verbose_name='Nombre')),
+                ('descripcion', models.TextField(blank=True, verbose_name='Descripción')),
+                ('categoria', models.CharField(blank=True, max_length=100, verbose_name='Categoría')),
+                ('subcategoria', models.CharField(blank=True, max_length=100, verbose_name='Subcategoría')),
+                ('restaurante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='indice_busqueda', to='carta_restaurantes.restaurante', verbose_name='Restaurante')),
+            ],
+            options={
+                'verbose_name': 'Índice de búsqueda',
+                'verbose_name_plural': 'Índice de búsqueda',
+            },
+        ),
+        migrations.RunPython(crear_indice, borrar_indice),
+        migrations.RunPython(poblar_indice, migrations.RunPython.noop),
+    ]
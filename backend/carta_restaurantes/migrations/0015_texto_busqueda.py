@@ -0,0 +1,139 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:02
+
+import re
+import unicodedata
+from django.db import migrations, models
+
+
+# Copia congelada de normalizacion.normalizar
+def normalizar(texto):
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    sin_acentos = ''.join(caracter for caracter in descompuesto if not unicodedata.combining(caracter))
+    return ' '.join(re.findall(r'\w+', sin_acentos.lower()))
+
+
+TABLA = 'carta_restaurantes_indicebusqueda'
+TABLA_FTS = 'carta_restaurantes_indicebusqueda_fts'
+TABLA_TRIGRAMAS = 'carta_restaurantes_indicebusqueda_trigramas'
+COLUMNAS_FTS = 'restaurante, nombre, descripcion, categoria, subcategoria'
+VALORES_FTS = 'new.comida_id, new.restaurante_id, new.nombre, new.descripcion, new.categoria, new.subcategoria'
+# El restaurante entre '#' para que "#1#" no coincida como subcadena de "#12#"
+VALORES_TRIGRAMAS = "new.comida_id, '#' || new.restaurante_id || '#', new.texto"
+
+# En SQLite, AddField sobre IndiceBusqueda recrea la tabla y se lleva los
+# triggers de 0014: se vuelven a crear, ahora alimentando también el FTS5 de trigramas
+SQL_INDICE = {
+    'sqlite': [
+        f'DROP TRIGGER IF EXISTS {TABLA_FTS}_insert',
+        f'DROP TRIGGER IF EXISTS {TABLA_FTS}_delete',
+        f'DROP TRIGGER IF EXISTS {TABLA_FTS}_update',
+        f"CREATE VIRTUAL TABLE {TABLA_TRIGRAMAS} USING fts5(restaurante, texto, tokenize = 'trigram')",
+        f"CREATE TRIGGER {TABLA_FTS}_insert AFTER INSERT ON {TABLA} BEGIN "
+        f"INSERT INTO {TABLA_FTS} (rowid, {COLUMNAS_FTS}) VALUES ({VALORES_FTS}); "
+        f"INSERT INTO {TABLA_TRIGRAMAS} (rowid, restaurante, texto) VALUES ({VALORES_TRIGRAMAS}); END",
+        f"CREATE TRIGGER {TABLA_FTS}_delete AFTER DELETE ON {TABLA} BEGIN "
+        f"DELETE FROM {TABLA_FTS} WHERE rowid = old.comida_id; "
+        f"DELETE FROM {TABLA_TRIGRAMAS} WHERE rowid = old.comida_id; END",
+        f"CREATE TRIGGER {TABLA_FTS}_update AFTER UPDATE ON {TABLA} BEGIN "
+        f"DELETE FROM {TABLA_FTS} WHERE rowid = old.comida_id; "
+        f"DELETE FROM {TABLA_TRIGRAMAS} WHERE rowid = old.comida_id; "
+        f"INSERT INTO {TABLA_FTS} (rowid, {COLUMNAS_FTS}) VALUES ({VALORES_FTS}); "
+        f"INSERT INTO {TABLA_TRIGRAMAS} (rowid, restaurante, texto) VALUES ({VALORES_TRIGRAMAS}); END",
+    ],
+    'postgresql': [
+        'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+        f'CREATE INDEX {TABLA}_texto_trgm ON {TABLA} USING GIN (texto gin_trgm_ops)',
+    ],
+}
+
+# Vuelve a los triggers de 0014
+SQL_BORRAR_INDICE = {
+    'sqlite': [
+        f'DROP TRIGGER IF EXISTS {TABLA_FTS}_insert',
+        f'DROP TRIGGER IF EXISTS {TABLA_FTS}_delete',
+        f'DROP TRIGGER IF EXISTS {TABLA_FTS}_update',
+        f'DROP TABLE IF EXISTS {TABLA_TRIGRAMAS}',
+        f"CREATE TRIGGER {TABLA_FTS}_insert AFTER INSERT ON {TABLA} BEGIN "
+        f"INSERT INTO {TABLA_FTS} (rowid, {COLUMNAS_FTS}) VALUES ({VALORES_FTS}); END",
+        f"CREATE TRIGGER {TABLA_FTS}_delete AFTER DELETE ON {TABLA} BEGIN "
+        f"DELETE FROM {TABLA_FTS} WHERE rowid = old.comida_id; END",
+        f"CREATE TRIGGER {TABLA_FTS}_update AFTER UPDATE ON {TABLA} BEGIN "
+        f"DELETE FROM {TABLA_FTS} WHERE rowid = old.comida_id; "
+        f"INSERT INTO {TABLA_FTS} (rowid, {COLUMNAS_FTS}) VALUES ({VALORES_FTS}); END",
+    ],
+    'postgresql': [
+        f'DROP INDEX IF EXISTS {TABLA}_texto_trgm',
+    ],
+}
+
+
+def crear_indice(apps, schema_editor):
+    for sql in SQL_INDICE.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def borrar_indice(apps, schema_editor):
+    for sql in SQL_BORRAR_INDICE.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def calcular_texto_busqueda(apps, schema_editor):
+    campos = {'Categoria': ('nombre',), 'Subcategoria': ('nombre',), 'Comida': ('nombre', 'descripcion')}
+    for nombre_modelo, campos_texto in campos.items():
+        modelo = apps.get_model('carta_restaurantes', nombre_modelo)
+        filas = list(modelo.objects.only(*campos_texto))
+        for fila in filas:
+            fila.texto_busqueda = normalizar(' '.join(getattr(fila, campo) or '' for campo in campos_texto))
+        modelo.objects.bulk_update(filas, ['texto_busqueda'], batch_size=500)
+
+
+def repoblar_indice(apps, schema_editor):
+    """Mismo contenido que busqueda.reindexar_restaurante, para todos los restaurantes."""
+    Comida = apps.get_model('carta_restaurantes', 'Comida')
+    IndiceBusqueda = apps.get_model('carta_restaurantes', 'IndiceBusqueda')
+    filas = Comida.objects.filter(restaurante__activo=True, disponible=True).values_list(
+        'id', 'restaurante_id', 'nombre', 'descripcion', 'texto_busqueda',
+        'categoria__texto_busqueda', 'subcategoria__texto_busqueda',
+    )
+    IndiceBusqueda.objects.all().delete()
+    IndiceBusqueda.objects.bulk_create([
+        IndiceBusqueda(
+            comida_id=comida_id, restaurante_id=restaurante_id, nombre=normalizar(nombre),
+            descripcion=normalizar(descripcion), categoria=categoria or '', subcategoria=subcategoria or '',
+            texto=' '.join(filter(None, [texto, categoria, subcategoria])),
+        )
+        for comida_id, restaurante_id, nombre, descripcion, texto, categoria, subcategoria in filas
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carta_restaurantes', '0014_indicebusqueda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categoria',
+            name='texto_busqueda',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Texto de búsqueda'),
+        ),
+        migrations.AddField(
+            model_name='comida',
+            name='texto_busqueda',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Texto de búsqueda'),
+        ),
+        migrations.AddField(
+            model_name='indicebusqueda',
+            name='texto',
+            field=models.TextField(blank=True, default='', verbose_name='Texto completo'),
+        ),
+        migrations.AddField(
+            model_name='subcategoria',
+            name='texto_busqueda',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Texto de búsqueda'),
+        ),
+        migrations.RunPython(calcular_texto_busqueda, migrations.RunPython.noop),
+        migrations.RunPython(crear_indice, borrar_indice),
+        migrations.RunPython(repoblar_indice, migrations.RunPython.noop),
+    ]
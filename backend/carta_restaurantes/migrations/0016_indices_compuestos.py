@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carta_restaurantes', '0015_texto_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='categoria',
+            index=models.Index(fields=['restaurante', 'orden', 'nombre'], name='categoria_rest_orden_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comida',
+            index=models.Index(fields=['restaurante', 'orden', 'id'], name='comida_rest_orden_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comida',
+            index=models.Index(fields=['restaurante', 'disponible', 'orden', 'id'], name='comida_rest_disp_orden_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comida',
+            index=models.Index(fields=['restaurante', 'subcategoria', 'disponible', 'orden', 'id'], name='comida_rest_sub_orden_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comida',
+            index=models.Index(fields=['subcategoria', 'orden', 'id'], name='comida_sub_orden_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comida',
+            index=models.Index(fields=['categoria', 'orden', 'id'], name='comida_cat_orden_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comida',
+            index=models.Index(fields=['orden', 'id'], name='comida_orden_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subcategoria',
+            index=models.Index(fields=['restaurante', 'orden', 'nombre'], name='subcategoria_rest_orden_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subcategoria',
+            index=models.Index(fields=['categoria', 'orden', 'nombre'], name='subcategoria_cat_orden_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:09
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def marcar_sin_registro(apps, schema_editor):
+    """
+    Los menús existentes no tienen entradas anteriores a su versión actual:
+    un delta desde antes tiene que pedir resincronizar, no llegar vacío.
+    """
+    VersionMenu = apps.get_model('carta_restaurantes', 'VersionMenu')
+    VersionMenu.objects.update(compactado_hasta=F('numero'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carta_restaurantes', '0016_indices_compuestos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='versionmenu',
+            name='compactado_hasta',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Compactado hasta'),
+        ),
+        migrations.CreateModel(
+            name='CambioMenu',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('restaurante_id', models.PositiveBigIntegerField(verbose_name='Restaurante')),
+                ('version', models.PositiveBigIntegerField(verbose_name='Versión del menú')),
+                ('tipo', models.CharField(choices=[('restaurante', 'Restaurante'), ('categoria', 'Categoría'), ('subcategoria', 'Subcategoría'), ('comida', 'Comida')], max_length=20, verbose_name='Tipo')),
+                ('objeto_id', models.PositiveBigIntegerField(verbose_name='Id del objeto')),
+                ('borrado', models.BooleanField(default=False, verbose_name='Borrado')),
+                ('fecha', models.DateTimeField(auto_now_add=True, verbose_name='Fecha')),
+            ],
+            options={
+                'verbose_name': 'Cambio de menú',
+                'verbose_name_plural': 'Cambios de menú',
+                'indexes': [models.Index(fields=['restaurante_id', 'version', 'id'], name='cambio_rest_version_idx')],
+            },
+        ),
+        migrations.RunPython(marcar_sin_registro, migrations.RunPython.noop),
+    ]
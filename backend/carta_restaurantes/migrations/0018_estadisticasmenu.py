@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def crear_estadisticas(apps, schema_editor):
+    Restaurante = apps.get_model('carta_restaurantes', 'Restaurante')
+    EstadisticasMenu = apps.get_model('carta_restaurantes', 'EstadisticasMenu')
+    filas = {
+        restaurante_id: EstadisticasMenu(restaurante_id=restaurante_id)
+        for restaurante_id in Restaurante.objects.values_list('id', flat=True)
+    }
+    for nombre_modelo, campo in (('Categoria', 'categorias'), ('Subcategoria', 'subcategorias'), ('Comida', 'comidas')):
+        modelo = apps.get_model('carta_restaurantes', nombre_modelo)
+        for restaurante_id, cantidad in modelo.objects.values('restaurante_id').annotate(
+            cantidad=models.Count('pk')
+        ).values_list('restaurante_id', 'cantidad').order_by():
+            setattr(filas[restaurante_id], campo, cantidad)
+    Comida = apps.get_model('carta_restaurantes', 'Comida')
+    for restaurante_id, suma in Comida.objects.values('restaurante_id').annotate(
+        suma=models.Sum('precio')
+    ).values_list('restaurante_id', 'suma').order_by():
+        filas[restaurante_id].suma_precios = suma
+    EstadisticasMenu.objects.bulk_create(filas.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carta_restaurantes', '0017_registro_cambios'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticasMenu',
+            fields=[
+                ('restaurante', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estadisticas_menu', serialize=False, to='carta_restaurantes.restaurante', verbose_name='Restaurante')),
+                ('categorias', models.IntegerField(default=0, verbose_name='Categorías')),
+                ('subcategorias', models.IntegerField(default=0, verbose_name='Subcategorías')),
+                ('comidas', models.IntegerField(default=0, verbose_name='Comidas')),
+                ('suma_precios', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Suma de precios')),
+                ('actualizado', models.DateTimeField(auto_now=True, verbose_name='Actualizado')),
+            ],
+            options={
+                'verbose_name': 'Estadísticas de menú',
+                'verbose_name_plural': 'Estadísticas de menú',
+            },
+        ),
+        migrations.RunPython(crear_estadisticas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:41
+
+import re
+import unicodedata
+from django.db import migrations, models
+
+
+# Copia congelada de normalizacion.normalizar
+def normalizar(texto):
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    sin_acentos = ''.join(caracter for caracter in descompuesto if not unicodedata.combining(caracter))
+    return ' '.join(re.findall(r'\w+', sin_acentos.lower()))
+
+
+def calcular_texto_busqueda(apps, schema_editor):
+    Restaurante = apps.get_model('carta_restaurantes', 'Restaurante')
+    filas = list(Restaurante.objects.only('nombre'))
+    for fila in filas:
+        fila.texto_busqueda = normalizar(fila.nombre)
+    Restaurante.objects.bulk_update(filas, ['texto_busqueda'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carta_restaurantes', '0018_estadisticasmenu'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurante',
+            name='texto_busqueda',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Texto de búsqueda'),
+        ),
+        migrations.RunPython(calcular_texto_busqueda, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='estadisticasmenu',
+            index=models.Index(fields=['comidas', 'restaurante'], name='estadisticas_comidas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurante',
+            index=models.Index(fields=['texto_busqueda', 'id'], name='restaurante_texto_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurante',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='restaurante_fecha_idx'),
+        ),
+    ]
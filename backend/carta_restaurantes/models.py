@@ -1,8 +1,38 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils.text import slugify
+from .normalizacion import normalizar
 
-class Restaurante(models.Model):
+class ConTextoBusqueda(models.Model):
+    """
+    Agrega texto_busqueda: los campos de `campos_texto_busqueda` normalizados
+    (sin acentos ni mayúsculas, ver normalizacion.py), recalculado en cada
+    save(). loaddata no pasa por save(): lo cubre signals.py. Con bulk_create()
+    hay que llamar antes a actualizar_texto_busqueda().
+
+    save() es atómico: la fila y lo que actualizan sus señales (versión,
+    contadores de estadisticas.py) se guardan juntos.
+    """
+    campos_texto_busqueda = ('nombre',)
+
+    texto_busqueda = models.TextField(blank=True, default='', editable=False, verbose_name='Texto de búsqueda')
+
+    class Meta:
+        abstract = True
+
+    def actualizar_texto_busqueda(self):
+        self.texto_busqueda = normalizar(' '.join(getattr(self, campo) or '' for campo in self.campos_texto_busqueda))
+
+    def save(self, *args, **kwargs):
+        self.actualizar_texto_busqueda()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(self.campos_texto_busqueda) & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'texto_busqueda'}
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class Restaurante(ConTextoBusqueda):
     nombre = models.CharField(max_length=100, verbose_name='Nombre')
     slug = models.SlugField(max_length=50, unique=True, verbose_name='Slug')
     descripcion = models.TextField(blank=True, verbose_name='Descripción')
@@ -14,6 +44,12 @@ class Restaurante(models.Model):
         ordering = ['nombre']
         verbose_name = 'Restaurante'
         verbose_name_plural = 'Restaurantes'
+        indexes = [
+            # Directorio del superadmin (ver RestauranteCursorPagination): orden
+            # por nombre y búsqueda por prefijo del nombre normalizado
+            models.Index(fields=['texto_busqueda', 'id'], name='restaurante_texto_idx'),
+            models.Index(fields=['fecha_creacion', 'id'], name='restaurante_fecha_idx'),
+        ]
     
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -23,7 +59,8 @@ class Restaurante(models.Model):
     def __str__(self):
         return self.nombre
 
-class Categoria(models.Model):
+
+class Categoria(ConTextoBusqueda):
     restaurante = models.ForeignKey(Restaurante, on_delete=models.CASCADE, related_name='categorias', verbose_name='Restaurante')
     nombre = models.CharField(max_length=100)
     imagen = models.ImageField(upload_to='categorias/', blank=True, null=True)
@@ -31,12 +68,16 @@ class Categoria(models.Model):
 
     class Meta:
         ordering = ['orden', 'nombre']
+        indexes = [
+            # Categorías de un restaurante ya ordenadas (menú, /api/categorias/, admin)
+            models.Index(fields=['restaurante', 'orden', 'nombre'], name='categoria_rest_orden_idx'),
+        ]
 
     def __str__(self):
         return f"{self.restaurante.nombre} - {self.nombre}"
 
 
-class Subcategoria(models.Model):
+class Subcategoria(ConTextoBusqueda):
     restaurante = models.ForeignKey(Restaurante, on_delete=models.CASCADE, related_name='subcategorias', verbose_name='Restaurante')
     categoria = models.ForeignKey(Categoria, on_delete=models.CASCADE, related_name='subcategorias')
     nombre = models.CharField(max_length=100)
@@ -46,12 +87,19 @@ class Subcategoria(models.Model):
         ordering = ['orden', 'nombre']
         verbose_name = 'Subcategoría'
         verbose_name_plural = 'Subcategorías'
+        indexes = [
+            # Subcategorías del restaurante (menú) y de una categoría (públicas y admin), ya ordenadas
+            models.Index(fields=['restaurante', 'orden', 'nombre'], name='subcategoria_rest_orden_idx'),
+            models.Index(fields=['categoria', 'orden', 'nombre'], name='subcategoria_cat_orden_idx'),
+        ]
 
     def __str__(self):
         return f"{self.restaurante.nombre} - {self.categoria.nombre} - {self.nombre}"
 
 
-class Comida(models.Model):
+class Comida(ConTextoBusqueda):
+    campos_texto_busqueda = ('nombre', 'descripcion')
+
     restaurante = models.ForeignKey(Restaurante, on_delete=models.CASCADE, related_name='comidas', verbose_name='Restaurante')
     categoria = models.ForeignKey(Categoria, on_delete=models.CASCADE)
     subcategoria = models.ForeignKey(Subcategoria, on_delete=models.CASCADE, blank=True, null=True)
@@ -61,5 +109,162 @@ class Comida(models.Model):
     disponible = models.BooleanField(default=True)
     orden = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        # Todos terminan en (orden, id): el orden de los listados y el cursor de
+        # ComidaCursorPagination salen del índice, sin ordenar en memoria
+        indexes = [
+            # /api/comidas/ y su snapshot
+            models.Index(fields=['restaurante', 'orden', 'id'], name='comida_rest_orden_idx'),
+            # /api/menu/: solo disponibles
+            models.Index(fields=['restaurante', 'disponible', 'orden', 'id'], name='comida_rest_disp_orden_idx'),
+            # /api/subcategorias/<id>/comidas/
+            models.Index(fields=['restaurante', 'subcategoria', 'disponible', 'orden', 'id'], name='comida_rest_sub_orden_idx'),
+            # Listados del admin por subcategoría, por categoría y global (paginado)
+            models.Index(fields=['subcategoria', 'orden', 'id'], name='comida_sub_orden_idx'),
+            models.Index(fields=['categoria', 'orden', 'id'], name='comida_cat_orden_idx'),
+            models.Index(fields=['orden', 'id'], name='comida_orden_idx'),
+        ]
+
     def __str__(self):
         return f"{self.restaurante.nombre} - {self.nombre}"
+
+
+class MenuSnapshot(models.Model):
+    """
+    Respuesta pre-serializada (JSON) de un endpoint público del menú.
+
+    Se reconstruye solo cuando cambia el menú del restaurante (ver snapshots.py),
+    así las lecturas públicas sirven estos bytes sin volver a serializar.
+    """
+    restaurante = models.ForeignKey(Restaurante, on_delete=models.CASCADE, related_name='snapshots', verbose_name='Restaurante')
+    clave = models.CharField(max_length=100, verbose_name='Clave')
+    contenido = models.BinaryField(verbose_name='Contenido')
+    # Variantes comprimidas (ver compresion.py); None si no achican el contenido
+    contenido_gzip = models.BinaryField(null=True, blank=True, verbose_name='Contenido gzip')
+    contenido_br = models.BinaryField(null=True, blank=True, verbose_name='Contenido brotli')
+    version = models.PositiveBigIntegerField(default=0, verbose_name='Versión del menú')
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')
+
+    class Meta:
+        verbose_name = 'Snapshot de menú'
+        verbose_name_plural = 'Snapshots de menú'
+        constraints = [
+            models.UniqueConstraint(fields=['restaurante', 'clave'], name='snapshot_unico_por_clave'),
+        ]
+
+    def __str__(self):
+        return f"{self.restaurante_id} - {self.clave}"
+
+
+class VersionMenu(models.Model):
+    """
+    Contador monótono de versión del menú de un restaurante.
+
+    Se incrementa en cada cambio de menú (ver cambios.py) y alimenta los ETag
+    de los endpoints públicos. Vive en su propia tabla para que guardar un
+    Restaurante desactualizado nunca pise el contador.
+    """
+    restaurante = models.OneToOneField(Restaurante, on_delete=models.CASCADE, primary_key=True, related_name='version_menu', verbose_name='Restaurante')
+    numero = models.PositiveBigIntegerField(default=1, verbose_name='Número')
+    actualizado = models.DateTimeField(auto_now_add=True, verbose_name='Actualizado')
+    # Versión hasta la que se compactó el registro de cambios (ver sincronizacion.py):
+    # un delta desde antes ya no se puede armar y el cliente tiene que resincronizar
+    compactado_hasta = models.PositiveBigIntegerField(default=0, verbose_name='Compactado hasta')
+
+    class Meta:
+        verbose_name = 'Versión de menú'
+        verbose_name_plural = 'Versiones de menú'
+
+    def __str__(self):
+        return f"{self.restaurante_id} - v{self.numero}"
+
+
+class EstadisticasMenu(models.Model):
+    """
+    Contadores del menú de un restaurante para los dashboards.
+
+    Se mantienen de a incrementos en la misma transacción que cada alta, baja
+    o cambio de precio (ver estadisticas.py), así un dashboard los lee por
+    clave primaria en vez de contar las tablas del menú.
+    """
+    restaurante = models.OneToOneField(Restaurante, on_delete=models.CASCADE, primary_key=True, related_name='estadisticas_menu', verbose_name='Restaurante')
+    categorias = models.IntegerField(default=0, verbose_name='Categorías')
+    subcategorias = models.IntegerField(default=0, verbose_name='Subcategorías')
+    comidas = models.IntegerField(default=0, verbose_name='Comidas')
+    suma_precios = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Suma de precios')
+    actualizado = models.DateTimeField(auto_now=True, verbose_name='Actualizado')
+
+    class Meta:
+        verbose_name = 'Estadísticas de menú'
+        verbose_name_plural = 'Estadísticas de menú'
+        indexes = [
+            # Directorio del superadmin ordenado por cantidad de comidas
+            models.Index(fields=['comidas', 'restaurante'], name='estadisticas_comidas_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.restaurante_id} - {self.comidas} comidas"
+
+    @property
+    def promedio_precio(self):
+        return round(self.suma_precios / self.comidas, 2) if self.comidas else None
+
+
+class IndiceBusqueda(models.Model):
+    """
+    Texto buscable de cada comida disponible, desnormalizado por restaurante.
+
+    Se reconstruye junto con el menú (ver busqueda.py). Todas las columnas se
+    guardan normalizadas (sin acentos ni mayúsculas); `texto` las reúne para
+    el índice de trigramas que tolera errores de tipeo. Sobre esta tabla se
+    montan los índices FTS5 (SQLite) o GIN (PostgreSQL) que usa /api/buscar/.
+    """
+    comida = models.OneToOneField(Comida, on_delete=models.CASCADE, primary_key=True, related_name='indice_busqueda', verbose_name='Comida')
+    restaurante = models.ForeignKey(Restaurante, on_delete=models.CASCADE, related_name='indice_busqueda', verbose_name='Restaurante')
+    nombre = models.CharField(max_length=100, verbose_name='Nombre')
+    descripcion = models.TextField(blank=True, verbose_name='Descripción')
+    categoria = models.CharField(max_length=100, blank=True, verbose_name='Categoría')
+    subcategoria = models.CharField(max_length=100, blank=True, verbose_name='Subcategoría')
+    texto = models.TextField(blank=True, default='', verbose_name='Texto completo')
+
+    class Meta:
+        verbose_name = 'Índice de búsqueda'
+        verbose_name_plural = 'Índice de búsqueda'
+
+    def __str__(self):
+        return f"{self.restaurante_id} - {self.nombre}"
+
+
+class CambioMenu(models.Model):
+    """
+    Entrada del registro de cambios del menú: una fila creada, modificada o
+    borrada, con la versión del menú (VersionMenu.numero) que la incluye.
+
+    Alimenta /api/menu/cambios/ (ver sincronizacion.py). El restaurante es un
+    id suelto y no una FK: los borrados en cascada de un restaurante registran
+    las entradas de sus filas mientras el propio restaurante se está borrando.
+    """
+    TIPOS = [
+        ('restaurante', 'Restaurante'),
+        ('categoria', 'Categoría'),
+        ('subcategoria', 'Subcategoría'),
+        ('comida', 'Comida'),
+    ]
+
+    restaurante_id = models.PositiveBigIntegerField(verbose_name='Restaurante')
+    version = models.PositiveBigIntegerField(verbose_name='Versión del menú')
+    tipo = models.CharField(max_length=20, choices=TIPOS, verbose_name='Tipo')
+    objeto_id = models.PositiveBigIntegerField(verbose_name='Id del objeto')
+    borrado = models.BooleanField(default=False, verbose_name='Borrado')
+    fecha = models.DateTimeField(auto_now_add=True, verbose_name='Fecha')
+
+    class Meta:
+        verbose_name = 'Cambio de menú'
+        verbose_name_plural = 'Cambios de menú'
+        indexes = [
+            # Delta de un restaurante desde una versión, en el orden en que ocurrió
+            models.Index(fields=['restaurante_id', 'version', 'id'], name='cambio_rest_version_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.restaurante_id} - v{self.version} - {self.tipo} {self.objeto_id}"
@@ -0,0 +1,39 @@
+"""
+Normalización - Texto plegado para búsquedas sin acentos ni mayúsculas
+
+    normalizar('Cafetería: Ñoquis "caseros"')  →  'cafeteria noquis caseros'
+
+Lo usan los campos texto_busqueda de los modelos (al guardar) y las
+búsquedas, así consulta e índice se comparan en la misma forma.
+"""
+import re
+import unicodedata
+
+
+def normalizar(texto):
+    """Minúsculas, sin acentos ni diéresis (ñ → n) y solo palabras separadas por un espacio."""
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    sin_acentos = ''.join(caracter for caracter in descompuesto if not unicodedata.combining(caracter))
+    return ' '.join(re.findall(r'\w+', sin_acentos.lower()))
+
+
+def trigramas(texto):
+    """Trigramas de cada palabra de un texto ya normalizado (las de menos de 3 letras no aportan)."""
+    return {
+        palabra[i:i + 3]
+        for palabra in texto.split()
+        for i in range(len(palabra) - 2)
+    }
+
+
+def similitud(consulta, texto):
+    """
+    Fracción de los trigramas de `consulta` presentes en `texto` (0 a 1), como
+    word_similarity de pg_trgm: un error de tipeo deja la mayoría en pie.
+    Los dos ya normalizados: un trigrama no tiene espacios, así que estar en
+    el texto es estar dentro de una de sus palabras.
+    """
+    buscados = trigramas(consulta)
+    if not buscados:
+        return 0.0
+    return sum(trigrama in texto for trigrama in buscados) / len(buscados)
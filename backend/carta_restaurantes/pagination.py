@@ -0,0 +1,204 @@
+"""
+Pagination - Paginación por cursor (keyset) para listados de comidas y para el directorio de restaurantes
+"""
+import base64
+import json
+from collections import OrderedDict
+from django.core.exceptions import ValidationError as ErrorDeValor
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class ComidaCursorPagination(BasePagination):
+    """
+    Paginación keyset sobre (orden, id), opcional.
+
+    Solo pagina si el request trae `cursor` o `page_size`; sin ellos la vista
+    devuelve la lista completa como siempre. Cada página es un
+    `WHERE (orden, id) > (cursor) ORDER BY orden, id LIMIT n`, así que cuesta
+    lo mismo en la página 1 que en la 1000 (a diferencia de OFFSET o de
+    CursorPagination de DRF, que usa offset para desempatar `orden` repetidos).
+
+    El cursor es opaco: base64 de "orden:id" de la última fila devuelta.
+    """
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def solicitada(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or self.page_size_query_param in request.query_params
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            orden, pk = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('ascii').split(':')
+            return int(orden), int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound('Cursor inválido')
+
+    def encode_cursor(self, orden, pk):
+        return base64.urlsafe_b64encode(f'{orden}:{pk}'.encode('ascii')).decode('ascii')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.solicitada(request):
+            return None
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by('orden', 'id')
+
+        posicion = self.decode_cursor(request)
+        if posicion is not None:
+            orden, pk = posicion
+            queryset = queryset.filter(Q(orden__gt=orden) | Q(orden=orden, id__gt=pk))
+
+        # Una fila de más para saber si hay página siguiente sin hacer COUNT(*)
+        resultados = list(queryset[:page_size + 1])
+        self.hay_siguiente = len(resultados) > page_size
+        resultados = resultados[:page_size]
+        self.ultima = resultados[-1] if resultados else None
+        self.page_size_actual = page_size
+        return resultados
+
+    def get_next_link(self):
+        if not self.hay_siguiente:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size_actual)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.ultima.orden, self.ultima.id))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class RestauranteCursorPagination(BasePagination):
+    """
+    Paginación keyset del directorio de restaurantes del superadmin, por el
+    orden de ?orden= (nombre, fecha o comidas; con "-" delante, descendente)
+    y desempatando por id en el mismo sentido.
+
+    Ordenando por comidas el desempate es la columna restaurante_id de
+    EstadisticasMenu (el mismo id): así el índice (comidas, restaurante) da
+    el orden completo sin ordenar en memoria. Un restaurante sin contadores
+    no estaría en ese orden: los crea la señal al guardarlo, y a los cargados
+    con bulk_create o loaddata el comando reconciliar_estadisticas (el
+    release del Procfile lo corre después de loaddata).
+
+    Como ComidaCursorPagination, cada página es un rango del índice del orden
+    (ver los Meta de Restaurante y EstadisticasMenu) con LIMIT n, sin OFFSET
+    ni COUNT(*): cuesta lo mismo con 10 restaurantes que con 100.000. El
+    cursor es base64 del JSON [valor del orden, id] de la última fila.
+    """
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    orden_query_param = 'orden'
+    orden_por_defecto = 'nombre'
+    # nombre: (campo, desempate)
+    ordenes = {
+        'nombre': ('texto_busqueda', 'id'),
+        'fecha': ('fecha_creacion', 'id'),
+        'comidas': ('estadisticas_menu__comidas', 'estadisticas_menu__restaurante_id'),
+    }
+
+    get_page_size = ComidaCursorPagination.get_page_size
+
+    def get_orden(self, request):
+        """(orden pedido, campo, desempate, descendente)."""
+        orden = request.query_params.get(self.orden_query_param) or self.orden_por_defecto
+        nombre = orden.removeprefix('-')
+        if nombre not in self.ordenes:
+            raise ValidationError({self.orden_query_param: f'Usar uno de: {", ".join(self.ordenes)} (con "-" delante, descendente)'})
+        return orden, *self.ordenes[nombre], orden.startswith('-')
+
+    def decode_cursor(self, request, campo_modelo):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            valor, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            valor = campo_modelo.to_python(valor)
+            # Las filas con NULL en el campo del orden no se paginan: ningún cursor válido lo trae
+            if valor is None:
+                raise ValueError(valor)
+            return valor, int(pk)
+        except (TypeError, ValueError, UnicodeError, ErrorDeValor):
+            raise NotFound('Cursor inválido')
+
+    def encode_cursor(self, valor, pk):
+        # isoformat() y no DjangoJSONEncoder, que recorta las fechas a milisegundos y el cursor no coincidiría
+        cursor = json.dumps([valor, pk], default=lambda fecha: fecha.isoformat())
+        return base64.urlsafe_b64encode(cursor.encode('ascii')).decode('ascii')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        self.orden, campo, desempate, descendente = self.get_orden(request)
+
+        # Sin NULL en el campo del orden; para comidas, además, INNER JOIN con los contadores
+        queryset = queryset.filter(**{f'{campo}__isnull': False}).annotate(valor_orden=F(campo))
+        if descendente:
+            queryset = queryset.order_by(f'-{campo}', f'-{desempate}')
+        else:
+            queryset = queryset.order_by(campo, desempate)
+
+        posicion = self.decode_cursor(request, queryset.query.annotations['valor_orden'].output_field)
+        if posicion is not None:
+            valor, pk = posicion
+            # El primer filtro acota el rango del índice; el segundo saltea los empates ya devueltos
+            if descendente:
+                queryset = queryset.filter(**{f'{campo}__lte': valor}).filter(
+                    Q(**{f'{campo}__lt': valor}) | Q(**{f'{desempate}__lt': pk})
+                )
+            else:
+                queryset = queryset.filter(**{f'{campo}__gte': valor}).filter(
+                    Q(**{f'{campo}__gt': valor}) | Q(**{f'{desempate}__gt': pk})
+                )
+
+        # Una fila de más para saber si hay página siguiente sin hacer COUNT(*)
+        resultados = list(queryset[:page_size + 1])
+        self.hay_siguiente = len(resultados) > page_size
+        resultados = resultados[:page_size]
+        self.ultima = resultados[-1] if resultados else None
+        self.page_size_actual = page_size
+        return resultados
+
+    def get_next_link(self):
+        if not self.hay_siguiente:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size_actual)
+        url = replace_query_param(url, self.orden_query_param, self.orden)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.ultima.valor_orden, self.ultima.id))
@@ -0,0 +1,160 @@
+"""
+Réplicas - Lecturas de las vistas públicas en réplicas de la base
+
+Con réplicas configuradas (settings.DATABASE_REPLICAS), las lecturas de las
+vistas públicas del menú van a una de ellas, elegida al azar por query. Todo
+lo demás (admin, escrituras, las tareas de registrar_cambio) usa `default`,
+la primaria.
+
+- Las vistas públicas se marcan en api_urls.py con en_replica().
+- Lectura de lo propio: al commitear un cambio del menú, registrar_cambio
+  marca el restaurante en el cache compartido por settings.REPLICAS_PEGAJOSO_SEGUNDOS
+  (lo que puede tardar una réplica en ponerse al día). Mientras dure, las
+  vistas públicas de ese restaurante leen de la primaria, para cualquier
+  cliente: el dueño que acaba de guardar un cambio lo ve en su menú aunque
+  llame a la API desde otro origen y sin cookies, y el cache por restaurante
+  no guarda la generación nueva con datos de una réplica atrasada. Los demás
+  restaurantes siguen en las réplicas.
+- Una request que escribe lee de la primaria hasta terminar.
+
+Sin réplicas configuradas el router siempre contesta `default`.
+"""
+import contextvars
+import random
+import time
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+
+
+# True dentro de una vista pública marcada con en_replica()
+_lectura_en_replica = contextvars.ContextVar('lectura_en_replica', default=False)
+# Estado de la request en curso (ver PrimariaTrasEscrituraMiddleware)
+_request = contextvars.ContextVar('request_replicas', default=None)
+
+
+class _EstadoRequest:
+    def __init__(self):
+        self.pegada_a_primaria = False
+        self.escribio = False
+
+
+class RouterReplicas:
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS or not _lectura_en_replica.get() or lee_de_primaria():
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        estado = _request.get()
+        if estado is not None:
+            estado.escribio = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primaria y réplicas tienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas reciben el esquema por replicación
+        return db not in settings.DATABASE_REPLICAS
+
+
+def lee_de_primaria():
+    """True si la request en curso escribió o lee un restaurante que cambió hace poco: lee de la primaria."""
+    estado = _request.get()
+    return estado is not None and (estado.pegada_a_primaria or estado.escribio)
+
+
+def _clave(restaurante_id):
+    return f'r{restaurante_id}:primaria_hasta'
+
+
+def marcar_cambio(restaurante_id):
+    """Lo llama registrar_cambio al commitear: las lecturas públicas del restaurante van a la primaria por un rato."""
+    if settings.DATABASE_REPLICAS:
+        segundos = settings.REPLICAS_PEGAJOSO_SEGUNDOS
+        cache.set(_clave(restaurante_id), time.time() + segundos, timeout=segundos)
+
+
+def _pegar(marcas):
+    ahora = time.time()
+    if not any(hasta > ahora for hasta in marcas):
+        return False
+    estado = _request.get()
+    if estado is not None:
+        estado.pegada_a_primaria = True
+    return True
+
+
+def cambio_reciente(*restaurante_ids):
+    """
+    True si alguno de los restaurantes cambió hace menos de
+    REPLICAS_PEGAJOSO_SEGUNDOS; desde ahí la request en curso lee de la
+    primaria. Siempre False fuera de una vista pública o sin réplicas: no
+    consulta el cache.
+    """
+    if not settings.DATABASE_REPLICAS or not _lectura_en_replica.get() or not restaurante_ids:
+        return False
+    return _pegar(cache.get_many([_clave(restaurante_id) for restaurante_id in restaurante_ids]).values())
+
+
+async def acambio_reciente(*restaurante_ids):
+    """cambio_reciente() para las vistas async."""
+    if not settings.DATABASE_REPLICAS or not _lectura_en_replica.get() or not restaurante_ids:
+        return False
+    return _pegar((await cache.aget_many([_clave(restaurante_id) for restaurante_id in restaurante_ids])).values())
+
+
+def en_replica(vista):
+    """Marca una vista (sync o async) para que sus lecturas vayan a una réplica."""
+    if iscoroutinefunction(vista):
+        @wraps(vista)
+        async def envuelta(request, *args, **kwargs):
+            marca = _lectura_en_replica.set(True)
+            try:
+                return await vista(request, *args, **kwargs)
+            finally:
+                _lectura_en_replica.reset(marca)
+        return envuelta
+
+    @wraps(vista)
+    def envuelta(request, *args, **kwargs):
+        marca = _lectura_en_replica.set(True)
+        try:
+            return vista(request, *args, **kwargs)
+        finally:
+            _lectura_en_replica.reset(marca)
+    return envuelta
+
+
+class PrimariaTrasEscrituraMiddleware:
+    """
+    Lleva el estado de la request para el router: si escribió, o si leyó un
+    restaurante que cambió hace poco (cambio_reciente), el resto de sus
+    lecturas va a la primaria.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        marca = _request.set(_EstadoRequest())
+        try:
+            return self.get_response(request)
+        finally:
+            _request.reset(marca)
+
+    async def __acall__(self, request):
+        marca = _request.set(_EstadoRequest())
+        try:
+            return await self.get_response(request)
+        finally:
+            _request.reset(marca)
@@ -0,0 +1,102 @@
+"""
+Restaurantes Cache - Resolución slug → restaurante en memoria del proceso
+
+Las vistas públicas reciben `?restaurante=<slug>` en cada request. Este cache
+LRU acotado evita la query de resolución en casi todas ellas.
+
+Invalidación:
+- En el propio proceso: al commitear cualquier cambio del Restaurante (slug,
+  activo, ...) o de su menú, porque la versión forma parte de la entrada.
+  Ver cambios.registrar_cambio.
+- Entre procesos (workers de gunicorn): cada entrada vive como máximo
+  RESTAURANTES_CACHE_TTL segundos.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from django.conf import settings
+from . import replicas
+from .models import Restaurante
+
+
+RestauranteResuelto = namedtuple('RestauranteResuelto', ['id', 'activo', 'version', 'actualizado'])
+
+_entradas = OrderedDict()  # slug → (expira, RestauranteResuelto)
+_lock = threading.Lock()
+
+
+def _consulta(restaurante_slug):
+    return Restaurante.objects.filter(slug=restaurante_slug).values_list(
+        'id', 'activo', 'version_menu__numero', 'version_menu__actualizado'
+    )
+
+
+def _en_cache(restaurante_slug, ahora):
+    """(encontrado, restaurante activo o None) según la entrada vigente del slug."""
+    with _lock:
+        entrada = _entradas.get(restaurante_slug)
+        if entrada is not None and entrada[0] > ahora:
+            _entradas.move_to_end(restaurante_slug)
+            restaurante = entrada[1]
+            return True, (restaurante if restaurante.activo else None)
+    return False, None
+
+
+def _guardar(restaurante_slug, fila, ahora):
+    if fila is None:
+        # No se cachean slugs inexistentes: no dejamos que slugs inventados llenen el cache
+        return None
+    restaurante = RestauranteResuelto(*fila)
+
+    with _lock:
+        _entradas[restaurante_slug] = (ahora + settings.RESTAURANTES_CACHE_TTL, restaurante)
+        _entradas.move_to_end(restaurante_slug)
+        while len(_entradas) > settings.RESTAURANTES_CACHE_MAX:
+            _entradas.popitem(last=False)
+
+    return restaurante if restaurante.activo else None
+
+
+def resolver_restaurante(restaurante_slug):
+    """
+    Restaurante activo con ese slug, o None si no existe o está inactivo.
+
+    Returns:
+        RestauranteResuelto(id, activo, version, actualizado)
+    """
+    if not restaurante_slug:
+        return None
+    ahora = time.monotonic()
+    encontrado, restaurante = _en_cache(restaurante_slug, ahora)
+    if not encontrado:
+        restaurante = _guardar(restaurante_slug, _consulta(restaurante_slug).first(), ahora)
+    if restaurante is not None and replicas.cambio_reciente(restaurante.id):
+        # Cambió hace poco: la versión también de la primaria (ver replicas.py)
+        restaurante = _guardar(restaurante_slug, _consulta(restaurante_slug).first(), ahora)
+    return restaurante
+
+
+async def aresolver_restaurante(restaurante_slug):
+    """resolver_restaurante() para las vistas async: un acierto no sale del event loop."""
+    if not restaurante_slug:
+        return None
+    ahora = time.monotonic()
+    encontrado, restaurante = _en_cache(restaurante_slug, ahora)
+    if not encontrado:
+        restaurante = _guardar(restaurante_slug, await _consulta(restaurante_slug).afirst(), ahora)
+    if restaurante is not None and await replicas.acambio_reciente(restaurante.id):
+        restaurante = _guardar(restaurante_slug, await _consulta(restaurante_slug).afirst(), ahora)
+    return restaurante
+
+
+def invalidar_restaurante(restaurante_id):
+    """Quita del cache cualquier slug que apunte a ese restaurante (el slug viejo incluido)."""
+    with _lock:
+        for slug, (_, restaurante) in list(_entradas.items()):
+            if restaurante.id == restaurante_id:
+                del _entradas[slug]
+
+
+def limpiar():
+    with _lock:
+        _entradas.clear()
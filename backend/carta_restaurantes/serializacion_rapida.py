@@ -0,0 +1,241 @@
+"""
+Serialización rápida - Camino de solo lectura basado en .values()
+
+Arma exactamente el mismo JSON que CategoriaSerializer, SubcategoriaSerializer,
+ComidaSerializer y MenuSerializer, pero a partir de filas de .values(): sin
+instanciar modelos ni pasar por los campos de DRF. Lo usan los snapshots y las
+vistas públicas.
+
+Si cambian los campos de un serializer, hay que reflejarlo acá;
+tests/test_serializacion.py verifica que la salida sea idéntica byte a byte
+(y scripts/bench_serializacion.py compara la velocidad).
+
+Todas las funciones aceptan `campos` (ver campos.py): con un subconjunto de
+campos, el SELECT trae solo las columnas que esos campos necesitan.
+"""
+import decimal
+from collections import defaultdict
+from django.conf import settings
+from .models import Categoria, Subcategoria, Comida
+
+
+# Columnas de .values() en el mismo orden que los campos del serializer
+COLUMNAS_COMIDA = (
+    'id', 'subcategoria__nombre', 'categoria__nombre', 'nombre', 'descripcion',
+    'precio', 'disponible', 'orden', 'restaurante', 'categoria', 'subcategoria',
+)
+COLUMNAS_SUBCATEGORIA = ('id', 'nombre', 'orden', 'categoria', 'categoria__nombre')
+COLUMNAS_CATEGORIA = ('id', 'nombre', 'imagen', 'orden')
+
+# Campos de cada serializer, en su orden
+CAMPOS_COMIDA = (
+    'id', 'subcategoria_nombre', 'categoria_nombre', 'nombre', 'descripcion',
+    'precio', 'disponible', 'orden', 'restaurante', 'categoria', 'subcategoria',
+)
+CAMPOS_SUBCATEGORIA = ('id', 'nombre', 'orden', 'categoria', 'categoria_nombre')
+CAMPOS_CATEGORIA = ('id', 'nombre', 'imagen', 'orden', 'subcategorias')
+
+# Columnas que necesita cada campo; los que no figuran usan la columna homónima.
+# Sirven tanto para .values() como para .only().
+COLUMNAS_CAMPO_COMIDA = {
+    # subcategoria decide si el campo se omite (comidas sin subcategoría)
+    'subcategoria_nombre': ('subcategoria', 'subcategoria__nombre'),
+    'categoria_nombre': ('categoria__nombre',),
+}
+COLUMNAS_CAMPO_SUBCATEGORIA = {
+    'categoria_nombre': ('categoria__nombre',),
+}
+COLUMNAS_CAMPO_CATEGORIA = {
+    # Las subcategorías anidadas muestran el nombre de su categoría
+    'subcategorias': ('nombre',),
+}
+
+
+def columnas(campos, columnas_por_campo, siempre=()):
+    """Columnas (sin repetir, en orden) para serializar `campos`."""
+    resultado = dict.fromkeys(siempre)
+    for campo in campos:
+        resultado.update(dict.fromkeys(columnas_por_campo.get(campo, (campo,))))
+    return tuple(resultado)
+
+_precio = Comida._meta.get_field('precio')
+_CUANTO_PRECIO = decimal.Decimal('.1') ** _precio.decimal_places
+_CONTEXTO_PRECIO = decimal.Context(prec=_precio.max_digits, rounding=decimal.ROUND_HALF_UP)
+_storage_imagen = Categoria._meta.get_field('imagen').storage
+
+
+def formatear_precio(precio):
+    """Igual que serializers.DecimalField.to_representation (coerce_to_string)."""
+    return '{:f}'.format(precio.quantize(_CUANTO_PRECIO, context=_CONTEXTO_PRECIO))
+
+
+def url_imagen(nombre):
+    """Igual que serializers.ImagenField sin request: URL absoluta con MEDIA_BASE_URL, o None."""
+    if not nombre:
+        return None
+    url = _storage_imagen.url(nombre)
+    # Un storage remoto (S3, CDN) ya devuelve URLs absolutas
+    return settings.MEDIA_BASE_URL + url if url.startswith('/') else url
+
+
+def comida_desde_fila(fila, campos=None):
+    if campos is not None:
+        return _comida_parcial(fila, campos)
+    comida = {'id': fila['id']}
+    # DRF omite el campo (SkipField) cuando la comida no tiene subcategoría
+    if fila['subcategoria'] is not None:
+        comida['subcategoria_nombre'] = fila['subcategoria__nombre']
+    comida.update({
+        'categoria_nombre': fila['categoria__nombre'],
+        'nombre': fila['nombre'],
+        'descripcion': fila['descripcion'],
+        'precio': formatear_precio(fila['precio']),
+        'disponible': fila['disponible'],
+        'orden': fila['orden'],
+        'restaurante': fila['restaurante'],
+        'categoria': fila['categoria'],
+        'subcategoria': fila['subcategoria'],
+    })
+    return comida
+
+
+def _comida_parcial(fila, campos):
+    comida = {}
+    for campo in campos:
+        if campo == 'subcategoria_nombre':
+            if fila['subcategoria'] is not None:
+                comida[campo] = fila['subcategoria__nombre']
+        elif campo == 'categoria_nombre':
+            comida[campo] = fila['categoria__nombre']
+        elif campo == 'precio':
+            comida[campo] = formatear_precio(fila['precio'])
+        else:
+            comida[campo] = fila[campo]
+    return comida
+
+
+def subcategoria_desde_fila(fila, campos=None):
+    if campos is not None:
+        return {
+            campo: fila['categoria__nombre'] if campo == 'categoria_nombre' else fila[campo]
+            for campo in campos
+        }
+    return {
+        'id': fila['id'],
+        'nombre': fila['nombre'],
+        'orden': fila['orden'],
+        'categoria': fila['categoria'],
+        'categoria_nombre': fila['categoria__nombre'],
+    }
+
+
+def categoria_desde_fila(fila, subcategorias, campos=None):
+    if campos is not None:
+        categoria = {}
+        for campo in campos:
+            if campo == 'imagen':
+                categoria[campo] = url_imagen(fila['imagen'])
+            elif campo == 'subcategorias':
+                categoria[campo] = subcategorias
+            else:
+                categoria[campo] = fila[campo]
+        return categoria
+    return {
+        'id': fila['id'],
+        'nombre': fila['nombre'],
+        'imagen': url_imagen(fila['imagen']),
+        'orden': fila['orden'],
+        'subcategorias': subcategorias,
+    }
+
+
+def comidas(queryset, campos=None):
+    """Lista de comidas con la forma de ComidaSerializer."""
+    if campos is None:
+        return [comida_desde_fila(fila) for fila in queryset.values(*COLUMNAS_COMIDA)]
+    filas = queryset.values(*columnas(campos, COLUMNAS_CAMPO_COMIDA))
+    return [_comida_parcial(fila, campos) for fila in filas]
+
+
+def subcategorias(queryset, campos=None):
+    """Lista de subcategorías con la forma de SubcategoriaSerializer."""
+    if campos is None:
+        return [subcategoria_desde_fila(fila) for fila in queryset.values(*COLUMNAS_SUBCATEGORIA)]
+    filas = queryset.values(*columnas(campos, COLUMNAS_CAMPO_SUBCATEGORIA))
+    return [subcategoria_desde_fila(fila, campos) for fila in filas]
+
+
+def categorias(queryset, campos=None):
+    """
+    Lista de categorías con la forma de CategoriaSerializer.
+
+    Las subcategorías anidadas salen de una sola query y se agrupan en memoria
+    (ninguna si `campos` no las incluye).
+    """
+    if campos is None:
+        filas = list(queryset.values(*COLUMNAS_CATEGORIA))
+    else:
+        filas = list(queryset.values(*columnas(campos, COLUMNAS_CAMPO_CATEGORIA, siempre=('id',))))
+    por_categoria = defaultdict(list)
+    if campos is None or 'subcategorias' in campos:
+        # Por categoría primero, como el índice (categoria, orden, nombre): al agruparlas
+        # queda el mismo orden (orden, nombre) dentro de cada una, sin ordenar en memoria
+        subcategorias_qs = Subcategoria.objects.filter(
+            categoria__in=[fila['id'] for fila in filas]
+        ).order_by('categoria_id', 'orden', 'nombre')
+        for subcategoria in subcategorias(subcategorias_qs):
+            por_categoria[subcategoria['categoria']].append(subcategoria)
+    return [categoria_desde_fila(fila, por_categoria[fila['id']], campos) for fila in filas]
+
+
+def menu(restaurante, campos=None):
+    """
+    Menú completo con la forma de MenuSerializer, en 3 queries.
+
+    Mismo contenido y orden que las vistas públicas: categorías y subcategorías
+    por (orden, nombre); dentro de cada subcategoría, solo comidas disponibles
+    por (orden, id).
+
+    `campos` acota las comidas, que son el grueso del menú.
+    """
+    filas_categorias = list(
+        Categoria.objects.filter(restaurante=restaurante)
+        .order_by('orden', 'nombre')
+        .values(*COLUMNAS_CATEGORIA)
+    )
+    # El filtro por restaurante de la propia tabla deja usar su índice (restaurante, orden, nombre)
+    filas_subcategorias = list(
+        Subcategoria.objects.filter(restaurante=restaurante, categoria__restaurante=restaurante)
+        .order_by('orden', 'nombre')
+        .values(*COLUMNAS_SUBCATEGORIA)
+    )
+    columnas_comida = COLUMNAS_COMIDA
+    if campos is not None:
+        # subcategoria siempre: agrupa las comidas bajo su subcategoría
+        columnas_comida = columnas(campos, COLUMNAS_CAMPO_COMIDA, siempre=('subcategoria',))
+    filas_comidas = (
+        Comida.objects.filter(restaurante=restaurante, subcategoria__categoria__restaurante=restaurante, disponible=True)
+        .order_by('orden', 'id')
+        .values(*columnas_comida)
+    )
+
+    comidas_por_subcategoria = defaultdict(list)
+    for fila in filas_comidas:
+        comidas_por_subcategoria[fila['subcategoria']].append(comida_desde_fila(fila, campos))
+
+    subcategorias_por_categoria = defaultdict(list)
+    for fila in filas_subcategorias:
+        subcategoria = subcategoria_desde_fila(fila)
+        subcategoria['comidas'] = comidas_por_subcategoria[fila['id']]
+        subcategorias_por_categoria[fila['categoria']].append(subcategoria)
+
+    return {
+        'id': restaurante.id,
+        'nombre': restaurante.nombre,
+        'slug': restaurante.slug,
+        'descripcion': restaurante.descripcion,
+        'categorias': [
+            categoria_desde_fila(fila, subcategorias_por_categoria[fila['id']])
+            for fila in filas_categorias
+        ],
+    }
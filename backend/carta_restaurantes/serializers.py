@@ -1,14 +1,42 @@
+from django.db import models
 from rest_framework import serializers
-from .models import Categoria, Subcategoria, Comida
+from .models import Categoria, Subcategoria, Comida, Restaurante
+from .serializacion_rapida import url_imagen
 
-class SubcategoriaSerializer(serializers.ModelSerializer):
+
+class CamposDinamicosMixin:
+    """Acepta campos=(...) para serializar solo ese subconjunto (ver campos.py)."""
+
+    def __init__(self, *args, campos=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if campos is not None:
+            for nombre in set(self.fields) - set(campos):
+                self.fields.pop(nombre)
+
+
+class ImagenField(serializers.ImageField):
+    """
+    Sin request en el contexto (snapshots y vistas públicas), la URL absoluta
+    se arma con MEDIA_BASE_URL en lugar de quedar relativa.
+    """
+
+    def to_representation(self, value):
+        if self.context.get('request') is not None:
+            return super().to_representation(value)
+        return url_imagen(value.name if value else None)
+
+
+class SubcategoriaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     categoria_nombre = serializers.CharField(source='categoria.nombre', read_only=True)
     
     class Meta:
         model = Subcategoria
         fields = ['id', 'nombre', 'orden', 'categoria', 'categoria_nombre']
 
-class CategoriaSerializer(serializers.ModelSerializer):
+class CategoriaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping, models.ImageField: ImagenField,
+    }
     subcategorias = SubcategoriaSerializer(many=True, read_only=True)
     
     class Meta:
@@ -16,10 +44,36 @@ class CategoriaSerializer(serializers.ModelSerializer):
         fields = ['id', 'nombre', 'imagen', 'orden', 'subcategorias']
 
 
-class ComidaSerializer(serializers.ModelSerializer):
+class ComidaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     subcategoria_nombre = serializers.CharField(source='subcategoria.nombre', read_only=True)
     categoria_nombre = serializers.CharField(source='categoria.nombre', read_only=True)
     
     class Meta:
         model = Comida
-        fields = '__all__'
+        exclude = ['texto_busqueda']
+
+
+# ============================================================================
+# MENÚ COMPLETO (restaurante → categorías → subcategorías → comidas)
+# ============================================================================
+
+class MenuSubcategoriaSerializer(SubcategoriaSerializer):
+    comidas = ComidaSerializer(source='comida_set', many=True, read_only=True)
+
+    class Meta(SubcategoriaSerializer.Meta):
+        fields = SubcategoriaSerializer.Meta.fields + ['comidas']
+
+
+class MenuCategoriaSerializer(CategoriaSerializer):
+    subcategorias = MenuSubcategoriaSerializer(many=True, read_only=True)
+
+    class Meta(CategoriaSerializer.Meta):
+        pass
+
+
+class MenuSerializer(serializers.ModelSerializer):
+    categorias = MenuCategoriaSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Restaurante
+        fields = ['id', 'nombre', 'slug', 'descripcion', 'categorias']
@@ -0,0 +1,64 @@
+"""
+Signals - Mantienen los datos derivados del menú al guardar o borrar filas
+"""
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Categoria, Subcategoria, Comida, Restaurante
+from .cambios import registrar_cambio
+from .versiones import asegurar_version
+from . import estadisticas
+
+
+@receiver([post_save, post_delete], sender=Categoria, dispatch_uid='menu_categoria_modificada')
+@receiver([post_save, post_delete], sender=Subcategoria, dispatch_uid='menu_subcategoria_modificada')
+@receiver([post_save, post_delete], sender=Comida, dispatch_uid='menu_comida_modificada')
+def menu_modificado(sender, instance, signal, raw=False, **kwargs):
+    # raw=True viene de loaddata: las relaciones pueden no existir todavía
+    if raw:
+        return
+    registrar_cambio(instance.restaurante_id, sender, [instance.pk], borrado=signal is post_delete)
+
+
+@receiver([post_save, post_delete], sender=Restaurante, dispatch_uid='menu_restaurante_modificado')
+def restaurante_modificado(sender, instance, signal, raw=False, **kwargs):
+    if raw:
+        return
+    if signal is post_delete:
+        registrar_cambio(instance.pk)
+    else:
+        asegurar_version(instance.pk)
+        estadisticas.asegurar(instance.pk)
+        registrar_cambio(instance.pk, sender, [instance.pk])
+
+
+@receiver(post_save, sender=Categoria, dispatch_uid='estadisticas_alta_categoria')
+@receiver(post_save, sender=Subcategoria, dispatch_uid='estadisticas_alta_subcategoria')
+@receiver(post_save, sender=Comida, dispatch_uid='estadisticas_alta_comida')
+def contar_alta(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    estadisticas.sumar(instance.restaurante_id, sender, 1, getattr(instance, 'precio', None))
+
+
+@receiver(post_delete, sender=Categoria, dispatch_uid='estadisticas_baja_categoria')
+@receiver(post_delete, sender=Subcategoria, dispatch_uid='estadisticas_baja_subcategoria')
+@receiver(post_delete, sender=Comida, dispatch_uid='estadisticas_baja_comida')
+def contar_baja(sender, instance, **kwargs):
+    estadisticas.sumar(instance.restaurante_id, sender, -1, getattr(instance, 'precio', None))
+
+
+@receiver(pre_save, sender=Comida, dispatch_uid='estadisticas_precio_comida')
+def contar_cambio_de_precio(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding or (update_fields is not None and 'precio' not in update_fields):
+        return
+    estadisticas.cambiar_precio(instance)
+
+
+@receiver(pre_save, sender=Restaurante, dispatch_uid='texto_busqueda_restaurante')
+@receiver(pre_save, sender=Categoria, dispatch_uid='texto_busqueda_categoria')
+@receiver(pre_save, sender=Subcategoria, dispatch_uid='texto_busqueda_subcategoria')
+@receiver(pre_save, sender=Comida, dispatch_uid='texto_busqueda_comida')
+def texto_busqueda_en_loaddata(sender, instance, raw=False, **kwargs):
+    # loaddata guarda con save_base() y no pasa por Model.save(), que es quien lo calcula
+    if raw:
+        instance.actualizar_texto_busqueda()
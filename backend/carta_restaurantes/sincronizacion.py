@@ -0,0 +1,156 @@
+"""
+Sincronización - Registro de cambios del menú y deltas desde una versión
+
+Cada fila del menú creada, modificada o borrada deja una entrada CambioMenu
+con la versión del menú que la incluye (ver cambios.registrar_cambio). Un
+cliente que ya tiene el menú en la versión N pide solo lo que cambió después:
+
+    GET /api/menu/cambios/?restaurante=<slug>&desde=N
+
+y recibe las filas vigentes de lo creado o modificado, los ids de lo borrado y
+la versión alcanzada, que usa como `desde` la próxima vez.
+
+El registro se compacta (compactar, comando compactar_cambios): las entradas
+viejas se borran y VersionMenu.compactado_hasta recuerda hasta dónde. Un
+`desde` anterior ya no se puede responder con un delta y se contesta
+{"resincronizar": true}: el cliente vuelve a bajar /api/menu/.
+"""
+from django.db.models import Max, Subquery, Value
+from django.db.models.functions import Coalesce
+from .models import Categoria, Subcategoria, Comida, Restaurante, CambioMenu, VersionMenu
+from . import serializacion_rapida
+
+
+TIPO_POR_MODELO = {
+    Restaurante: 'restaurante',
+    Categoria: 'categoria',
+    Subcategoria: 'subcategoria',
+    Comida: 'comida',
+}
+
+# Claves de la respuesta por tipo, en el orden en que conviene aplicarlas
+CLAVES = {
+    'categoria': 'categorias',
+    'subcategoria': 'subcategorias',
+    'comida': 'comidas',
+}
+
+# Las categorías del delta van sin sus subcategorías anidadas: vienen aparte
+CAMPOS_CATEGORIA = [campo for campo in serializacion_rapida.CAMPOS_CATEGORIA if campo != 'subcategorias']
+
+
+def registrar_entradas(restaurante_id, tipo, objeto_ids, borrado=False):
+    """
+    Agrega al registro una entrada por id, con la versión del menú vigente en
+    la transacción (ya incrementada por registrar_cambio). La versión se lee
+    en el mismo INSERT.
+    """
+    version = Coalesce(
+        Subquery(VersionMenu.objects.filter(restaurante_id=restaurante_id).values('numero')[:1]),
+        Value(0),
+    )
+    CambioMenu.objects.bulk_create([
+        CambioMenu(restaurante_id=restaurante_id, version=version, tipo=tipo, objeto_id=objeto_id, borrado=borrado)
+        for objeto_id in objeto_ids
+    ])
+
+
+def _vigentes(restaurante_id, ids_por_tipo):
+    """Filas actuales de los objetos creados o modificados, con la forma de los endpoints públicos."""
+    resultado = {}
+    if ids_por_tipo.get('restaurante'):
+        restaurante = Restaurante.objects.filter(pk=restaurante_id).values('id', 'nombre', 'slug', 'descripcion').first()
+        resultado['restaurante'] = restaurante
+    if ids_por_tipo.get('categoria'):
+        resultado['categorias'] = serializacion_rapida.categorias(
+            Categoria.objects.filter(restaurante_id=restaurante_id, id__in=ids_por_tipo['categoria']).order_by('orden', 'nombre'),
+            CAMPOS_CATEGORIA,
+        )
+    if ids_por_tipo.get('subcategoria'):
+        resultado['subcategorias'] = serializacion_rapida.subcategorias(
+            Subcategoria.objects.filter(restaurante_id=restaurante_id, id__in=ids_por_tipo['subcategoria']).order_by('orden', 'nombre')
+        )
+    if ids_por_tipo.get('comida'):
+        resultado['comidas'] = serializacion_rapida.comidas(
+            Comida.objects.filter(restaurante_id=restaurante_id, id__in=ids_por_tipo['comida']).order_by('orden', 'id')
+        )
+    return resultado
+
+
+def ultimas_entradas(restaurante_id, desde, version):
+    """
+    Estado final de cada objeto tocado entre las versiones `desde` (excluida)
+    y `version`: la última entrada decide, modificado y después borrado es
+    borrado.
+
+    Returns:
+        dict {(tipo, objeto_id): borrado}
+    """
+    ultima = {}
+    for tipo, objeto_id, borrado in CambioMenu.objects.filter(
+        restaurante_id=restaurante_id, version__gt=desde, version__lte=version
+    ).order_by('version', 'id').values_list('tipo', 'objeto_id', 'borrado'):
+        ultima[(tipo, objeto_id)] = borrado
+    return ultima
+
+
+def delta(restaurante_id, desde, version, compactado_hasta):
+    """
+    Cambios del menú entre las versiones `desde` (excluida) y `version`.
+
+    `version` se lee antes que las entradas: lo que se commitee mientras tanto
+    queda para el próximo delta, nunca se saltea.
+
+    Returns:
+        dict listo para la respuesta de /api/menu/cambios/
+    """
+    if desde < compactado_hasta or desde > version:
+        # Registro ya compactado, o una versión que este menú nunca tuvo (p. ej. restaurante recreado)
+        return {'version': version, 'resincronizar': True}
+
+    modificados = {}
+    borrados = {clave: [] for clave in CLAVES.values()}
+    for (tipo, objeto_id), borrado in ultimas_entradas(restaurante_id, desde, version).items():
+        if borrado:
+            if tipo in CLAVES:
+                borrados[CLAVES[tipo]].append(objeto_id)
+        else:
+            modificados.setdefault(tipo, []).append(objeto_id)
+
+    vigentes = _vigentes(restaurante_id, modificados)
+    # Modificado según el registro pero ya no está (borrado después de `version`): se informa como borrado
+    for tipo, clave in CLAVES.items():
+        presentes = {fila['id'] for fila in vigentes.get(clave, [])}
+        borrados[clave].extend(objeto_id for objeto_id in modificados.get(tipo, []) if objeto_id not in presentes)
+        borrados[clave].sort()
+
+    respuesta = {'version': version, 'resincronizar': False}
+    if vigentes.get('restaurante'):
+        respuesta['restaurante'] = vigentes['restaurante']
+    respuesta['cambios'] = {clave: vigentes.get(clave, []) for clave in CLAVES.values()}
+    respuesta['borrados'] = borrados
+    return respuesta
+
+
+def compactar(antes_de):
+    """
+    Borra las entradas anteriores a la fecha `antes_de`, por versión completa,
+    y deja en VersionMenu.compactado_hasta la última versión borrada de cada
+    restaurante. También borra las de restaurantes que ya no existen.
+
+    Returns:
+        cantidad de entradas borradas
+    """
+    borradas = 0
+    limites = (
+        CambioMenu.objects.filter(fecha__lt=antes_de)
+        .values('restaurante_id').annotate(hasta=Max('version')).order_by()
+    )
+    for limite in limites:
+        restaurante_id, hasta = limite['restaurante_id'], limite['hasta']
+        VersionMenu.objects.filter(
+            restaurante_id=restaurante_id, compactado_hasta__lt=hasta
+        ).update(compactado_hasta=hasta)
+        borradas += CambioMenu.objects.filter(restaurante_id=restaurante_id, version__lte=hasta).delete()[0]
+    borradas += CambioMenu.objects.exclude(restaurante_id__in=Restaurante.objects.values('id')).delete()[0]
+    return borradas
@@ -0,0 +1,192 @@
+"""
+Snapshots - Menús pre-serializados por restaurante
+
+Cada endpoint público del menú tiene su respuesta JSON guardada en MenuSnapshot,
+identificada por una clave que imita la URL:
+
+- 'menu'                          → /api/menu/
+- 'categorias'                    → /api/categorias/
+- 'comidas'                       → /api/comidas/
+- 'categorias/<id>/subcategorias' → /api/categorias/<id>/subcategorias/
+- 'subcategorias/<id>/comidas'    → /api/subcategorias/<id>/comidas/
+
+Los snapshots se reconstruyen únicamente cuando cambia el menú (ver cambios.py);
+las lecturas públicas sirven los bytes guardados sin tocar el ORM ni DRF.
+Cada uno se guarda también comprimido con gzip y brotli (ver compresion.py).
+
+Se reconstruyen todas las claves del restaurante, una vez por transacción,
+al commitear y dentro del request que guardó. Con 2.000 comidas en 50
+subcategorías son unos 100 ms con un CPU: un tercio arma el JSON y el resto
+lo comprime, casi todo en 'menu' y 'comidas', que contienen todas las
+comidas y cambian con cualquiera de ellas. Reconstruir solo las claves de
+las filas tocadas ahorraría las chicas, no esas dos. La cantidad de queries
+no depende de la cantidad de comidas (tests/test_cambios.py).
+"""
+import logging
+from django.db import DatabaseError, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Coalesce
+from rest_framework.renderers import JSONRenderer
+from .models import Comida, Restaurante, MenuSnapshot, VersionMenu
+from . import compresion, serializacion_rapida
+
+
+logger = logging.getLogger(__name__)
+
+CLAVE_MENU = 'menu'
+CLAVE_CATEGORIAS = 'categorias'
+CLAVE_COMIDAS = 'comidas'
+
+
+def clave_subcategorias(categoria_id):
+    return f'categorias/{categoria_id}/subcategorias'
+
+
+def clave_comidas_subcategoria(subcategoria_id):
+    return f'subcategorias/{subcategoria_id}/comidas'
+
+
+def construir_snapshots(restaurante):
+    """
+    Serializa todos los endpoints públicos de un restaurante (4 queries).
+
+    Usa serializacion_rapida: el menú completo trae todo el árbol y de él se
+    recortan las respuestas por categoría y por subcategoría.
+
+    Returns:
+        dict {clave: bytes JSON}
+    """
+    renderer = JSONRenderer()
+    menu = serializacion_rapida.menu(restaurante)
+    todas_las_comidas = serializacion_rapida.comidas(
+        Comida.objects.filter(restaurante=restaurante).order_by('orden', 'id')
+    )
+
+    categorias = []
+    snapshots = {}
+    for categoria in menu['categorias']:
+        subcategorias = []
+        for subcategoria in categoria['subcategorias']:
+            subcategoria = dict(subcategoria)
+            snapshots[clave_comidas_subcategoria(subcategoria['id'])] = renderer.render(subcategoria.pop('comidas'))
+            subcategorias.append(subcategoria)
+        snapshots[clave_subcategorias(categoria['id'])] = renderer.render(subcategorias)
+        categorias.append(dict(categoria, subcategorias=subcategorias))
+
+    snapshots[CLAVE_MENU] = renderer.render(menu)
+    snapshots[CLAVE_CATEGORIAS] = renderer.render(categorias)
+    snapshots[CLAVE_COMIDAS] = renderer.render(todas_las_comidas)
+    return snapshots
+
+
+def reconstruir_snapshots(restaurante_id):
+    """
+    Reemplaza los snapshots de un restaurante. Si no está activo, solo los borra.
+
+    La versión se lee antes que el menú: si entre ambas lecturas entra otro
+    cambio, el snapshot queda marcado con una versión anterior a su contenido
+    y el próximo If-None-Match simplemente recibe un 200.
+    """
+    version = VersionMenu.objects.filter(restaurante_id=restaurante_id).values_list('numero', flat=True).first() or 0
+    restaurante = Restaurante.objects.filter(pk=restaurante_id, activo=True).first()
+    snapshots = construir_snapshots(restaurante) if restaurante else {}
+
+    filas = []
+    for clave, contenido in snapshots.items():
+        contenido_gzip, contenido_br = compresion.comprimir(contenido)
+        filas.append(MenuSnapshot(
+            restaurante_id=restaurante_id, clave=clave, version=version,
+            contenido=contenido, contenido_gzip=contenido_gzip, contenido_br=contenido_br,
+        ))
+
+    with transaction.atomic():
+        MenuSnapshot.objects.filter(restaurante_id=restaurante_id).delete()
+        MenuSnapshot.objects.bulk_create(filas)
+
+
+def descartar_snapshots(restaurante_id):
+    """
+    Borra los snapshots de un restaurante cuando no se pudieron reconstruir:
+    mejor que sirvan las vistas por el ORM que un menú viejo. Si tampoco se
+    puede borrar, lo registra y sigue.
+    """
+    try:
+        MenuSnapshot.objects.filter(restaurante_id=restaurante_id).delete()
+    except DatabaseError:
+        logger.exception('No se pudieron descartar los snapshots del restaurante %s', restaurante_id)
+
+
+# Columnas a probar, en orden, para cada codificación negociada
+_COLUMNAS_CODIFICACION = {
+    'br': (('contenido_br', 'br'), ('contenido_gzip', 'gzip')),
+    'gzip': (('contenido_gzip', 'gzip'),),
+    None: (),
+}
+
+
+def _consulta_snapshot(restaurante_id, clave, codificacion):
+    columnas = _COLUMNAS_CODIFICACION[codificacion]
+    cuerpo, codificacion_servida = F('contenido'), Value('')
+    if columnas:
+        cuerpo = Coalesce(*[F(columna) for columna, _ in columnas], F('contenido'))
+        codificacion_servida = Case(
+            *[When(**{f'{columna}__isnull': False}, then=Value(nombre)) for columna, nombre in columnas],
+            default=Value(''),
+        )
+    return MenuSnapshot.objects.filter(
+        restaurante_id=restaurante_id,
+        clave=clave
+    ).annotate(
+        cuerpo=cuerpo,
+        codificacion_servida=codificacion_servida,
+    ).values_list('cuerpo', 'codificacion_servida', 'version', 'fecha_actualizacion')
+
+
+def _desempaquetar(snapshot):
+    if snapshot is None:
+        return None
+    contenido, codificacion_servida, version, fecha_actualizacion = snapshot
+    # PostgreSQL devuelve memoryview para BinaryField
+    return bytes(contenido), codificacion_servida or None, version, fecha_actualizacion
+
+
+def obtener_snapshot(restaurante_id, clave, codificacion=None):
+    """
+    Snapshot guardado para (restaurante, clave), en la mejor variante
+    disponible para `codificacion` (ver compresion.negociar). Una sola query:
+    la variante se elige en SQL y solo viajan sus bytes.
+
+    Returns:
+        (contenido, codificacion servida o None, version, fecha_actualizacion)
+        o None si no existe
+    """
+    return _desempaquetar(_consulta_snapshot(restaurante_id, clave, codificacion).first())
+
+
+async def aobtener_snapshot(restaurante_id, clave, codificacion=None):
+    """obtener_snapshot() con el ORM async, para las vistas async."""
+    return _desempaquetar(await _consulta_snapshot(restaurante_id, clave, codificacion).afirst())
+
+
+def _consulta_snapshots(restaurante_ids, clave):
+    return MenuSnapshot.objects.filter(
+        restaurante_id__in=restaurante_ids,
+        clave=clave
+    ).values_list('restaurante_id', 'contenido')
+
+
+def obtener_snapshots(restaurante_ids, clave):
+    """
+    Contenido sin comprimir del snapshot `clave` de varios restaurantes, en
+    una sola query. Los que no tienen snapshot no aparecen.
+
+    Returns:
+        dict {restaurante_id: bytes}
+    """
+    filas = _consulta_snapshots(restaurante_ids, clave)
+    return {restaurante_id: bytes(contenido) for restaurante_id, contenido in filas}
+
+
+async def aobtener_snapshots(restaurante_ids, clave):
+    """obtener_snapshots() con el ORM async, para las vistas async."""
+    return {restaurante_id: bytes(contenido) async for restaurante_id, contenido in _consulta_snapshots(restaurante_ids, clave)}
@@ -0,0 +1,192 @@
+"""
+Tests - Búsqueda de comidas (ver busqueda.py) y su reindexado al cambiar el menú
+"""
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from carta_restaurantes import busqueda, restaurantes_cache
+from carta_restaurantes.models import Categoria, Comida, IndiceBusqueda, Restaurante, Subcategoria
+from carta_restaurantes.datos_sinteticos import SIN_CACHE, crear_menu_sintetico, textos_variados
+
+
+def crear_restaurante(slug, comidas):
+    """Restaurante con una categoría y una subcategoría; `comidas`: [(nombre, descripcion)]."""
+    restaurante = Restaurante.objects.create(
+        nombre=slug, slug=slug, propietario=User.objects.create_user(username=slug)
+    )
+    categoria = Categoria.objects.create(restaurante=restaurante, nombre='Principales')
+    subcategoria = Subcategoria.objects.create(restaurante=restaurante, categoria=categoria, nombre='De la casa')
+    for nombre, descripcion in comidas:
+        Comida.objects.create(
+            restaurante=restaurante, categoria=categoria, subcategoria=subcategoria,
+            nombre=nombre, descripcion=descripcion, precio=Decimal('1000'),
+        )
+    return restaurante
+
+
+@override_settings(CACHES=SIN_CACHE)
+class BuscarComidasTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Por las señales, como desde el admin: el índice se arma al commitear
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.restaurante = crear_restaurante('test-buscar', [
+                ('Sándwich de lomo', 'Pan casero, como el de la milanesa'),
+                ('Milanesa napolitana', 'Con papas fritas'),
+                ('Ñoquis de papa', 'Con salsa fileto'),
+                ('Pizza de muzzarella', 'Masa madre'),
+            ])
+            cls.otro = crear_restaurante('test-buscar-otro', [
+                ('Milanesa de pollo', 'Con puré'),
+            ])
+
+    def setUp(self):
+        restaurantes_cache.limpiar()
+
+    def buscar(self, q, slug='test-buscar'):
+        response = self.client.get('/api/buscar/', {'restaurante': slug, 'q': q})
+        self.assertEqual(response.status_code, 200)
+        return [comida['nombre'] for comida in response.json()]
+
+    def test_nombre_antes_que_descripcion(self):
+        self.assertEqual(self.buscar('milanesa'), ['Milanesa napolitana', 'Sándwich de lomo'])
+
+    def palabras_exactas(self, q):
+        """Ids que encuentra la búsqueda por palabras, sin la aproximada."""
+        with connection.cursor() as cursor:
+            cursor.execute(*busqueda.sql_busqueda(self.restaurante.id, q))
+            return [fila[0] for fila in cursor.fetchall()]
+
+    def test_sin_acentos_ni_mayusculas(self):
+        self.assertEqual(self.buscar('noquis'), ['Ñoquis de papa'])
+        self.assertEqual(self.buscar('ÑOQUIS'), ['Ñoquis de papa'])
+        self.assertEqual(self.buscar('sandwich'), ['Sándwich de lomo'])
+
+    def test_otra_terminacion_por_raiz(self):
+        self.assertEqual(self.palabras_exactas('milanesas napolitanas'), [])
+        self.assertEqual(self.buscar('milanesas napolitanas'), ['Milanesa napolitana'])
+        # Las raíces coinciden: no llega a la búsqueda por trigramas
+        with self.assertNumQueries(2):
+            busqueda.buscar(self.restaurante.id, 'milanesas napolitanas')
+
+    def test_errores_de_tipeo_por_trigramas(self):
+        for q, esperada in (('milaneza', 'Milanesa napolitana'), ('muzarela', 'Pizza de muzzarella')):
+            with self.subTest(q=q):
+                self.assertEqual(self.palabras_exactas(q), [])
+                self.assertIn(esperada, self.buscar(q))
+
+    def test_sin_coincidencias(self):
+        self.assertEqual(self.buscar('helado'), [])
+
+    def test_solo_el_restaurante_pedido(self):
+        self.assertEqual(self.buscar('pollo'), [])
+        self.assertEqual(self.buscar('milanesa', 'test-buscar-otro'), ['Milanesa de pollo'])
+
+    def test_no_disponible_sale_del_indice(self):
+        comida = Comida.objects.get(restaurante=self.restaurante, nombre='Milanesa napolitana')
+        comida.disponible = False
+        with self.captureOnCommitCallbacks(execute=True):
+            comida.save()
+        self.assertEqual(self.buscar('milanesa'), ['Sándwich de lomo'])
+
+    def test_renombrar_categoria(self):
+        categoria = Categoria.objects.get(restaurante=self.restaurante)
+        categoria.nombre = 'Minutas'
+        with self.captureOnCommitCallbacks(execute=True):
+            categoria.save()
+        self.assertEqual(len(self.buscar('minutas')), 4)
+        self.assertEqual(self.buscar('principales'), [])
+
+    def test_desactivar_y_reactivar_restaurante(self):
+        self.restaurante.activo = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurante.save()
+        self.assertFalse(IndiceBusqueda.objects.filter(restaurante=self.restaurante).exists())
+        self.restaurante.activo = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurante.save()
+        self.assertEqual(IndiceBusqueda.objects.filter(restaurante=self.restaurante).count(), 4)
+
+
+class ReindexadoIncrementalTests(TestCase):
+    """Un cambio reindexa sus filas: las queries no dependen del tamaño del menú."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.chico = crear_menu_sintetico('test-reindexar-chico', 20, categorias=2, subcategorias_por_categoria=2)
+        cls.grande = crear_menu_sintetico('test-reindexar-grande', 2000)
+        for restaurante in (cls.chico, cls.grande):
+            busqueda.reindexar_restaurante(restaurante.id)
+
+    def assertMismasQueries(self, cambios):
+        """`cambios(restaurante)` da el ids_por_modelo a reindexar en cada menú."""
+        with CaptureQueriesContext(connection) as queries:
+            busqueda.reindexar_cambios(self.chico.id, cambios(self.chico))
+        with self.assertNumQueries(len(queries)):
+            busqueda.reindexar_cambios(self.grande.id, cambios(self.grande))
+
+    def test_una_comida(self):
+        def cambios(restaurante):
+            comida = Comida.objects.filter(restaurante=restaurante, disponible=True).first()
+            Comida.objects.filter(pk=comida.pk).update(disponible=False)
+            return {Comida: {comida.pk}}
+        self.assertMismasQueries(cambios)
+        self.assertEqual(
+            IndiceBusqueda.objects.filter(restaurante=self.grande).count(),
+            Comida.objects.filter(restaurante=self.grande, disponible=True).count(),
+        )
+
+    def test_orden_de_categorias(self):
+        # Reordenar no cambia ningún texto: no se reindexa ninguna comida
+        categoria_ids = set(Categoria.objects.filter(restaurante=self.grande).values_list('id', flat=True))
+        with self.assertNumQueries(1):
+            busqueda.reindexar_cambios(self.grande.id, {Categoria: categoria_ids})
+
+    def test_restaurante_sin_cambios_de_estado(self):
+        with self.assertNumQueries(2):
+            busqueda.reindexar_cambios(self.grande.id, {Restaurante: {self.grande.id}})
+
+
+class CandidatosTrigramasTests(TestCase):
+    """
+    La búsqueda aproximada trae de la base solo candidatos que contienen parte
+    de cada término, sin ordenarlos: el costo no crece con los que tienen uno solo.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurante = crear_menu_sintetico('test-trigramas', 2000, textos=textos_variados)
+        busqueda.reindexar_restaurante(cls.restaurante.id)
+
+    def candidatos(self, q):
+        with connection.cursor() as cursor:
+            cursor.execute(*busqueda.sql_busqueda_aproximada(self.restaurante.id, q))
+            return cursor.fetchall()
+
+    def test_cada_termino_recorta_los_candidatos(self):
+        licuados = IndiceBusqueda.objects.filter(restaurante=self.restaurante, texto__contains='licuado').count()
+        candidatos = self.candidatos('licuado de durasno')
+        self.assertTrue(candidatos)
+        self.assertLess(len(candidatos), licuados / 2)
+        self.assertTrue(all('licuado' in texto for _, texto in candidatos))
+
+    def test_queries(self):
+        # Palabras, raíces y trigramas: una query cada una
+        with self.assertNumQueries(3):
+            ids = busqueda.buscar(self.restaurante.id, 'licuado de durasno')
+        self.assertTrue(ids)
+        with self.assertNumQueries(1):
+            busqueda.buscar(self.restaurante.id, 'licuado de durazno')
+
+    def test_plan_sin_ordenar(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('El plan de FTS5 es de SQLite')
+        sql, params = busqueda.sql_busqueda_aproximada(self.restaurante.id, 'muzarela')
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = [fila[-1] for fila in cursor.fetchall()]
+        self.assertEqual(len(plan), 1, plan)
+        self.assertIn('VIRTUAL TABLE INDEX', plan[0])
@@ -0,0 +1,70 @@
+"""
+Tests - Claves del cache por restaurante (ver cache_por_restaurante.py)
+
+Una respuesta ya cacheada se sirve sin tocar la base aunque la request traiga
+parámetros que la vista no reconoce, repetidos o en otro orden, y las
+búsquedas que solo difieren en acentos, mayúsculas o conectores comparten
+entrada.
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from carta_restaurantes import restaurantes_cache
+from carta_restaurantes.datos_sinteticos import CACHE_LOCAL, crear_menu_sintetico
+from carta_restaurantes.snapshots import reconstruir_snapshots
+
+
+@override_settings(CACHES=CACHE_LOCAL)
+class ClavesDeCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurante = crear_menu_sintetico('test-cache', 50)
+        reconstruir_snapshots(cls.restaurante.id)
+
+    def setUp(self):
+        cache.clear()
+        restaurantes_cache.limpiar()
+
+    def pedir(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return response
+
+    def assertMismaEntrada(self, primera, *otras):
+        esperada = self.pedir(primera).content
+        for url in otras:
+            with self.subTest(url=url), self.assertNumQueries(0):
+                self.assertEqual(self.pedir(url).content, esperada)
+
+    def test_parametros_desconocidos_y_orden(self):
+        publico = f'restaurante={self.restaurante.slug}'
+        self.assertMismaEntrada(
+            f'/api/comidas/?{publico}&fields=id,nombre,precio',
+            f'/api/comidas/?fields=precio,nombre,id&{publico}',
+            f'/api/comidas/?{publico}&fields=id,nombre,precio&utm_source=qr&_=1712',
+        )
+        self.assertMismaEntrada(f'/api/menu/?{publico}&v=1', f'/api/menu/?{publico}&v=2')
+
+    def test_pagina_normalizada(self):
+        publico = f'restaurante={self.restaurante.slug}'
+        self.assertMismaEntrada(
+            f'/api/comidas/?{publico}&page_size=10',
+            f'/api/comidas/?{publico}&page_size=10&pagina=3',
+        )
+        self.assertMismaEntrada(
+            f'/api/comidas/?{publico}&page_size=5000',
+            f'/api/comidas/?{publico}&page_size=500',
+        )
+
+    def test_busqueda_por_terminos(self):
+        buscar = f'/api/buscar/?restaurante={self.restaurante.slug}'
+        self.assertMismaEntrada(f'{buscar}&q=Ñoquis', f'{buscar}&q=los%20noquis%20', f'{buscar}&q=NOQUIS&x=1')
+
+    def test_busqueda_larga_no_se_cachea(self):
+        url = f'/api/buscar/?restaurante={self.restaurante.slug}&q={"milanesa " * 10}'
+        self.pedir(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.pedir(url)
+        self.assertTrue(queries)
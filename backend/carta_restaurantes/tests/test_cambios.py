@@ -0,0 +1,96 @@
+"""
+Tests - Avisos de cambios del menú (ver cambios.py)
+"""
+from unittest import mock
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from carta_restaurantes.datos_sinteticos import crear_menu_sintetico
+from carta_restaurantes.models import Comida, MenuSnapshot, VersionMenu
+from carta_restaurantes.snapshots import reconstruir_snapshots
+
+
+class CambioPorTransaccionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Ejecutados ya: si no, el alta del restaurante quedaría pendiente en toda la clase
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.uno = crear_menu_sintetico('test-cambios-uno', 20, categorias=2, subcategorias_por_categoria=2)
+            cls.otro = crear_menu_sintetico('test-cambios-otro', 20, categorias=2, subcategorias_por_categoria=2)
+
+    def version(self, restaurante):
+        return VersionMenu.objects.get(restaurante=restaurante).numero
+
+    def test_un_aviso_por_restaurante(self):
+        antes = self.version(self.uno), self.version(self.otro)
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                for comida in Comida.objects.filter(restaurante=self.uno)[:5]:
+                    comida.save()
+                Comida.objects.filter(restaurante=self.otro).first().save()
+        self.assertEqual(len(callbacks), 2)
+        self.assertEqual((self.version(self.uno), self.version(self.otro)), (antes[0] + 1, antes[1] + 1))
+
+    def test_borrado_en_cascada(self):
+        categoria = self.uno.categorias.first()
+        antes = self.version(self.uno)
+        with self.captureOnCommitCallbacks() as callbacks:
+            categoria.delete()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.version(self.uno), antes + 1)
+
+    def test_rollback_no_deja_pendiente(self):
+        comida = Comida.objects.filter(restaurante=self.uno).first()
+        antes = self.version(self.uno)
+        with transaction.atomic():
+            comida.save()
+            transaction.set_rollback(True)
+        with self.captureOnCommitCallbacks() as callbacks:
+            comida.save()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.version(self.uno), antes + 1)
+
+    def test_al_commitear_reconstruye(self):
+        comida = Comida.objects.filter(restaurante=self.uno, disponible=True).first()
+        comida.disponible = False
+        with self.captureOnCommitCallbacks(execute=True):
+            comida.save()
+        versiones = set(MenuSnapshot.objects.filter(restaurante=self.uno).values_list('version', flat=True))
+        self.assertEqual(versiones, {self.version(self.uno)})
+        # Ya commiteado: el próximo cambio vuelve a incrementar la versión
+        with self.captureOnCommitCallbacks() as callbacks:
+            comida.save()
+        self.assertEqual(len(callbacks), 1)
+
+    def test_falla_al_reconstruir(self):
+        reconstruir_snapshots(self.uno.id)
+        comida = Comida.objects.filter(restaurante=self.uno).first()
+        with mock.patch('carta_restaurantes.cambios.reconstruir_snapshots', side_effect=RuntimeError), \
+                self.assertLogs('carta_restaurantes.cambios', 'ERROR'), \
+                self.captureOnCommitCallbacks(execute=True):
+            comida.save()
+        # Sin el snapshot viejo, las vistas públicas leen el menú nuevo por el ORM
+        self.assertFalse(MenuSnapshot.objects.filter(restaurante=self.uno).exists())
+        response = self.client.get('/api/comidas/', {'restaurante': self.uno.slug})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], f'"{self.uno.id}-{self.version(self.uno)}"')
+
+
+class CostoReconstruccionTests(TestCase):
+    """Ver el docstring de snapshots.py: se reconstruye todo, con queries fijas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.chico = crear_menu_sintetico('test-reconstruir-chico', 20, categorias=3, subcategorias_por_categoria=3)
+        cls.grande = crear_menu_sintetico('test-reconstruir-grande', 2000, categorias=3, subcategorias_por_categoria=3)
+
+    def test_mismas_queries_con_mas_comidas(self):
+        with CaptureQueriesContext(connection) as queries:
+            reconstruir_snapshots(self.chico.id)
+        with self.assertNumQueries(len(queries)):
+            reconstruir_snapshots(self.grande.id)
+        self.assertEqual(
+            MenuSnapshot.objects.filter(restaurante=self.grande).count(),
+            MenuSnapshot.objects.filter(restaurante=self.chico).count(),
+        )
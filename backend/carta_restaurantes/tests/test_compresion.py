@@ -0,0 +1,45 @@
+"""
+Tests - ETag y Content-Encoding de los snapshots pre-comprimidos
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from carta_restaurantes.datos_sinteticos import SIN_CACHE, crear_menu_sintetico
+from carta_restaurantes.models import Restaurante
+from carta_restaurantes.snapshots import reconstruir_snapshots
+
+
+@override_settings(CACHES=SIN_CACHE)
+class EtagPorCodificacionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.grande = crear_menu_sintetico('test-compresion', 200)
+        # Sin categorías el snapshot es "[]": comprimido no achica y no tiene variante gzip
+        cls.vacio = Restaurante.objects.create(
+            nombre='Vacío', slug='test-compresion-vacio', propietario=User.objects.create_user('test-compresion-vacio')
+        )
+        reconstruir_snapshots(cls.grande.id)
+        reconstruir_snapshots(cls.vacio.id)
+
+    def pedir(self, restaurante, **cabeceras):
+        return self.client.get(f'/api/categorias/?restaurante={restaurante.slug}', **cabeceras)
+
+    def test_variante_comprimida(self):
+        response = self.pedir(self.grande, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertTrue(response['ETag'].endswith('-gzip"'))
+        self.assertEqual(self.pedir(self.grande, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_sin_variante_comprimida_etiqueta_lo_servido(self):
+        sin_comprimir = self.pedir(self.vacio)
+        response = self.pedir(self.vacio, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(response.content, b'[]')
+        self.assertEqual(response['ETag'], sin_comprimir['ETag'])
+        revalidada = self.pedir(self.vacio, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidada.status_code, 304)
+        self.assertEqual(revalidada['ETag'], response['ETag'])
+
+    def test_etag_de_otra_codificacion_no_revalida(self):
+        comprimida = self.pedir(self.grande, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(self.pedir(self.grande, HTTP_IF_NONE_MATCH=comprimida['ETag']).status_code, 200)
@@ -0,0 +1,190 @@
+"""
+Tests - Dashboards del superadmin (ver admin_dashboards.py)
+
+La cantidad de queries de /api/admin/, /api/admin/test/ y /api/admin/simple/
+no crece con la cantidad de restaurantes, las cantidades de cada restaurante (los contadores
+de estadisticas.py) son las que dan los count() de cada tabla, el directorio
+recorrido página por página en cada orden es el de un order_by() (también el
+de /api/admin/simple/, que lee los restaurantes en una sola query), y la
+búsqueda encuentra por prefijo de nombre, slug y propietario.
+"""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from carta_restaurantes import estadisticas
+from carta_restaurantes.estadisticas import reconciliar
+from carta_restaurantes.datos_sinteticos import SIN_CACHE
+from carta_restaurantes.models import Categoria, Comida, EstadisticasMenu, Restaurante, Subcategoria
+from carta_restaurantes.pagination import RestauranteCursorPagination
+
+
+def crear_restaurantes(desde, hasta):
+    """
+    Restaurantes con una categoría, `i % 3` subcategorías y `i % 5` comidas.
+    bulk_create no dispara señales: los contadores se crean reconciliando.
+    """
+    propietarios = User.objects.bulk_create([
+        User(username=f'dueno-{i}', is_staff=True) for i in range(desde, hasta)
+    ])
+    restaurantes = [
+        Restaurante(nombre=f'Sintético {i}', slug=f'test-dashboards-{i}', propietario=propietario)
+        for i, propietario in zip(range(desde, hasta), propietarios)
+    ]
+    for restaurante in restaurantes:
+        restaurante.actualizar_texto_busqueda()
+    restaurantes = Restaurante.objects.bulk_create(restaurantes)
+    categorias = Categoria.objects.bulk_create([
+        Categoria(restaurante=restaurante, nombre='Categoría') for restaurante in restaurantes
+    ])
+    Subcategoria.objects.bulk_create([
+        Subcategoria(restaurante=categoria.restaurante, categoria=categoria, nombre=f'Subcategoría {j}')
+        for i, categoria in enumerate(categorias, start=desde)
+        for j in range(i % 3)
+    ])
+    Comida.objects.bulk_create([
+        Comida(restaurante=categoria.restaurante, categoria=categoria, nombre=f'Comida {j}', precio=1)
+        for i, categoria in enumerate(categorias, start=desde)
+        for j in range(i % 5)
+    ])
+    reconciliar([restaurante.id for restaurante in restaurantes])
+
+
+# Sin cache: los totales globales se recalculan en cada pedido
+@override_settings(CACHES=SIN_CACHE)
+class DashboardsSuperadminTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.token = Token.objects.create(user=User.objects.create_superuser('test-dashboards-superadmin'))
+        crear_restaurantes(0, 60)
+
+    def setUp(self):
+        self.superadmin = Client(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def urls(self):
+        return [
+            ('/api/admin/', self.superadmin),
+            (f'/api/admin/test/?token={self.token.key}', Client()),
+            ('/api/admin/simple/', Client()),
+        ]
+
+    def pedir(self, cliente, url):
+        response = cliente.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return response.json()
+
+    def recorrer(self, url):
+        """Ids de todas las páginas del directorio a partir de `url`."""
+        ids = []
+        while url:
+            datos = self.pedir(self.superadmin, url)
+            ids += [fila['id'] for fila in datos['restaurantes']]
+            url = datos['paginacion']['siguiente']
+        return ids
+
+    def test_queries_constantes(self):
+        medidas = []
+        for url, cliente in self.urls():
+            with CaptureQueriesContext(connection) as queries:
+                self.pedir(cliente, url)
+            medidas.append(len(queries))
+        crear_restaurantes(60, 1000)
+        for (url, cliente), cantidad in zip(self.urls(), medidas):
+            with self.subTest(url=url), self.assertNumQueries(cantidad):
+                self.pedir(cliente, url)
+
+    def test_cantidades(self):
+        datos = self.pedir(self.superadmin, '/api/admin/?page_size=200')
+        self.assertEqual(len(datos['restaurantes']), Restaurante.objects.count())
+        for fila in datos['restaurantes']:
+            with self.subTest(slug=fila['slug']):
+                self.assertEqual(fila['estadisticas'], {
+                    'categorias': Categoria.objects.filter(restaurante_id=fila['id']).count(),
+                    'subcategorias': Subcategoria.objects.filter(restaurante_id=fila['id']).count(),
+                    'comidas': Comida.objects.filter(restaurante_id=fila['id']).count(),
+                })
+        totales = datos['estadisticas_globales']
+        self.assertEqual(totales['total_restaurantes'], Restaurante.objects.count())
+        self.assertEqual(totales['total_comidas'], Comida.objects.count())
+
+    def test_ordenes(self):
+        for nombre, (campo, desempate) in RestauranteCursorPagination.ordenes.items():
+            for signo in ('', '-'):
+                with self.subTest(orden=f'{signo}{nombre}'):
+                    esperados = list(
+                        Restaurante.objects.order_by(f'{signo}{campo}', f'{signo}{desempate}').values_list('id', flat=True)
+                    )
+                    self.assertEqual(self.recorrer(f'/api/admin/?orden={signo}{nombre}&page_size=7'), esperados)
+
+    def test_simple_paginado(self):
+        slugs, url = [], '/api/admin/simple/?page_size=7'
+        while url:
+            datos = self.pedir(Client(), url)
+            self.assertLessEqual(len(datos['restaurantes']), 7)
+            slugs += [fila['slug'] for fila in datos['restaurantes']]
+            url = datos['paginacion']['siguiente']
+        self.assertEqual(slugs, list(Restaurante.objects.order_by('texto_busqueda', 'id').values_list('slug', flat=True)))
+        self.assertEqual(datos['total_restaurantes'], Restaurante.objects.count())
+
+    def test_simple_una_query_de_restaurantes(self):
+        with CaptureQueriesContext(connection) as queries:
+            datos = self.pedir(Client(), '/api/admin/simple/')
+        # La página (con propietario y contadores), sus categorías y los totales (cacheados fuera de los tests)
+        self.assertEqual(len(queries), 4, [query['sql'] for query in queries])
+        restaurantes = [query for query in queries if query['sql'].startswith('SELECT "carta_restaurantes_restaurante"')]
+        self.assertEqual(len(restaurantes), 1)
+        self.assertTrue(all(len(fila['categorias']) <= 3 for fila in datos['restaurantes']))
+
+    def test_contadores_al_guardar(self):
+        restaurante = Restaurante.objects.create(
+            nombre='Nuevo', slug='test-dashboards-nuevo', propietario=User.objects.create_user('dueno-nuevo')
+        )
+        self.assertEqual(estadisticas.como_dict(restaurante.estadisticas_menu), {
+            'categorias': 0, 'subcategorias': 0, 'comidas': 0,
+        })
+        self.assertIn(restaurante.id, self.recorrer('/api/admin/?orden=comidas&page_size=200'))
+
+    def test_sin_contadores_hasta_reconciliar(self):
+        # Como tras bulk_create o loaddata: sin fila de EstadisticasMenu
+        EstadisticasMenu.objects.filter(restaurante__slug__in=['test-dashboards-4', 'test-dashboards-7']).delete()
+        self.assertEqual(len(self.recorrer('/api/admin/?orden=-comidas&page_size=7')), Restaurante.objects.count() - 2)
+        reconciliar()
+        self.assertEqual(len(self.recorrer('/api/admin/?orden=-comidas&page_size=7')), Restaurante.objects.count())
+
+    def test_sin_contadores_un_get_no_escribe(self):
+        EstadisticasMenu.objects.filter(restaurante__slug__in=['test-dashboards-4', 'test-dashboards-7']).delete()
+        filas = {}
+        for url in ('/api/admin/?q=test-dashboards-4', '/api/admin/?q=test-dashboards-7', '/api/admin/simple/?page_size=200'):
+            with CaptureQueriesContext(connection) as queries:
+                datos = self.pedir(self.superadmin, url)
+            self.assertFalse([query['sql'] for query in queries if not query['sql'].startswith('SELECT')], url)
+            filas.update({fila['slug']: fila for fila in datos['restaurantes'] if 'estadisticas' in fila})
+        self.assertFalse(EstadisticasMenu.objects.filter(restaurante__slug__in=['test-dashboards-4', 'test-dashboards-7']).exists())
+        # Calculados en el momento: los mismos que darían los contadores
+        for slug in ('test-dashboards-4', 'test-dashboards-7'):
+            with self.subTest(slug=slug):
+                restaurante = Restaurante.objects.get(slug=slug)
+                self.assertEqual(filas[slug]['estadisticas'], {
+                    'categorias': Categoria.objects.filter(restaurante=restaurante).count(),
+                    'subcategorias': Subcategoria.objects.filter(restaurante=restaurante).count(),
+                    'comidas': Comida.objects.filter(restaurante=restaurante).count(),
+                })
+                self.assertEqual(estadisticas.leer(restaurante.id).comidas, restaurante.comidas.count())
+        self.assertFalse(EstadisticasMenu.objects.filter(restaurante__slug__in=['test-dashboards-4', 'test-dashboards-7']).exists())
+
+    def test_busqueda(self):
+        restaurantes = list(Restaurante.objects.select_related('propietario'))
+        casos = [
+            ('sintetico 1', lambda restaurante: restaurante.nombre.startswith('Sintético 1')),
+            ('test-dashboards-3', lambda restaurante: restaurante.slug.startswith('test-dashboards-3')),
+            ('dueno-5', lambda restaurante: restaurante.propietario.username.startswith('dueno-5')),
+        ]
+        for texto, coincide in casos:
+            with self.subTest(q=texto):
+                ids = self.recorrer(f'/api/admin/?q={texto}&page_size=4')
+                esperados = {restaurante.id for restaurante in restaurantes if coincide(restaurante)}
+                self.assertTrue(esperados)
+                self.assertLessEqual(esperados, set(ids))
+                self.assertEqual(len(ids), len(set(ids)))
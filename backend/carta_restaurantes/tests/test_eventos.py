@@ -0,0 +1,80 @@
+"""
+Tests - Eventos del menú en vivo (ver eventos.py)
+"""
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from carta_restaurantes import eventos
+from carta_restaurantes.models import Comida, VersionMenu
+from carta_restaurantes.datos_sinteticos import SIN_CACHE, crear_menu_sintetico
+
+
+def leer(mensaje):
+    """(id, evento, datos) del último evento SSE de `mensaje`."""
+    campos = dict(linea.split(': ', 1) for linea in mensaje.decode().split('\n\n')[-2].split('\n'))
+    return int(campos['id']), campos['event'], json.loads(campos['data'])
+
+
+@override_settings(CACHES=SIN_CACHE, EVENTOS_BROKER='carta_restaurantes.eventos.BrokerEnProceso')
+class FlujoTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.restaurante = crear_menu_sintetico('test-eventos', 20, categorias=2, subcategorias_por_categoria=2)
+
+    def setUp(self):
+        # Un broker por test: el del proceso vive en un event loop que ya no existe
+        eventos._broker = None
+        self.addCleanup(setattr, eventos, '_broker', None)
+
+    def sin_stock(self):
+        """Deja sin stock una comida y commitea, como el admin; devuelve su id."""
+        comida = Comida.objects.filter(restaurante=self.restaurante, disponible=True).first()
+        comida.disponible = False
+        with self.captureOnCommitCallbacks(execute=True):
+            comida.save()
+        return comida.id
+
+    async def abrir(self):
+        version = await VersionMenu.objects.filter(restaurante=self.restaurante).values_list('numero', flat=True).aget()
+        return version, eventos.flujo(self.restaurante.id, version)
+
+    async def cerrar(self, flujo):
+        # Como al desconectarse el cliente; la tarea del broker no sobrevive al event loop del test
+        await flujo.aclose()
+        eventos.obtener_broker().tarea.cancel()
+
+    async def test_version_y_cambios(self):
+        version, flujo = await self.abrir()
+        try:
+            primero = await anext(flujo)
+            self.assertTrue(primero.startswith(b'retry: '))
+            self.assertEqual(leer(primero), (version, 'version', {'version': version}))
+
+            comida_id = await sync_to_async(self.sin_stock)()
+            evento_id, tipo, datos = leer(await asyncio.wait_for(anext(flujo), 5))
+            self.assertEqual((evento_id, tipo), (version + 1, 'menu'))
+            self.assertEqual((datos['desde'], datos['version']), (version, version + 1))
+            self.assertEqual([(c['id'], c['disponible']) for c in datos['comidas']], [(comida_id, False)])
+        finally:
+            await self.cerrar(flujo)
+
+    async def test_al_cerrar_se_desuscribe(self):
+        _, flujo = await self.abrir()
+        await anext(flujo)
+        broker = eventos.obtener_broker()
+        self.assertEqual(len(broker.suscriptores[self.restaurante.id]), 1)
+        await self.cerrar(flujo)
+        self.assertNotIn(self.restaurante.id, broker.suscriptores)
+        self.assertNotIn(self.restaurante.id, broker.versiones)
+
+    @override_settings(EVENTOS_LATIDO=0.01)
+    async def test_latido(self):
+        _, flujo = await self.abrir()
+        try:
+            await anext(flujo)
+            self.assertEqual(await asyncio.wait_for(anext(flujo), 5), b': latido\n\n')
+        finally:
+            await self.cerrar(flujo)
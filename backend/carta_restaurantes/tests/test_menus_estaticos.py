@@ -0,0 +1,83 @@
+"""
+Tests - Export estático de menús (ver menus_estaticos.py y el comando exportar_menus)
+
+Exportar dos veces seguidas no reescribe nada salvo el manifest, y tras
+cambiar el menú de un restaurante solo se reescriben sus archivos: los de los
+demás conservan su fecha de modificación.
+"""
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from carta_restaurantes import menus_estaticos
+from carta_restaurantes.models import Comida
+from carta_restaurantes.datos_sinteticos import SIN_CACHE, crear_menu_sintetico
+
+
+@override_settings(CACHES=SIN_CACHE)
+class ExportarMenusTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Ejecutados: versiones y snapshots como tras guardar desde el admin
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.restaurantes = {
+                slug: crear_menu_sintetico(slug, 20, categorias=2, subcategorias_por_categoria=2)
+                for slug in ('estatico-a', 'estatico-b', 'estatico-c')
+            }
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.raiz = directorio.name
+
+    def exportar(self):
+        """Corre el comando; devuelve los slugs (o el manifest) de cada archivo escrito."""
+        with mock.patch.object(menus_estaticos, '_escribir', wraps=menus_estaticos._escribir) as escribir:
+            call_command('exportar_menus', destino=self.raiz, stdout=StringIO())
+        return [os.path.relpath(llamada.args[0], self.raiz).split(os.sep)[0] for llamada in escribir.call_args_list]
+
+    def fechas(self, slug):
+        directorio = os.path.join(self.raiz, slug)
+        return {nombre: os.stat(os.path.join(directorio, nombre)).st_mtime_ns for nombre in os.listdir(directorio)}
+
+    def cambiar_menu(self, slug):
+        comida = Comida.objects.filter(restaurante=self.restaurantes[slug], disponible=True).first()
+        comida.nombre += ' (nuevo)'
+        with self.captureOnCommitCallbacks(execute=True):
+            comida.save()
+
+    def test_solo_los_que_cambiaron(self):
+        escritos = self.exportar()
+        self.assertEqual(set(escritos), {'estatico-a', 'estatico-b', 'estatico-c', menus_estaticos.MANIFEST})
+        fechas = {slug: self.fechas(slug) for slug in self.restaurantes}
+        manifest = menus_estaticos.leer_manifest(self.raiz)
+
+        # Sin cambios: solo el manifest
+        self.assertEqual(self.exportar(), [menus_estaticos.MANIFEST])
+        self.assertEqual({slug: self.fechas(slug) for slug in self.restaurantes}, fechas)
+
+        self.cambiar_menu('estatico-b')
+        # Los cuatro archivos del menú cambiado y el manifest
+        self.assertEqual(self.exportar(), ['estatico-b'] * 4 + [menus_estaticos.MANIFEST])
+        for slug in ('estatico-a', 'estatico-c'):
+            with self.subTest(slug=slug):
+                self.assertEqual(self.fechas(slug), fechas[slug])
+        nuevo = menus_estaticos.leer_manifest(self.raiz)
+        self.assertNotEqual(nuevo['estatico-b']['json'], manifest['estatico-b']['json'])
+        self.assertGreater(nuevo['estatico-b']['version'], manifest['estatico-b']['version'])
+        self.assertEqual(nuevo['estatico-a'], manifest['estatico-a'])
+        # La generación anterior se conserva para quien todavía la referencia
+        self.assertTrue(os.path.exists(os.path.join(self.raiz, manifest['estatico-b']['json'])))
+
+    def test_inactivo_se_elimina(self):
+        self.exportar()
+        restaurante = self.restaurantes['estatico-c']
+        restaurante.activo = False
+        with self.captureOnCommitCallbacks(execute=True):
+            restaurante.save()
+        self.assertEqual(self.exportar(), [menus_estaticos.MANIFEST])
+        self.assertFalse(os.path.exists(os.path.join(self.raiz, 'estatico-c')))
+        self.assertNotIn('estatico-c', menus_estaticos.leer_manifest(self.raiz))
@@ -0,0 +1,94 @@
+"""
+Tests - Menús de varios restaurantes en una respuesta (MenusLote y MenusLoteAsync)
+"""
+import json
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory, TestCase, override_settings
+from carta_restaurantes import serializacion_rapida
+from carta_restaurantes.models import Comida, MenuSnapshot
+from carta_restaurantes.datos_sinteticos import SIN_CACHE, crear_menu_sintetico
+from carta_restaurantes.views import MenusLote, MenusLoteAsync
+
+
+@override_settings(CACHES=SIN_CACHE)
+class MenusLoteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Ejecutados: versiones y snapshots como tras guardar desde el admin
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.restaurantes = {
+                slug: crear_menu_sintetico(slug, 20, categorias=2, subcategorias_por_categoria=2)
+                for slug in ('lote-a', 'lote-b', 'lote-c')
+            }
+
+    def pedir(self, *restaurantes, **cabeceras):
+        request = RequestFactory().get('/api/menus/', {'restaurantes': restaurantes}, **cabeceras)
+        response = MenusLote.as_view()(request)
+        return response.render() if hasattr(response, 'render') else response
+
+    def menus(self, *restaurantes):
+        response = self.pedir(*restaurantes)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_orden_pedido(self):
+        datos = self.menus('lote-c,lote-a,lote-b')
+        self.assertEqual([menu['slug'] for menu in datos['menus']], ['lote-c', 'lote-a', 'lote-b'])
+        self.assertEqual(datos['no_encontrados'], [])
+
+    def test_mismo_menu_que_el_individual(self):
+        restaurante = self.restaurantes['lote-b']
+        esperado = json.loads(json.dumps(serializacion_rapida.menu(restaurante)))
+        self.assertEqual(self.menus('lote-b')['menus'], [esperado])
+        # Sin snapshot se serializa en el momento, igual
+        MenuSnapshot.objects.filter(restaurante=restaurante).delete()
+        self.assertEqual(self.menus('lote-a,lote-b')['menus'][1], esperado)
+
+    def test_slugs_repetidos(self):
+        datos = self.menus('lote-a,lote-b,lote-a', 'lote-b')
+        self.assertEqual([menu['slug'] for menu in datos['menus']], ['lote-a', 'lote-b'])
+
+    def test_no_encontrados(self):
+        self.restaurantes['lote-c'].activo = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurantes['lote-c'].save()
+        datos = self.menus('lote-a,no-existe,lote-c')
+        self.assertEqual([menu['slug'] for menu in datos['menus']], ['lote-a'])
+        self.assertEqual(datos['no_encontrados'], ['no-existe', 'lote-c'])
+
+    @override_settings(MENUS_LOTE_MAXIMO=2)
+    def test_maximo(self):
+        self.assertEqual(self.pedir('lote-a,lote-b').status_code, 200)
+        # Repetidos no cuentan
+        self.assertEqual(self.pedir('lote-a,lote-b,lote-a').status_code, 200)
+        response = self.pedir('lote-a,lote-b,lote-c')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('restaurantes', json.loads(response.content))
+
+    def test_sin_slugs(self):
+        self.assertEqual(self.pedir(' , ').status_code, 400)
+
+    def test_etag_cambia_con_cualquier_menu(self):
+        etag = self.pedir('lote-a,lote-b,lote-c')['ETag']
+        self.assertEqual(self.pedir('lote-a,lote-b,lote-c', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Otra lista es otra respuesta
+        self.assertNotEqual(self.pedir('lote-c,lote-b,lote-a')['ETag'], etag)
+
+        comida = Comida.objects.filter(restaurante=self.restaurantes['lote-b'], disponible=True).first()
+        comida.disponible = False
+        with self.captureOnCommitCallbacks(execute=True):
+            comida.save()
+        response = self.pedir('lote-a,lote-b,lote-c', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.pedir('lote-a,lote-b,lote-c', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+
+class MenusLoteAsyncTests(MenusLoteTests):
+    """Los mismos casos con la vista async del servidor ASGI."""
+
+    def pedir(self, *restaurantes, **cabeceras):
+        request = RequestFactory().get('/api/menus/', {'restaurantes': restaurantes}, **cabeceras)
+        response = async_to_sync(MenusLoteAsync.as_view())(request)
+        return response.render() if hasattr(response, 'render') else response
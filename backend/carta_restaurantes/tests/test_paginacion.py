@@ -0,0 +1,152 @@
+"""
+Tests - Paginación por cursor (ver pagination.py)
+
+Recorrer todas las páginas siguiendo `next` da cada fila una sola vez y en el
+orden de un order_by(), también con muchos empates en la columna del orden
+(ahí desempata el id), y un cursor adulterado es un 404.
+"""
+import base64
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlsplit
+from django.contrib.auth.models import User
+from django.test import Client, TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from carta_restaurantes import restaurantes_cache
+from carta_restaurantes.models import Comida, Restaurante
+from carta_restaurantes.pagination import ComidaCursorPagination, RestauranteCursorPagination
+from carta_restaurantes.datos_sinteticos import SIN_CACHE, crear_menu_sintetico
+
+
+def cursor(contenido):
+    return base64.urlsafe_b64encode(contenido.encode()).decode('ascii')
+
+
+CURSORES_ADULTERADOS = ('no-es-base64!', cursor('ñ'), cursor('uno:dos'), cursor('[1, 2, 3]'), cursor('[null, 1]'))
+# Bien formados pero con un valor que no es del tipo del orden
+CURSORES_ADULTERADOS_POR_ORDEN = {
+    'nombre': (cursor('["paginado", "uno"]'),),
+    'fecha': (cursor('["2024-13-45T12:00:00", 1]'),),
+    'comidas': (cursor('["muchas", 1]'),),
+}
+
+
+@override_settings(CACHES=SIN_CACHE)
+class ComidaCursorPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # orden = i % 10: cada valor de orden se repite 13 o 14 veces
+        cls.restaurante = crear_menu_sintetico('test-paginacion', 137, categorias=2, subcategorias_por_categoria=2)
+
+    def setUp(self):
+        restaurantes_cache.limpiar()
+
+    def pedir(self, url, **parametros):
+        response = self.client.get(url, parametros)
+        self.assertEqual(response.status_code, 200, url)
+        return response.json()
+
+    def recorrer(self, page_size):
+        """Ids de todas las páginas siguiendo `next`, y la cantidad de páginas."""
+        datos = self.pedir('/api/comidas/', restaurante=self.restaurante.slug, page_size=page_size)
+        ids, paginas = [], 1
+        while True:
+            self.assertLessEqual(len(datos['results']), page_size)
+            ids += [comida['id'] for comida in datos['results']]
+            if datos['next'] is None:
+                return ids, paginas
+            datos = self.pedir(datos['next'])
+            paginas += 1
+
+    def test_recorre_todo_sin_repetir_ni_saltear(self):
+        esperados = list(
+            Comida.objects.filter(restaurante=self.restaurante).order_by('orden', 'id').values_list('id', flat=True)
+        )
+        for page_size in (1, 7, 13, 50, 137, 500):
+            with self.subTest(page_size=page_size):
+                ids, paginas = self.recorrer(page_size)
+                self.assertEqual(ids, esperados)
+                self.assertEqual(paginas, max(1, -(-len(esperados) // page_size)))
+
+    def test_next(self):
+        datos = self.pedir('/api/comidas/', restaurante=self.restaurante.slug, page_size=10)
+        self.assertTrue(datos['next'].startswith('http://testserver/api/comidas/?'))
+        parametros = parse_qs(urlsplit(datos['next']).query)
+        # Conserva el resto de la consulta y el cursor apunta a la última fila de la página
+        self.assertEqual(parametros['restaurante'], [self.restaurante.slug])
+        self.assertEqual(parametros['page_size'], ['10'])
+        ultima = Comida.objects.get(pk=datos['results'][-1]['id'])
+        self.assertEqual(parametros['cursor'], [ComidaCursorPagination().encode_cursor(ultima.orden, ultima.id)])
+        # La última página no tiene next
+        ultima_pagina = self.pedir('/api/comidas/', restaurante=self.restaurante.slug, page_size=137)
+        self.assertIsNone(ultima_pagina['next'])
+
+    def test_sin_parametros_no_pagina(self):
+        datos = self.pedir('/api/comidas/', restaurante=self.restaurante.slug)
+        self.assertIsInstance(datos, list)
+        self.assertEqual(len(datos), 137)
+
+    def test_cursor_adulterado(self):
+        for adulterado in CURSORES_ADULTERADOS:
+            with self.subTest(cursor=adulterado):
+                response = self.client.get('/api/comidas/', {'restaurante': self.restaurante.slug, 'cursor': adulterado})
+                self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CACHES=SIN_CACHE)
+class RestauranteCursorPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.token = Token.objects.create(user=User.objects.create_superuser('test-paginacion-superadmin'))
+        for i in range(23):
+            Restaurante.objects.create(
+                nombre=f'Paginado {i}', slug=f'test-paginacion-{i}',
+                propietario=User.objects.create_user(f'test-paginacion-dueno-{i}'),
+            )
+        # Empates en la fecha de a cinco restaurantes, con microsegundos para que el cursor los conserve
+        for i, restaurante in enumerate(Restaurante.objects.order_by('id')):
+            Restaurante.objects.filter(pk=restaurante.pk).update(
+                fecha_creacion=datetime(2024, 5, 1 + i // 5, 12, 0, 0, 123456, tzinfo=timezone.utc)
+            )
+
+    def setUp(self):
+        self.superadmin = Client(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def recorrer(self, url):
+        ids = []
+        while url:
+            response = self.superadmin.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            datos = response.json()
+            ids += [fila['id'] for fila in datos['restaurantes']]
+            url = datos['paginacion']['siguiente']
+        return ids
+
+    def test_recorre_los_empates_sin_repetir_ni_saltear(self):
+        for orden in ('fecha', '-fecha', 'comidas', '-comidas'):
+            campo, desempate = RestauranteCursorPagination.ordenes[orden.removeprefix('-')]
+            signo = '-' if orden.startswith('-') else ''
+            esperados = list(
+                Restaurante.objects.order_by(f'{signo}{campo}', f'{signo}{desempate}').values_list('id', flat=True)
+            )
+            for page_size in (1, 4, 5, 200):
+                with self.subTest(orden=orden, page_size=page_size):
+                    self.assertEqual(self.recorrer(f'/api/admin/?orden={orden}&page_size={page_size}'), esperados)
+
+    def test_siguiente(self):
+        response = self.superadmin.get('/api/admin/?orden=-fecha&page_size=5')
+        siguiente = response.json()['paginacion']['siguiente']
+        parametros = parse_qs(urlsplit(siguiente).query)
+        self.assertEqual(parametros['orden'], ['-fecha'])
+        self.assertEqual(parametros['page_size'], ['5'])
+        self.assertIn('cursor', parametros)
+        response = self.superadmin.get('/api/admin/?orden=-fecha&page_size=200')
+        self.assertIsNone(response.json()['paginacion']['siguiente'])
+
+    def test_cursor_adulterado(self):
+        for orden in RestauranteCursorPagination.ordenes:
+            for adulterado in CURSORES_ADULTERADOS + CURSORES_ADULTERADOS_POR_ORDEN[orden]:
+                with self.subTest(orden=orden, cursor=adulterado):
+                    response = self.superadmin.get('/api/admin/', {'orden': orden, 'cursor': adulterado})
+                    self.assertEqual(response.status_code, 404)
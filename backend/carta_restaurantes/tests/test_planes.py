@@ -0,0 +1,131 @@
+"""
+Tests - Planes de ejecución de los endpoints del menú
+
+Cada SELECT de los endpoints públicos (sin snapshot y con snapshot), los del
+admin y el directorio de restaurantes del superadmin (cada orden, primera
+página y la siguiente por cursor) pasa por EXPLAIN QUERY PLAN (SQLite) o
+EXPLAIN (PostgreSQL). Ninguno puede recorrer una tabla entera ni ordenar en
+memoria: eso quiere decir que falta el índice que cubre su filtro y su orden
+(ver los Meta de models.py).
+
+- SQLite: "SCAN <tabla>" sin índice y "USE TEMP B-TREE". Recorrer un índice
+  en orden ("SCAN ... USING INDEX") se acepta solo en queries con LIMIT,
+  como el listado global paginado del superadmin.
+- Los totales del dashboard del superadmin suman tablas enteras a propósito y
+  se leen del cache (ver admin_dashboards.estadisticas_globales): se calculan
+  antes de medir. La búsqueda (?q=) no se verifica: junta tres rangos de
+  índices y ordena en memoria las coincidencias, no la tabla.
+- PostgreSQL: "Seq Scan" y "Sort". Con tablas chicas el planner prefiere
+  recorrerlas enteras, así que se desactivan enable_seqscan y enable_sort:
+  si igual aparecen, es que ningún índice sirve.
+"""
+import json
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from carta_restaurantes import restaurantes_cache
+from carta_restaurantes.admin_dashboards import estadisticas_globales
+from carta_restaurantes.datos_sinteticos import CACHE_LOCAL, SIN_CACHE, crear_menu_sintetico, urls_de_verificacion
+from carta_restaurantes.snapshots import reconstruir_snapshots
+
+
+ORDENES_DIRECTORIO = ('nombre', '-nombre', 'fecha', '-fecha', 'comidas', '-comidas')
+
+
+def problemas_sqlite(sql, plan):
+    problemas = []
+    for detalle in plan:
+        if detalle.startswith('USE TEMP B-TREE'):
+            problemas.append(detalle)
+        elif detalle.startswith('SCAN ') and 'VIRTUAL TABLE' not in detalle and 'CONSTANT ROW' not in detalle:
+            if ' USING ' not in detalle or ' LIMIT ' not in sql:
+                problemas.append(detalle)
+    return problemas
+
+
+def problemas_postgresql(sql, plan):
+    problemas = []
+    pendientes = [plan[0]['Plan']]
+    while pendientes:
+        nodo = pendientes.pop()
+        if nodo['Node Type'] in ('Seq Scan', 'Sort', 'Incremental Sort'):
+            problemas.append(f"{nodo['Node Type']} {nodo.get('Relation Name', '')}".strip())
+        pendientes.extend(nodo.get('Plans', []))
+    return problemas
+
+
+def explicar(sql):
+    """(líneas del plan, problemas encontrados) de un SELECT ya interpolado."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = [fila[-1] for fila in cursor.fetchall()]
+            return plan, problemas_sqlite(sql, plan)
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return [json.dumps(plan[0]['Plan'])[:300]], problemas_postgresql(sql, plan)
+
+
+@override_settings(CACHES=SIN_CACHE)
+class PlanesPorEndpointTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Otro restaurante con datos: un filtro por tenant que falte se nota en el plan
+        crear_menu_sintetico('test-planes-otro', 1000)
+        cls.restaurante = crear_menu_sintetico('test-planes', 1000)
+        Token.objects.create(user=cls.restaurante.propietario)
+        Token.objects.create(user=User.objects.create_superuser('test-planes-superadmin'))
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('SET LOCAL enable_sort = off')
+
+    def cliente(self, usuario):
+        return Client(HTTP_AUTHORIZATION=f'Token {usuario.auth_token.key}')
+
+    def assertUsanIndices(self, cliente, urls):
+        for url in urls:
+            with self.subTest(url=url):
+                restaurantes_cache.limpiar()
+                with CaptureQueriesContext(connection) as queries:
+                    response = cliente.get(url)
+                self.assertEqual(response.status_code, 200)
+                for query in queries:
+                    sql = query['sql']
+                    if not sql.lstrip().upper().startswith('SELECT'):
+                        continue
+                    plan, problemas = explicar(sql)
+                    self.assertEqual(problemas, [], f'{sql}\n' + '\n'.join(plan))
+
+    def test_publicos_sin_snapshot(self):
+        self.assertUsanIndices(Client(), urls_de_verificacion(self.restaurante)['publico'])
+
+    def test_publicos_con_snapshot(self):
+        reconstruir_snapshots(self.restaurante.id)
+        self.assertUsanIndices(Client(), urls_de_verificacion(self.restaurante)['publico'])
+
+    def test_admin(self):
+        self.assertUsanIndices(
+            self.cliente(self.restaurante.propietario), urls_de_verificacion(self.restaurante)['admin']
+        )
+
+    # Cache real solo para los totales del superadmin, que se calculan antes de medir
+    @override_settings(CACHES=CACHE_LOCAL)
+    def test_directorio_superadmin(self):
+        cache.clear()
+        estadisticas_globales()
+        superadmin = self.cliente(User.objects.get(username='test-planes-superadmin'))
+        urls = []
+        for orden in ORDENES_DIRECTORIO:
+            url = f'/api/admin/?orden={orden}&page_size=1'
+            siguiente = superadmin.get(url).json()['paginacion']['siguiente']
+            urls += [url, siguiente.removeprefix('http://testserver')]
+        self.assertUsanIndices(superadmin, urls)
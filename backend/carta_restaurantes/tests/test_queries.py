@@ -0,0 +1,69 @@
+"""
+Tests - Cantidad de queries por endpoint (sin N+1)
+
+Cada endpoint público y del admin tiene que hacer las mismas queries con un
+menú chico que con uno grande. Los públicos se miden sin snapshot (ORM), con
+snapshot y con la respuesta ya guardada en el cache por restaurante (ver
+cache_por_restaurante.py).
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from carta_restaurantes import restaurantes_cache
+from carta_restaurantes.datos_sinteticos import CACHE_LOCAL, SIN_CACHE, crear_menu_sintetico, urls_de_verificacion
+from carta_restaurantes.snapshots import reconstruir_snapshots
+
+
+@override_settings(CACHES=SIN_CACHE)
+class QueriesPorEndpointTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.chico = crear_menu_sintetico('test-queries-chico', 20, categorias=2, subcategorias_por_categoria=2)
+        cls.grande = crear_menu_sintetico('test-queries-grande', 1000)
+        for restaurante in (cls.chico, cls.grande):
+            Token.objects.create(user=restaurante.propietario)
+
+    def pedir(self, cliente, url):
+        # Cada request resuelve el slug desde cero, como el primero de un worker
+        restaurantes_cache.limpiar()
+        response = cliente.get(url)
+        self.assertEqual(response.status_code, 200, url)
+
+    def assertMismasQueries(self, lista, cliente=None, preparar=None):
+        """Los endpoints de `lista` ('publico' o 'admin') hacen con el menú grande las queries que con el chico."""
+        clientes = {
+            restaurante: cliente or Client(HTTP_AUTHORIZATION=f'Token {restaurante.propietario.auth_token.key}')
+            for restaurante in (self.chico, self.grande)
+        }
+        urls_chico = urls_de_verificacion(self.chico)[lista]
+        urls_grande = urls_de_verificacion(self.grande)[lista]
+        for url_chico, url_grande in zip(urls_chico, urls_grande):
+            with self.subTest(url=url_grande):
+                if preparar:
+                    preparar(clientes[self.chico], url_chico)
+                    preparar(clientes[self.grande], url_grande)
+                with CaptureQueriesContext(connection) as queries:
+                    self.pedir(clientes[self.chico], url_chico)
+                with self.assertNumQueries(len(queries)):
+                    self.pedir(clientes[self.grande], url_grande)
+
+    def test_publicos_sin_snapshot(self):
+        self.assertMismasQueries('publico', Client())
+
+    def test_publicos_con_snapshot(self):
+        reconstruir_snapshots(self.chico.id)
+        reconstruir_snapshots(self.grande.id)
+        self.assertMismasQueries('publico', Client())
+
+    @override_settings(CACHES=CACHE_LOCAL)
+    def test_publicos_desde_cache(self):
+        cache.clear()
+        reconstruir_snapshots(self.chico.id)
+        reconstruir_snapshots(self.grande.id)
+        self.assertMismasQueries('publico', Client(), preparar=self.pedir)
+
+    def test_admin(self):
+        self.assertMismasQueries('admin')
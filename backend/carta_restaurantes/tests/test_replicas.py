@@ -0,0 +1,46 @@
+"""
+Tests - Lectura de lo propio con réplicas (ver replicas.py)
+
+Tras un cambio, las lecturas públicas de ese restaurante van a la primaria
+para cualquier cliente; las de los demás siguen en las réplicas. El ruteo con
+bases reales lo recorre scripts/verificar_replicas.py.
+"""
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from carta_restaurantes import replicas
+from carta_restaurantes.models import Comida
+from carta_restaurantes.datos_sinteticos import CACHE_LOCAL
+
+
+@override_settings(CACHES=CACHE_LOCAL, DATABASE_REPLICAS=['replica1'], REPLICAS_PEGAJOSO_SEGUNDOS=5)
+class PrimariaTrasCambioTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def base_de_lectura(self, *restaurante_ids):
+        """Base que el router elige en una vista pública que lee esos restaurantes."""
+        @replicas.en_replica
+        def vista(request):
+            replicas.cambio_reciente(*restaurante_ids)
+            return replicas.RouterReplicas().db_for_read(Comida) or 'default'
+
+        return replicas.PrimariaTrasEscrituraMiddleware(vista)(RequestFactory().get('/'))
+
+    def test_sin_cambios_lee_de_replica(self):
+        self.assertEqual(self.base_de_lectura(1), 'replica1')
+
+    def test_tras_un_cambio_lee_de_primaria(self):
+        replicas.marcar_cambio(1)
+        self.assertEqual(self.base_de_lectura(1), 'default')
+        self.assertEqual(self.base_de_lectura(2, 1), 'default')
+        self.assertEqual(self.base_de_lectura(2), 'replica1')
+
+    def test_vencida_vuelve_a_replica(self):
+        with override_settings(REPLICAS_PEGAJOSO_SEGUNDOS=-1):
+            replicas.marcar_cambio(1)
+        self.assertEqual(self.base_de_lectura(1), 'replica1')
+
+    def test_fuera_de_vista_publica(self):
+        replicas.marcar_cambio(1)
+        self.assertFalse(replicas.cambio_reciente(1))
@@ -0,0 +1,72 @@
+"""
+Tests - Resolución slug → restaurante en memoria (ver restaurantes_cache.py)
+
+Un cambio commiteado en este proceso invalida la entrada: el slug viejo de un
+restaurante renombrado y un restaurante desactivado dan 404 en seguida. Un
+cambio que no pasa por este proceso (otro worker) se ve recién cuando vence
+la entrada, a los RESTAURANTES_CACHE_TTL segundos.
+"""
+from unittest import mock
+from django.test import TestCase, override_settings
+from carta_restaurantes import restaurantes_cache
+from carta_restaurantes.models import Restaurante
+from carta_restaurantes.datos_sinteticos import SIN_CACHE, crear_menu_sintetico
+
+
+@override_settings(CACHES=SIN_CACHE)
+class RestaurantesCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Ejecutados ya: si no, el alta quedaría pendiente y los cambios de los tests no invalidarían
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.restaurante = crear_menu_sintetico('test-restaurantes-cache', 20, categorias=2, subcategorias_por_categoria=2)
+
+    def setUp(self):
+        restaurantes_cache.limpiar()
+
+    def estado(self, slug):
+        return self.client.get('/api/menu/', {'restaurante': slug}).status_code
+
+    def guardar(self, **campos):
+        for campo, valor in campos.items():
+            setattr(self.restaurante, campo, valor)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurante.save()
+
+    def test_acierto_sin_queries(self):
+        resuelto = restaurantes_cache.resolver_restaurante(self.restaurante.slug)
+        self.assertEqual(resuelto.id, self.restaurante.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(restaurantes_cache.resolver_restaurante(self.restaurante.slug), resuelto)
+
+    def test_slug_cambiado(self):
+        anterior = self.restaurante.slug
+        self.assertEqual(self.estado(anterior), 200)
+        self.guardar(slug='test-restaurantes-cache-nuevo')
+        self.assertEqual(self.estado(anterior), 404)
+        self.assertEqual(self.estado('test-restaurantes-cache-nuevo'), 200)
+
+    def test_inactivo(self):
+        self.assertEqual(self.estado(self.restaurante.slug), 200)
+        self.guardar(activo=False)
+        self.assertEqual(self.estado(self.restaurante.slug), 404)
+        # Ya cacheado como inactivo: sigue siendo 404 sin volver a consultar
+        with self.assertNumQueries(0):
+            self.assertIsNone(restaurantes_cache.resolver_restaurante(self.restaurante.slug))
+        self.guardar(activo=True)
+        self.assertEqual(self.estado(self.restaurante.slug), 200)
+
+    def test_inexistente(self):
+        self.assertEqual(self.estado('test-restaurantes-cache-no-existe'), 404)
+
+    @override_settings(RESTAURANTES_CACHE_TTL=5)
+    def test_cambio_de_otro_proceso_hasta_el_ttl(self):
+        # update() no dispara las señales: como un cambio commiteado en otro worker
+        with mock.patch('carta_restaurantes.restaurantes_cache.time.monotonic', return_value=1000.0):
+            self.assertEqual(self.estado(self.restaurante.slug), 200)
+            Restaurante.objects.filter(pk=self.restaurante.pk).update(activo=False)
+        with mock.patch('carta_restaurantes.restaurantes_cache.time.monotonic', return_value=1004.9):
+            self.assertIsNotNone(restaurantes_cache.resolver_restaurante(self.restaurante.slug))
+        with mock.patch('carta_restaurantes.restaurantes_cache.time.monotonic', return_value=1005.0):
+            self.assertIsNone(restaurantes_cache.resolver_restaurante(self.restaurante.slug))
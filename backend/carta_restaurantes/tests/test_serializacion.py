@@ -0,0 +1,79 @@
+"""
+Tests - serializacion_rapida produce los mismos bytes que los serializers de DRF
+"""
+from django.db.models import Prefetch
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from carta_restaurantes import serializacion_rapida
+from carta_restaurantes.campos import acotar_queryset
+from carta_restaurantes.datos_sinteticos import crear_menu_sintetico
+from carta_restaurantes.models import Categoria, Subcategoria, Comida, Restaurante
+from carta_restaurantes.serializers import (
+    CategoriaSerializer, SubcategoriaSerializer, ComidaSerializer, MenuSerializer
+)
+
+
+class SerializacionRapidaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurante = crear_menu_sintetico('test-serializacion', 300)
+        cls.comidas = Comida.objects.filter(restaurante=cls.restaurante).order_by('orden', 'id')
+
+    def assertMismosBytes(self, drf, rapido):
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(drf), renderer.render(rapido))
+
+    def test_comidas(self):
+        self.assertMismosBytes(
+            ComidaSerializer(self.comidas.select_related('categoria', 'subcategoria'), many=True).data,
+            serializacion_rapida.comidas(self.comidas),
+        )
+
+    def test_comidas_con_fields(self):
+        campos = ('id', 'subcategoria_nombre', 'nombre', 'precio')
+        acotadas = acotar_queryset(
+            self.comidas, serializacion_rapida.columnas(campos, serializacion_rapida.COLUMNAS_CAMPO_COMIDA)
+        )
+        self.assertMismosBytes(
+            ComidaSerializer(acotadas, many=True, campos=campos).data,
+            serializacion_rapida.comidas(self.comidas, campos),
+        )
+
+    def test_subcategorias(self):
+        subcategorias = Subcategoria.objects.filter(restaurante=self.restaurante).order_by('orden', 'nombre')
+        self.assertMismosBytes(
+            SubcategoriaSerializer(subcategorias.select_related('categoria'), many=True).data,
+            serializacion_rapida.subcategorias(subcategorias),
+        )
+
+    def test_categorias(self):
+        categorias = Categoria.objects.filter(restaurante=self.restaurante).order_by('orden', 'nombre')
+        self.assertMismosBytes(
+            CategoriaSerializer(categorias.prefetch_related('subcategorias'), many=True).data,
+            serializacion_rapida.categorias(categorias),
+        )
+
+    def test_menu(self):
+        restaurante = Restaurante.objects.prefetch_related(
+            Prefetch('categorias', queryset=Categoria.objects.order_by('orden', 'nombre')),
+            Prefetch('categorias__subcategorias', queryset=Subcategoria.objects.order_by('orden', 'nombre')),
+            Prefetch(
+                'categorias__subcategorias__comida_set',
+                queryset=Comida.objects.filter(disponible=True).select_related('categoria').order_by('orden', 'id')
+            ),
+        ).get(pk=self.restaurante.pk)
+        self.assertMismosBytes(MenuSerializer(restaurante).data, serializacion_rapida.menu(self.restaurante))
+
+    @override_settings(MEDIA_BASE_URL='https://carta.example')
+    def test_imagen_absoluta(self):
+        categoria = Categoria.objects.filter(restaurante=self.restaurante).first()
+        Categoria.objects.filter(pk=categoria.pk).update(imagen='categorias/pizzas.webp')
+        categorias = Categoria.objects.filter(pk=categoria.pk)
+        self.assertMismosBytes(
+            CategoriaSerializer(categorias.prefetch_related('subcategorias'), many=True).data,
+            serializacion_rapida.categorias(categorias),
+        )
+        self.assertEqual(
+            serializacion_rapida.categorias(categorias)[0]['imagen'], 'https://carta.example/media/categorias/pizzas.webp'
+        )
@@ -0,0 +1,120 @@
+"""
+Tests - Deltas del menú desde una versión (/api/menu/cambios/, ver sincronizacion.py)
+"""
+import importlib
+from datetime import timedelta
+from decimal import Decimal
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from carta_restaurantes import restaurantes_cache, sincronizacion
+from carta_restaurantes.models import Categoria, Comida, Restaurante, Subcategoria, VersionMenu
+
+
+class DeltaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Cada bloque commitea, como un guardado desde el admin
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.restaurante = Restaurante.objects.create(
+                nombre='Delta', slug='test-delta', propietario=User.objects.create_user(username='test-delta')
+            )
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.categoria = Categoria.objects.create(restaurante=cls.restaurante, nombre='Pastas')
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.subcategoria = Subcategoria.objects.create(
+                restaurante=cls.restaurante, categoria=cls.categoria, nombre='Rellenas'
+            )
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.comida = Comida.objects.create(
+                restaurante=cls.restaurante, categoria=cls.categoria, subcategoria=cls.subcategoria,
+                nombre='Ravioles', precio=Decimal('100'),
+            )
+
+    def version(self):
+        return VersionMenu.objects.get(restaurante=self.restaurante).numero
+
+    def delta(self, desde):
+        restaurantes_cache.limpiar()
+        response = self.client.get('/api/menu/cambios/', {'restaurante': 'test-delta', 'desde': desde})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def guardar(self, accion):
+        with self.captureOnCommitCallbacks(execute=True):
+            return accion()
+
+    def test_desde_la_version_actual(self):
+        datos = self.delta(self.version())
+        self.assertFalse(datos['resincronizar'])
+        self.assertEqual(datos['cambios'], {'categorias': [], 'subcategorias': [], 'comidas': []})
+        self.assertEqual(datos['borrados'], {'categorias': [], 'subcategorias': [], 'comidas': []})
+
+    def test_desde_antes_del_registro(self):
+        # La versión inicial del contador no tiene entradas: no hay delta que armar
+        self.assertEqual(self.delta(0), {'version': self.version(), 'resincronizar': True})
+        self.assertFalse(self.delta(1)['resincronizar'])
+
+    def test_creado(self):
+        desde = self.version()
+        nueva = self.guardar(lambda: Comida.objects.create(
+            restaurante=self.restaurante, categoria=self.categoria, subcategoria=self.subcategoria,
+            nombre='Sorrentinos', precio=Decimal('120'),
+        ))
+        datos = self.delta(desde)
+        self.assertEqual(datos['version'], desde + 1)
+        self.assertEqual([comida['id'] for comida in datos['cambios']['comidas']], [nueva.id])
+        self.assertEqual(datos['cambios']['comidas'][0]['nombre'], 'Sorrentinos')
+
+    def test_modificado(self):
+        desde = self.version()
+        self.categoria.nombre = 'Pastas caseras'
+        self.guardar(self.categoria.save)
+        self.comida.precio = Decimal('150')
+        self.guardar(self.comida.save)
+        datos = self.delta(desde)
+        self.assertEqual(datos['version'], desde + 2)
+        self.assertEqual([(c['id'], c['nombre']) for c in datos['cambios']['categorias']], [(self.categoria.id, 'Pastas caseras')])
+        self.assertEqual([(c['id'], c['precio']) for c in datos['cambios']['comidas']], [(self.comida.id, '150.00')])
+        self.assertEqual(datos['cambios']['subcategorias'], [])
+
+    def test_borrado(self):
+        desde, subcategoria_id, comida_id = self.version(), self.subcategoria.id, self.comida.id
+        # En cascada: la comida también
+        self.guardar(self.subcategoria.delete)
+        datos = self.delta(desde)
+        self.assertEqual(datos['borrados']['subcategorias'], [subcategoria_id])
+        self.assertEqual(datos['borrados']['comidas'], [comida_id])
+        self.assertEqual(datos['cambios']['comidas'], [])
+
+    def test_creado_y_borrado(self):
+        desde = self.version()
+        nueva = self.guardar(lambda: Comida.objects.create(
+            restaurante=self.restaurante, categoria=self.categoria, nombre='Canelones', precio=Decimal('90'),
+        ))
+        nueva_id = nueva.id
+        self.guardar(nueva.delete)
+        datos = self.delta(desde)
+        self.assertEqual(datos['cambios']['comidas'], [])
+        self.assertEqual(datos['borrados']['comidas'], [nueva_id])
+
+    def test_compactado(self):
+        desde = self.version()
+        self.comida.nombre = 'Ravioles de verdura'
+        self.guardar(self.comida.save)
+        sincronizacion.compactar(timezone.now() + timedelta(seconds=1))
+        self.assertTrue(self.delta(desde)['resincronizar'])
+        datos = self.delta(self.version())
+        self.assertFalse(datos['resincronizar'])
+        self.assertEqual(datos['cambios']['comidas'], [])
+
+    def test_menus_anteriores_al_registro(self):
+        # Como quedaban tras agregar compactado_hasta con default 0
+        VersionMenu.objects.filter(restaurante=self.restaurante).update(compactado_hasta=0)
+        migracion = importlib.import_module('carta_restaurantes.migrations.0017_registro_cambios')
+        migracion.marcar_sin_registro(apps, None)
+        self.assertTrue(self.delta(0)['resincronizar'])
+        self.assertTrue(self.delta(self.version() - 1)['resincronizar'])
+        self.assertFalse(self.delta(self.version())['resincronizar'])
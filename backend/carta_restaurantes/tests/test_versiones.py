@@ -0,0 +1,84 @@
+"""
+Tests - GET condicional de los endpoints públicos (ver versiones.py)
+
+El ETag sale de la versión del menú: un If-None-Match vigente recibe 304 sin
+leer las tablas del menú, y guardar una comida lo cambia en todas sus
+variantes (sin comprimir, -gzip, -br).
+"""
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from carta_restaurantes import compresion, restaurantes_cache
+from carta_restaurantes.models import Comida
+from carta_restaurantes.datos_sinteticos import SIN_CACHE, crear_menu_sintetico
+
+
+# Tablas que un 304 no tiene que leer
+TABLAS_MENU = ('carta_restaurantes_comida', 'carta_restaurantes_categoria', 'carta_restaurantes_menusnapshot')
+
+
+@override_settings(CACHES=SIN_CACHE)
+class GetCondicionalTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Ejecutados ya: si no, el alta quedaría pendiente y los cambios de los tests no incrementarían la versión
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.restaurante = crear_menu_sintetico('test-versiones', 50, categorias=2, subcategorias_por_categoria=2)
+
+    def setUp(self):
+        restaurantes_cache.limpiar()
+
+    def pedir(self, url='/api/menu/', **cabeceras):
+        return self.client.get(url, {'restaurante': self.restaurante.slug}, **cabeceras)
+
+    def cambiar_menu(self):
+        comida = Comida.objects.filter(restaurante=self.restaurante, disponible=True).first()
+        comida.nombre += ' (nuevo)'
+        with self.captureOnCommitCallbacks(execute=True):
+            comida.save()
+
+    def test_200_con_etag(self):
+        for url in ('/api/menu/', '/api/categorias/', '/api/comidas/'):
+            with self.subTest(url=url):
+                response = self.pedir(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertRegex(response['ETag'], rf'^"{self.restaurante.id}-\d+"$')
+                self.assertIn('Last-Modified', response)
+
+    def test_304_sin_leer_el_menu(self):
+        etag = self.pedir()['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.pedir(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+        leidas = [query['sql'] for query in queries if any(tabla in query['sql'] for tabla in TABLAS_MENU)]
+        self.assertEqual(leidas, [])
+
+    def test_cambio_de_menu_cambia_el_etag(self):
+        anterior = self.pedir()
+        self.cambiar_menu()
+        response = self.pedir(HTTP_IF_NONE_MATCH=anterior['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], anterior['ETag'])
+        self.assertIn(b'(nuevo)', response.content)
+        self.assertEqual(self.pedir(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_variantes_comprimidas(self):
+        for codificacion in compresion.CODIFICACIONES:
+            with self.subTest(codificacion=codificacion):
+                anterior = self.pedir(HTTP_ACCEPT_ENCODING=codificacion)
+                self.assertEqual(anterior['Content-Encoding'], codificacion)
+                self.assertTrue(anterior['ETag'].endswith(f'-{codificacion}"'))
+                repetida = self.pedir(HTTP_ACCEPT_ENCODING=codificacion, HTTP_IF_NONE_MATCH=anterior['ETag'])
+                self.assertEqual(repetida.status_code, 304)
+
+                self.cambiar_menu()
+                response = self.pedir(HTTP_ACCEPT_ENCODING=codificacion, HTTP_IF_NONE_MATCH=anterior['ETag'])
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response['ETag'].endswith(f'-{codificacion}"'))
+                self.assertNotEqual(response['ETag'], anterior['ETag'])
+                self.assertEqual(
+                    self.pedir(HTTP_ACCEPT_ENCODING=codificacion, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304
+                )
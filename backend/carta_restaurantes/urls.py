@@ -581,6 +581,38 @@ def admin_dashboard_view(request):
                 transform: translateY(-2px);
                 box-shadow: 0 5px 15px rgba(81, 207, 102, 0.4);
             }
+            
+            .directory-toolbar {
+                display: flex;
+                gap: 15px;
+                margin-bottom: 25px;
+            }
+            
+            .directory-toolbar input,
+            .directory-toolbar select {
+                padding: 12px;
+                border: none;
+                border-radius: 8px;
+                font-size: 1rem;
+                font-family: inherit;
+            }
+            
+            .directory-toolbar input {
+                flex: 1;
+            }
+            
+            .btn-load-more {
+                display: block;
+                margin: 30px auto 0;
+                background: white;
+                color: #667eea;
+                border: none;
+                padding: 12px 24px;
+                border-radius: 8px;
+                font-size: 1rem;
+                font-weight: 600;
+                cursor: pointer;
+            }
         </style>
     </head>
     <body>
@@ -607,7 +639,21 @@ def admin_dashboard_view(request):
                         <i class="fas fa-plus"></i> Nuevo Restaurante
                     </button>
                     <h2 class="section-title"><i class="fas fa-store"></i> Restaurantes</h2>
+                    <div class="directory-toolbar">
+                        <input type="search" id="directory-search" placeholder="Buscar por nombre, slug o propietario..." oninput="searchRestaurants()">
+                        <select id="directory-order" onchange="loadDashboard()">
+                            <option value="nombre">Nombre (A-Z)</option>
+                            <option value="-nombre">Nombre (Z-A)</option>
+                            <option value="-fecha">Más nuevos</option>
+                            <option value="fecha">Más antiguos</option>
+                            <option value="-comidas">Más comidas</option>
+                            <option value="comidas">Menos comidas</option>
+                        </select>
+                    </div>
                     <div id="restaurants-grid" class="restaurants-grid"></div>
+                    <button id="load-more" class="btn-load-more" style="display: none;" onclick="loadMoreRestaurants()">
+                        <i class="fas fa-chevron-down"></i> Cargar más
+                    </button>
                 </div>
             </div>
             
@@ -662,6 +708,9 @@ def admin_dashboard_view(request):
             // Obtener token de la URL o localStorage
             const urlParams = new URLSearchParams(window.location.search);
             let token = urlParams.get('token') || localStorage.getItem('admin_token');
+            // URL de la página siguiente del directorio (null en la última)
+            let nextPageUrl = null;
+            let searchTimeout = null;
             
             if (!token) {
                 window.location.href = '/admin/web/login/';
@@ -674,12 +723,31 @@ def admin_dashboard_view(request):
                 loadDashboard();
             }
             
-            async function loadDashboard() {
+            // Directorio paginado en el servidor: búsqueda y orden elegidos
+            function directoryUrl() {
+                const params = new URLSearchParams({
+                    token: token,
+                    q: document.getElementById('directory-search').value.trim(),
+                    orden: document.getElementById('directory-order').value
+                });
+                return '/api/admin/test/?' + params.toString();
+            }
+            
+            function searchRestaurants() {
+                clearTimeout(searchTimeout);
+                searchTimeout = setTimeout(() => loadDashboard(), 300);
+            }
+            
+            function loadMoreRestaurants() {
+                if (nextPageUrl) {
+                    loadDashboard(nextPageUrl, true);
+                }
+            }
+            
+            async function loadDashboard(url = directoryUrl(), append = false) {
                 try {
                     console.log('Admin Dashboard - Iniciando...');
                     console.log('Admin Dashboard - Token:', token);
-                    
-                    const url = '/api/admin/test/?token=' + token;
                     console.log('Admin Dashboard - URL:', url);
                     
                     const response = await fetch(url, {
@@ -769,9 +837,16 @@ def admin_dashboard_view(request):
                             </div>
                         `).join('');
                         
-                        document.getElementById('restaurants-grid').innerHTML = restaurantsHTML;
+                        if (append) {
+                            document.getElementById('restaurants-grid').insertAdjacentHTML('beforeend', restaurantsHTML);
+                        } else {
+                            document.getElementById('restaurants-grid').innerHTML = restaurantsHTML;
+                        }
                     }
                     
+                    nextPageUrl = data.paginacion ? data.paginacion.siguiente : null;
+                    document.getElementById('load-more').style.display = nextPageUrl ? 'block' : 'none';
+                    
                 } catch (error) {
                     console.error('Admin Dashboard - Error completo:', error);
                     console.error('Admin Dashboard - Error stack:', error.stack);
@@ -0,0 +1,80 @@
+"""
+Versiones - Contador monótono del menú por restaurante y GET condicional
+
+Cada cambio de menú incrementa VersionMenu.numero. Los endpoints públicos lo
+usan como ETag fuerte, así una revalidación (If-None-Match) se responde con
+304 tras una única lectura indexada, sin tocar las tablas del menú.
+"""
+import hashlib
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from .models import VersionMenu
+
+
+def incrementar_version(restaurante_id):
+    # Sin contador (restaurante borrándose, o cargado con loaddata) no hay nada que incrementar
+    VersionMenu.objects.filter(restaurante_id=restaurante_id).update(
+        numero=F('numero') + 1,
+        actualizado=timezone.now()
+    )
+
+
+def asegurar_version(restaurante_id):
+    """
+    Crea el contador del restaurante si no lo tiene. Se llama al guardar el
+    Restaurante y no en cada cambio del menú: durante el borrado en cascada de
+    un restaurante, recrearlo violaría la FK.
+
+    El registro de cambios empieza con el contador: compactado_hasta en la
+    versión inicial hace que un delta desde antes pida resincronizar (ver
+    sincronizacion.py).
+    """
+    numero = VersionMenu._meta.get_field('numero').get_default()
+    VersionMenu.objects.get_or_create(
+        restaurante_id=restaurante_id, defaults={'numero': numero, 'compactado_hasta': numero}
+    )
+
+
+def etag(restaurante_id, numero, variante=None):
+    # Incluye el id: un restaurante recreado con el mismo slug reinicia su contador.
+    # La variante distingue representaciones de la misma versión (p. ej. ?fields=).
+    if variante:
+        return f'"{restaurante_id}-{numero}-{variante}"'
+    return f'"{restaurante_id}-{numero}"'
+
+
+def etag_lote(slugs, versiones):
+    """
+    ETag de una respuesta con varios menús: cambia si cambia cualquiera de
+    ellos o la lista pedida (slugs en orden y, de los encontrados, id y número).
+    """
+    huella = ','.join(slugs) + '|' + ','.join(f'{rid}-{numero}' for rid, numero in versiones)
+    return f'"lote-{hashlib.md5(huella.encode()).hexdigest()[:16]}"'
+
+
+def respuesta_no_modificada(request, restaurante_id, numero, actualizado, variante=None, otras_variantes=()):
+    """
+    HttpResponseNotModified si el cliente ya tiene esta versión, o None.
+
+    `otras_variantes`: representaciones de la misma versión que el cliente
+    pudo haber recibido y le siguen sirviendo (p. ej. la sin comprimir, si
+    pidió brotli y la versión no tiene variante comprimida).
+    """
+    for candidata in (variante, *otras_variantes):
+        respuesta = get_conditional_response(
+            request,
+            etag=etag(restaurante_id, numero, candidata),
+            last_modified=int(actualizado.timestamp())
+        )
+        if respuesta is not None:
+            respuesta.headers['ETag'] = etag(restaurante_id, numero, candidata)
+            return respuesta
+    return None
+
+
+def agregar_cabeceras(response, restaurante_id, numero, ultima_modificacion, variante=None):
+    response.headers['ETag'] = etag(restaurante_id, numero, variante)
+    response.headers['Last-Modified'] = http_date(ultima_modificacion.timestamp())
+    return response
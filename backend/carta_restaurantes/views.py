@@ -1,10 +1,189 @@
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Case, Value, When
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
 from django.shortcuts import get_object_or_404
-from .models import Categoria, Subcategoria, Comida, Restaurante
-from .serializers import CategoriaSerializer, SubcategoriaSerializer, ComidaSerializer
+from django.views import View
+from .models import Categoria, Subcategoria, Comida, Restaurante, VersionMenu
+from .serializers import CategoriaSerializer, SubcategoriaSerializer, ComidaSerializer, MenuSerializer
+from . import busqueda, cache_por_restaurante, compresion, eventos, replicas, serializacion_rapida, sincronizacion, snapshots, versiones
+from .campos import CamposMixin, variante
+from .restaurantes_cache import aresolver_restaurante, resolver_restaurante
+from .pagination import ComidaCursorPagination
 
-class CategoriaList(generics.ListAPIView):
+
+class SnapshotMixin(CamposMixin):
+    """
+    Sirve directamente los bytes del snapshot del restaurante (ver snapshots.py).
+
+    Responde con ETag/Last-Modified según la versión del menú (ver versiones.py)
+    y contesta 304 a un If-None-Match vigente sin tocar las tablas del menú.
+
+    El restaurante se resuelve con restaurantes_cache. Si el snapshot no existe
+    (id ajeno al restaurante o snapshot aún no construido) se cae a la vista
+    normal, que resuelve el 404.
+
+    Con ?fields= / ?omit= (ver campos.py) la respuesta se arma con las columnas
+    justas en lugar de servir el snapshot completo; el ETag lleva la variante.
+
+    El snapshot se sirve en su variante gzip/brotli pre-comprimida según
+    Accept-Encoding (ver compresion.py). El ETag distingue la codificación de
+    los bytes servidos (sin comprimir si falta la variante negociada) y todas
+    las respuestas llevan Vary: Accept-Encoding.
+
+    Las respuestas 200 se guardan en el cache del restaurante (ver
+    cache_por_restaurante.py) por ruta, campos, página y codificación
+    negociada: un acierto no toca la base, tampoco para las variantes que van
+    por el ORM. Si muchos piden a la vez una entrada vencida, la arma uno solo.
+
+    Las subclases definen get_clave_snapshot(): la clave de snapshots.py que
+    sirven.
+    """
+    # Cabeceras de la respuesta que se guardan con su contenido
+    cabeceras_cache = ('Content-Type', 'Content-Encoding', 'ETag', 'Last-Modified')
+
+    def usar_snapshot(self, request):
+        """Las variantes que el snapshot no cubre (p. ej. paginadas) van por el ORM."""
+        return True
+
+    def parametros_cache(self, request):
+        """Además de ?fields= / ?omit=, lo que cambia la respuesta (p. ej. la página), normalizado."""
+        return []
+
+    def get_serializer_context(self):
+        # Sin request, igual que al construir el snapshot: mismos bytes para la misma versión
+        context = super().get_serializer_context()
+        context.pop('request', None)
+        return context
+
+    def get_restaurante(self):
+        """Restaurante activo del parámetro ?restaurante=, resuelto vía restaurantes_cache."""
+        if not hasattr(self, '_restaurante'):
+            self._restaurante = resolver_restaurante(self.request.GET.get('restaurante'))
+        if self._restaurante is None:
+            raise Http404('Restaurante no encontrado')
+        return self._restaurante
+
+    def get(self, request, *args, **kwargs):
+        restaurante_slug = request.GET.get('restaurante')
+        if not restaurante_slug:
+            return super().get(request, *args, **kwargs)
+
+        response = self.get_respuesta(request, *args, **kwargs)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def get_respuesta(self, request, *args, **kwargs):
+        restaurante = self.get_restaurante()
+        campos = self.get_campos()
+        desde_snapshot = campos is None and self.usar_snapshot(request)
+        codificacion = None
+        if desde_snapshot:
+            codificacion = compresion.negociar(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        etiqueta = variante(campos) or codificacion
+
+        if restaurante.version is not None:
+            no_modificada = versiones.respuesta_no_modificada(
+                request, restaurante.id, restaurante.version, restaurante.actualizado, etiqueta,
+                # Si la versión no tiene la variante comprimida, el cliente recibió la sin comprimir
+                otras_variantes=(None,) if codificacion else (),
+            )
+            if no_modificada is not None:
+                return no_modificada
+
+        if request.accepted_renderer.format != 'json':
+            # La API navegable de DRF no se cachea
+            return self.calcular_respuesta(request, restaurante, desde_snapshot, codificacion, *args, **kwargs)
+        contenido, cabeceras = cache_por_restaurante.obtener(
+            restaurante.id, self.variante_cache(request, codificacion),
+            lambda: self.guardable(request, self.calcular_respuesta(
+                request, restaurante, desde_snapshot, codificacion, *args, **kwargs
+            )),
+        )
+        return HttpResponse(contenido, headers=cabeceras)
+
+    def calcular_respuesta(self, request, restaurante, desde_snapshot, codificacion, *args, **kwargs):
+        snapshot = None
+        if desde_snapshot:
+            snapshot = snapshots.obtener_snapshot(restaurante.id, self.get_clave_snapshot(), codificacion)
+        if snapshot is not None:
+            return self.respuesta_snapshot(restaurante.id, snapshot)
+
+        # Por el ORM la respuesta sale sin comprimir: el ETag lleva solo la variante de ?fields=
+        response = super().get(request, *args, **kwargs)
+        if restaurante.version is not None and response.status_code == 200:
+            versiones.agregar_cabeceras(
+                response, restaurante.id, restaurante.version, restaurante.actualizado, variante(self.get_campos())
+            )
+        return response
+
+    def variante_cache(self, request, codificacion):
+        """
+        Clave de la respuesta en el cache del restaurante. Solo lleva lo que la
+        vista reconoce, normalizado: parámetros de más, repetidos o en otro
+        orden no crean entradas nuevas.
+        """
+        campos = ','.join(self.get_campos() or ())
+        return '|'.join([request.path, campos, *self.parametros_cache(request), codificacion or ''])
+
+    def guardable(self, request, response):
+        """(contenido, cabeceras) de una respuesta 200 para el cache; DRF fija Content-Type al renderizar."""
+        if isinstance(response, Response):
+            # Lo que hace finalize_response antes de renderizar, sin tocar las cabeceras de la vista
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            response.render()
+        return response.content, {nombre: response[nombre] for nombre in self.cabeceras_cache if nombre in response}
+
+    @staticmethod
+    def respuesta_snapshot(restaurante_id, snapshot):
+        """
+        Respuesta con los bytes de un snapshot de snapshots.obtener_snapshot().
+        El ETag lleva la codificación de esos bytes, no la negociada: sin
+        variante comprimida se sirve (y se etiqueta) la sin comprimir.
+        """
+        contenido, codificacion_servida, version, fecha_actualizacion = snapshot
+        response = HttpResponse(contenido, content_type='application/json')
+        if codificacion_servida:
+            response.headers['Content-Encoding'] = codificacion_servida
+        return versiones.agregar_cabeceras(response, restaurante_id, version, fecha_actualizacion, codificacion_servida)
+
+
+class ListaSnapshotMixin(SnapshotMixin):
+    """
+    SnapshotMixin para listados. Sin paginar, la lista se arma con
+    serializar_rapido(queryset, campos) de la subclase: la función de
+    serializacion_rapida equivalente a su serializer_class.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            # Página acotada por page_size: el serializer de DRF alcanza
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        return Response(self.serializar_rapido(queryset, self.get_campos()))
+
+
+class CategoriaList(ListaSnapshotMixin, generics.ListAPIView):
     serializer_class = CategoriaSerializer
+    campos_disponibles = serializacion_rapida.CAMPOS_CATEGORIA
+    columnas_por_campo = serializacion_rapida.COLUMNAS_CAMPO_CATEGORIA
+
+    def get_clave_snapshot(self):
+        return snapshots.CLAVE_CATEGORIAS
+
+    def serializar_rapido(self, queryset, campos):
+        return serializacion_rapida.categorias(queryset, campos)
     
     def get_queryset(self):
         # CORREGIDO: Filtrar por restaurante desde parámetro GET
@@ -15,13 +194,298 @@ class CategoriaList(generics.ListAPIView):
             return Categoria.objects.none()
         
         # Obtener restaurante por slug
-        restaurante = get_object_or_404(Restaurante, slug=restaurante_slug, activo=True)
+        restaurante = self.get_restaurante()
         
         # Solo categorías de ESE restaurante
-        return Categoria.objects.filter(restaurante=restaurante).order_by('orden')
+        return Categoria.objects.filter(restaurante_id=restaurante.id).order_by('orden', 'nombre')
+
+class MenuCompleto(SnapshotMixin, generics.RetrieveAPIView):
+    """
+    Menú completo de un restaurante en una sola respuesta.
+
+    Reemplaza la cascada categorías → subcategorías → comidas del frontend.
+    Sin snapshot se arma con un número fijo de queries (restaurante,
+    categorías, subcategorías y comidas) sin importar el tamaño del menú:
+    cada nivel se agrupa en memoria bajo su padre (ver serializacion_rapida).
+
+    ?fields= / ?omit= acotan las comidas.
+    """
+    serializer_class = MenuSerializer
+    campos_disponibles = serializacion_rapida.CAMPOS_COMIDA
+    columnas_por_campo = serializacion_rapida.COLUMNAS_CAMPO_COMIDA
+
+    def get_clave_snapshot(self):
+        return snapshots.CLAVE_MENU
+
+    def get_object(self):
+        restaurante = self.get_restaurante()
+        return get_object_or_404(Restaurante, pk=restaurante.id)
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(serializacion_rapida.menu(self.get_object(), self.get_campos()))
+
+class MenusLote(generics.GenericAPIView):
+    """
+    Menús completos de varios restaurantes en una sola respuesta, para
+    agregadores y pantallas que muestran varios a la vez:
+
+        GET /api/menus/?restaurantes=pizzeria-mario,cafe-central
+
+    Devuelve {"menus": [...], "no_encontrados": [...]} en el orden pedido, con
+    cada menú igual al de /api/menu/. Son 2 queries para cualquier cantidad de
+    restaurantes (hasta MENUS_LOTE_MAXIMO): los restaurantes y sus snapshots,
+    cuyos bytes se concatenan sin volver a serializar. Solo un restaurante sin
+    snapshot todavía se serializa en el momento.
+
+    El ETag combina las versiones de todos los menús: un 304 sale de la
+    primera query.
+
+    Los pasos son métodos de clase porque MenusLoteAsync los comparte.
+    """
+    renderer = JSONRenderer()
+
+    @staticmethod
+    def slugs_pedidos(query_params):
+        slugs = []
+        for valor in query_params.getlist('restaurantes'):
+            for slug in valor.split(','):
+                slug = slug.strip()
+                if slug and slug not in slugs:
+                    slugs.append(slug)
+        if not slugs:
+            raise ValidationError({'restaurantes': 'Indicar al menos un slug: ?restaurantes=a,b'})
+        if len(slugs) > settings.MENUS_LOTE_MAXIMO:
+            raise ValidationError({'restaurantes': f'Como máximo {settings.MENUS_LOTE_MAXIMO} restaurantes por request'})
+        return slugs
+
+    def get_slugs(self):
+        return self.slugs_pedidos(self.request.query_params)
+
+    @staticmethod
+    def consulta_restaurantes(slugs):
+        """Filas (slug, id, versión, actualizado) de los restaurantes activos pedidos."""
+        return Restaurante.objects.filter(
+            slug__in=slugs, activo=True
+        ).order_by().values_list('slug', 'id', 'version_menu__numero', 'version_menu__actualizado')
+
+    @staticmethod
+    def validadores(request, slugs, encontrados):
+        """
+        (etag, última modificación, respuesta 304 o None). Sin contador de
+        versión en alguno (restaurante recién creado) no hay ETag.
+        """
+        if not encontrados or any(numero is None for _, numero, _ in encontrados.values()):
+            return None, None, None
+        etag = versiones.etag_lote(slugs, [encontrados[slug][:2] for slug in slugs if slug in encontrados])
+        ultima_modificacion = max(actualizado for _, _, actualizado in encontrados.values())
+        no_modificada = get_conditional_response(
+            request, etag=etag, last_modified=int(ultima_modificacion.timestamp())
+        )
+        if no_modificada is not None:
+            no_modificada.headers['ETag'] = etag
+        return etag, ultima_modificacion, no_modificada
+
+    @classmethod
+    def completar(cls, menus, ids):
+        """Serializa en el momento los menús que todavía no tienen snapshot."""
+        faltantes = [restaurante_id for restaurante_id in ids if restaurante_id not in menus]
+        for restaurante in Restaurante.objects.filter(pk__in=faltantes).order_by() if faltantes else ():
+            menus[restaurante.id] = cls.renderer.render(serializacion_rapida.menu(restaurante))
+
+    @classmethod
+    def componer(cls, ids, menus, no_encontrados, etag, ultima_modificacion):
+        contenido = b''.join([
+            b'{"menus":[', b','.join(menus[restaurante_id] for restaurante_id in ids),
+            b'],"no_encontrados":', cls.renderer.render(no_encontrados), b'}',
+        ])
+        response = HttpResponse(contenido, content_type='application/json')
+        if etag is not None:
+            response.headers['ETag'] = etag
+            response.headers['Last-Modified'] = http_date(ultima_modificacion.timestamp())
+        return response
 
-class SubcategoriaList(generics.ListAPIView):
+    def get(self, request, *args, **kwargs):
+        slugs = self.get_slugs()
+        encontrados = {
+            slug: (restaurante_id, numero, actualizado)
+            for slug, restaurante_id, numero, actualizado in self.consulta_restaurantes(slugs)
+        }
+        if replicas.cambio_reciente(*(restaurante_id for restaurante_id, _, _ in encontrados.values())):
+            # Alguno cambió hace poco: las versiones, de la primaria (ver replicas.py)
+            encontrados = {
+                slug: (restaurante_id, numero, actualizado)
+                for slug, restaurante_id, numero, actualizado in self.consulta_restaurantes(slugs)
+            }
+        ids = [encontrados[slug][0] for slug in slugs if slug in encontrados]
+        no_encontrados = [slug for slug in slugs if slug not in encontrados]
+
+        etag, ultima_modificacion, no_modificada = self.validadores(request, slugs, encontrados)
+        if no_modificada is not None:
+            return no_modificada
+
+        menus = snapshots.obtener_snapshots(ids, snapshots.CLAVE_MENU)
+        self.completar(menus, ids)
+        return self.componer(ids, menus, no_encontrados, etag, ultima_modificacion)
+
+
+class SnapshotAsync(View):
+    """
+    Versión async de una vista pública con snapshot (`vista`, una subclase de
+    SnapshotMixin), para el servidor ASGI:
+
+        path('menu/', views.SnapshotAsync.as_view(vista=views.MenuCompleto))
+
+    El camino caliente, ?restaurante=<slug> sin otros parámetros, se resuelve
+    sin ocupar un hilo: el restaurante sale de restaurantes_cache (o de una
+    query async), y la respuesta es un 304 o los bytes del snapshot con una
+    query async. Lo demás (?fields=, paginación, snapshot faltante, 404) lo
+    atiende la vista DRF en un hilo, con las mismas respuestas que bajo WSGI.
+    """
+    vista = None
+    vista_sync = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        initkwargs.setdefault('vista_sync', initkwargs.get('vista', cls.vista).as_view())
+        return super().as_view(**initkwargs)
+
+    async def get(self, request, *args, **kwargs):
+        response = None
+        if set(request.GET) == {'restaurante'}:
+            response = await self.desde_snapshot(request, self.vista(kwargs=kwargs).get_clave_snapshot())
+        if response is None:
+            return await sync_to_async(self.vista_sync)(request, *args, **kwargs)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    async def desde_snapshot(self, request, clave):
+        restaurante = await aresolver_restaurante(request.GET['restaurante'])
+        if restaurante is None or restaurante.version is None:
+            return None
+        codificacion = compresion.negociar(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        no_modificada = versiones.respuesta_no_modificada(
+            request, restaurante.id, restaurante.version, restaurante.actualizado, codificacion,
+            otras_variantes=(None,) if codificacion else (),
+        )
+        if no_modificada is not None:
+            return no_modificada
+        snapshot = await snapshots.aobtener_snapshot(restaurante.id, clave, codificacion)
+        if snapshot is None:
+            return None
+        return self.vista.respuesta_snapshot(restaurante.id, snapshot)
+
+
+class MenusLoteAsync(View):
+    """
+    MenusLote para el servidor ASGI: las dos queries con el ORM async. Un
+    pedido inválido lo responde la vista DRF (400 con el mismo formato).
+    """
+    menus_lote = staticmethod(MenusLote.as_view())
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            slugs = MenusLote.slugs_pedidos(request.GET)
+        except ValidationError:
+            return await sync_to_async(self.menus_lote)(request, *args, **kwargs)
+        encontrados = {
+            slug: (restaurante_id, numero, actualizado)
+            async for slug, restaurante_id, numero, actualizado in MenusLote.consulta_restaurantes(slugs)
+        }
+        if await replicas.acambio_reciente(*(restaurante_id for restaurante_id, _, _ in encontrados.values())):
+            encontrados = {
+                slug: (restaurante_id, numero, actualizado)
+                async for slug, restaurante_id, numero, actualizado in MenusLote.consulta_restaurantes(slugs)
+            }
+        ids = [encontrados[slug][0] for slug in slugs if slug in encontrados]
+        no_encontrados = [slug for slug in slugs if slug not in encontrados]
+
+        etag, ultima_modificacion, no_modificada = MenusLote.validadores(request, slugs, encontrados)
+        if no_modificada is not None:
+            return no_modificada
+
+        menus = await snapshots.aobtener_snapshots(ids, snapshots.CLAVE_MENU)
+        if len(menus) < len(ids):
+            await sync_to_async(MenusLote.completar)(menus, ids)
+        return MenusLote.componer(ids, menus, no_encontrados, etag, ultima_modificacion)
+
+
+class CambiosMenu(generics.GenericAPIView):
+    """
+    Delta del menú de un restaurante desde una versión que el cliente ya tiene:
+
+        GET /api/menu/cambios/?restaurante=<slug>&desde=<version>
+
+    Devuelve las filas creadas o modificadas, los ids borrados y la versión
+    alcanzada, o {"resincronizar": true} si el registro ya se compactó más
+    allá de `desde` (ver sincronizacion.py). La versión es la misma del ETag
+    de los demás endpoints públicos.
+    """
+
+    def get(self, request, *args, **kwargs):
+        restaurante = resolver_restaurante(request.GET.get('restaurante'))
+        if restaurante is None:
+            raise Http404('Restaurante no encontrado')
+        try:
+            desde = int(request.GET['desde'])
+            if desde < 0:
+                raise ValueError
+        except (KeyError, ValueError):
+            raise ValidationError({'desde': 'Versión del menú que ya tiene el cliente (entero >= 0)'})
+
+        # Fresca y no la de restaurantes_cache: el delta tiene que llegar hasta la versión informada
+        fila = VersionMenu.objects.filter(restaurante_id=restaurante.id).values_list(
+            'numero', 'actualizado', 'compactado_hasta'
+        ).first()
+        if fila is None:
+            return Response({'version': 0, 'resincronizar': True})
+        numero, actualizado, compactado_hasta = fila
+
+        etiqueta = f'desde{desde}'
+        no_modificada = versiones.respuesta_no_modificada(request, restaurante.id, numero, actualizado, etiqueta)
+        if no_modificada is not None:
+            return no_modificada
+        response = Response(sincronizacion.delta(restaurante.id, desde, numero, compactado_hasta))
+        return versiones.agregar_cabeceras(response, restaurante.id, numero, actualizado, etiqueta)
+
+
+class EventosMenu(View):
+    """
+    Cambios del menú de un restaurante en vivo, por Server-Sent Events:
+
+        GET /api/menu/eventos/?restaurante=<slug>
+
+    Vista async: cada conexión abierta es una corrutina esperando su cola del
+    broker de eventos (ver eventos.py), sin ocupar un hilo. Solo se sirve con
+    el servidor ASGI (asgi.py); bajo WSGI cada conexión retendría un hilo, así
+    que se responde 501.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        if not isinstance(request, ASGIRequest):
+            return HttpResponse('Los eventos del menú requieren el servidor ASGI', status=501, content_type='text/plain')
+        restaurante = await sync_to_async(resolver_restaurante)(request.GET.get('restaurante'))
+        if restaurante is None:
+            raise Http404('Restaurante no encontrado')
+
+        # Fresca y no la de restaurantes_cache: los eventos se difunden a partir de esta versión
+        version = await VersionMenu.objects.filter(restaurante_id=restaurante.id).values_list('numero', flat=True).afirst()
+        response = StreamingHttpResponse(eventos.flujo(restaurante.id, version or 0), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Sin buffer en nginx: cada evento tiene que salir apenas se escribe
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class SubcategoriaList(ListaSnapshotMixin, generics.ListAPIView):
     serializer_class = SubcategoriaSerializer
+    campos_disponibles = serializacion_rapida.CAMPOS_SUBCATEGORIA
+    columnas_por_campo = serializacion_rapida.COLUMNAS_CAMPO_SUBCATEGORIA
+
+    def get_clave_snapshot(self):
+        return snapshots.clave_subcategorias(self.kwargs.get('categoria_id'))
+
+    def serializar_rapido(self, queryset, campos):
+        return serializacion_rapida.subcategorias(queryset, campos)
     
     def get_queryset(self):
         categoria_id = self.kwargs.get('categoria_id')
@@ -31,13 +495,34 @@ class SubcategoriaList(generics.ListAPIView):
             return Subcategoria.objects.none()
             
         # Verificar que la categoría pertenece al restaurante correcto
-        restaurante = get_object_or_404(Restaurante, slug=restaurante_slug, activo=True)
-        categoria = get_object_or_404(Categoria, id=categoria_id, restaurante=restaurante)
+        restaurante = self.get_restaurante()
+        categoria = get_object_or_404(Categoria, id=categoria_id, restaurante_id=restaurante.id)
         
-        return Subcategoria.objects.filter(categoria=categoria).order_by('orden')
+        return Subcategoria.objects.filter(categoria=categoria).order_by('orden', 'nombre')
 
-class ComidaList(generics.ListAPIView):
+class ComidaList(ListaSnapshotMixin, generics.ListAPIView):
     serializer_class = ComidaSerializer
+    pagination_class = ComidaCursorPagination
+    campos_disponibles = serializacion_rapida.CAMPOS_COMIDA
+    columnas_por_campo = serializacion_rapida.COLUMNAS_CAMPO_COMIDA
+    # El cursor de ComidaCursorPagination lee orden
+    columnas_siempre = ('orden',)
+
+    def get_clave_snapshot(self):
+        return snapshots.CLAVE_COMIDAS
+
+    def usar_snapshot(self, request):
+        return not self.paginator.solicitada(request)
+
+    def parametros_cache(self, request):
+        if not self.paginator.solicitada(request):
+            return []
+        # Cursor inválido: NotFound, igual que al paginar
+        posicion = self.paginator.decode_cursor(request)
+        return [f'{posicion[0]}:{posicion[1]}' if posicion else '', str(self.paginator.get_page_size(request))]
+
+    def serializar_rapido(self, queryset, campos):
+        return serializacion_rapida.comidas(queryset, campos)
     
     def get_queryset(self):
         # CORREGIDO: Filtrar por restaurante desde parámetro GET
@@ -46,11 +531,22 @@ class ComidaList(generics.ListAPIView):
         if not restaurante_slug:
             return Comida.objects.none()
         
-        restaurante = get_object_or_404(Restaurante, slug=restaurante_slug, activo=True)
-        return Comida.objects.filter(restaurante=restaurante)
+        restaurante = self.get_restaurante()
+        # select_related para el camino paginado, que usa ComidaSerializer
+        return Comida.objects.filter(restaurante_id=restaurante.id).select_related(
+            'categoria', 'subcategoria'
+        ).order_by('orden', 'id')
 
-class ComidaPorSubcategoria(generics.ListAPIView):
+class ComidaPorSubcategoria(ListaSnapshotMixin, generics.ListAPIView):
     serializer_class = ComidaSerializer
+    campos_disponibles = serializacion_rapida.CAMPOS_COMIDA
+    columnas_por_campo = serializacion_rapida.COLUMNAS_CAMPO_COMIDA
+
+    def get_clave_snapshot(self):
+        return snapshots.clave_comidas_subcategoria(self.kwargs.get('subcategoria_id'))
+
+    def serializar_rapido(self, queryset, campos):
+        return serializacion_rapida.comidas(queryset, campos)
     
     def get_queryset(self):
         subcategoria_id = self.kwargs.get('subcategoria_id')
@@ -60,10 +556,64 @@ class ComidaPorSubcategoria(generics.ListAPIView):
             return Comida.objects.none()
             
         # Verificar que la subcategoría pertenece al restaurante correcto
-        restaurante = get_object_or_404(Restaurante, slug=restaurante_slug, activo=True)
+        restaurante = self.get_restaurante()
         
         return Comida.objects.filter(
             subcategoria_id=subcategoria_id,
-            restaurante=restaurante,
+            restaurante_id=restaurante.id,
             disponible=True
-        )
+        ).order_by('orden', 'id')
+
+
+class BuscarComidas(CamposMixin, generics.GenericAPIView):
+    """
+    Comidas disponibles de un restaurante que coinciden con ?q=, por relevancia.
+
+    GET /api/buscar/?restaurante=<slug>&q=<texto>[&limite=20]
+
+    Busca en nombre, descripción, categoría y subcategoría con el índice de
+    texto completo de busqueda.py (FTS5 en SQLite, GIN en PostgreSQL). Acepta
+    ?fields= / ?omit= como los listados de comidas. Los resultados quedan en el
+    cache del restaurante hasta el próximo cambio del menú, por los términos
+    de la búsqueda (busqueda.terminos: sin acentos, mayúsculas ni conectores),
+    así "Ñoquis" y "los noquis" comparten entrada. Las búsquedas más largas
+    que largo_maximo_cache no se cachean: son raras y cada una sería una
+    entrada distinta.
+    """
+    campos_disponibles = serializacion_rapida.CAMPOS_COMIDA
+    columnas_por_campo = serializacion_rapida.COLUMNAS_CAMPO_COMIDA
+    limite_por_defecto = 20
+    limite_maximo = 100
+    largo_maximo_cache = 60
+
+    def get_limite(self):
+        try:
+            limite = int(self.request.GET.get('limite', self.limite_por_defecto))
+        except ValueError:
+            return self.limite_por_defecto
+        return min(max(limite, 1), self.limite_maximo)
+
+    def get(self, request, *args, **kwargs):
+        restaurante = resolver_restaurante(request.GET.get('restaurante'))
+        if restaurante is None:
+            raise Http404('Restaurante no encontrado')
+
+        # La búsqueda depende solo de sus términos
+        consulta, limite, campos = ' '.join(busqueda.terminos(request.GET.get('q', ''))), self.get_limite(), self.get_campos()
+        if len(consulta) > self.largo_maximo_cache:
+            return Response(self.resultados(restaurante.id, consulta, limite, campos))
+        return Response(cache_por_restaurante.obtener(
+            restaurante.id, f'buscar|{consulta}|{limite}|{",".join(campos or ())}',
+            lambda: self.resultados(restaurante.id, consulta, limite, campos),
+        ))
+
+    @staticmethod
+    def resultados(restaurante_id, consulta, limite, campos):
+        ids = busqueda.buscar(restaurante_id, consulta, limite)
+        if not ids:
+            return []
+        relevancia = Case(*[When(pk=pk, then=Value(posicion)) for posicion, pk in enumerate(ids)])
+        comidas = Comida.objects.filter(
+            pk__in=ids, restaurante_id=restaurante_id, disponible=True
+        ).order_by(relevancia)
+        return serializacion_rapida.comidas(comidas, campos)
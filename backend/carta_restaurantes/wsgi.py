@@ -3,4 +3,8 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'carta_restaurantes.settings')
 
-application = get_wsgi_application()
\ No newline at end of file
+application = get_wsgi_application()
+
+# Falla al arrancar si la base no responde (ver conexiones.py)
+from carta_restaurantes.conexiones import autotest  # noqa: E402
+autotest()
@@ -6,6 +6,17 @@ Para Waitress, usa los parámetros de línea de comandos en los scripts.
 Si quieres usar Gunicorn en Linux/Mac, mantén esta configuración:
 """
 
+import os
+
+# Cache por restaurante compartido por los workers: en memoria de cada proceso,
+# la invalidación que hace un worker al guardar un cambio no llegaría a los
+# demás (ver carta_restaurantes/cache_por_restaurante.py)
+os.environ.setdefault('CACHE_URL', 'file:///tmp/carta-cache')
+# El arranque falla si la base no responde (ver carta_restaurantes/conexiones.py)
+os.environ.setdefault('DATABASE_AUTOTEST', 'True')
+# SQLite en modo WAL: los workers leen mientras otro escribe (ver SQLITE_WAL en settings.py)
+os.environ.setdefault('SQLITE_WAL', 'True')
+
 # Dirección y puerto donde escuchar
 bind = "0.0.0.0:8000"
 
@@ -43,4 +54,10 @@ preload_app = True  # Carga la aplicación antes de hacer fork de los workers
 keepalive = 2       # Segundos para mantener conexiones keep-alive
 
 # Para desarrollo (descomenta si necesitas recarga automática)
-# reload = True
\ No newline at end of file
+# reload = True
+
+
+def post_worker_init(worker):
+    """Abre la conexión a la base del worker antes de su primer request (ver carta_restaurantes/conexiones.py)."""
+    from carta_restaurantes.conexiones import calentar
+    calentar()
@@ -0,0 +1,120 @@
+"""
+Benchmark de /api/buscar/ sobre un menú sintético.
+
+Crea un restaurante con --comidas comidas (por defecto 10.000) con textos de
+menú real (datos_sinteticos.py, textos_variados) dentro de una transacción que se
+descarta al final, lo indexa y mide la latencia de busqueda.buscar() para un
+conjunto de consultas. Falla si el percentil 95 supera --maximo-ms, o
+--maximo-ms-aproximada en las consultas sin coincidencias por palabras (ni
+por sus raíces), que caen a la búsqueda por trigramas. Con --verbosity 2
+muestra el plan de cada consulta.
+
+El costo lo domina el ranking de las coincidencias: un término presente en
+todo el menú cuesta bastante más que uno de menú real.
+
+Uso (desde backend/):
+    python scripts/bench_busqueda.py
+    python scripts/bench_busqueda.py --comidas 50000 --maximo-ms 10
+"""
+import math
+import time
+
+import entorno  # noqa: F401 (configura Django)
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from carta_restaurantes import busqueda
+from carta_restaurantes.datos_sinteticos import crear_menu_sintetico, textos_variados
+
+
+CONSULTAS = [
+    'pizza', 'noquis', 'ñoquis de ricota', 'milanesa napolitana', 'durazno', 'cafe',
+    'licuado de frutilla', 'dulce de leche', 'sorr', 'pollo grillado', 'veggie', 'inexistente',
+    # Errores de tipeo: las resuelve el índice de trigramas
+    'muzarela', 'milaneza', 'licuado de durasno', 'tiramizu',
+]
+
+
+class Benchmark(BaseCommand):
+    help = 'Mide la latencia de la búsqueda de comidas con los índices de texto completo y de trigramas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comidas', type=int, default=10000)
+        parser.add_argument('--repeticiones', type=int, default=20)
+        parser.add_argument('--maximo-ms', type=float, default=5.0)
+        parser.add_argument('--maximo-ms-aproximada', type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            restaurante = crear_menu_sintetico('bench-busqueda', options['comidas'], textos=textos_variados)
+            busqueda.reindexar_restaurante(restaurante.id)
+            # Otro restaurante con el mismo contenido: el filtro por tenant tiene que recortarlo
+            otro = crear_menu_sintetico('bench-busqueda-otro', options['comidas'], textos=textos_variados)
+            busqueda.reindexar_restaurante(otro.id)
+            lento = self.medir(restaurante, options)
+            transaction.set_rollback(True)
+
+        if lento:
+            raise CommandError(f'{len(lento)} consulta(s) superan su máximo (p95): {", ".join(lento)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Todas las consultas por debajo de {options["maximo_ms"]} ms '
+            f'({options["maximo_ms_aproximada"]} ms las aproximadas) (p95)'
+        ))
+
+    def medir(self, restaurante, options):
+        lento = []
+        for consulta in CONSULTAS:
+            aproximada = not self.por_palabras(restaurante.id, consulta)
+            maximo = options['maximo_ms_aproximada' if aproximada else 'maximo_ms']
+            busqueda.buscar(restaurante.id, consulta)  # la primera lee páginas del índice que después están en memoria
+            tiempos = []
+            for _ in range(options['repeticiones']):
+                inicio = time.perf_counter()
+                ids = busqueda.buscar(restaurante.id, consulta)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            tiempos.sort()
+            p50 = tiempos[len(tiempos) // 2]
+            # Rango más cercano: con 20 repeticiones, la 19.ª (no la más lenta)
+            p95 = tiempos[math.ceil(len(tiempos) * 0.95) - 1]
+            self.stdout.write(
+                f'{consulta!r:<26} {len(ids):>3} resultados{" (aprox.)" if aproximada else "         "}  '
+                f'p50 {p50:6.2f} ms  p95 {p95:6.2f} ms'
+            )
+            if p95 > maximo:
+                lento.append(consulta)
+            if options['verbosity'] > 1:
+                for linea in self.plan(restaurante.id, consulta):
+                    self.stdout.write(f'    {linea}')
+        return lento
+
+    @staticmethod
+    def por_palabras(restaurante_id, consulta):
+        """Si la encuentra la búsqueda por palabras o por raíces, sin llegar a la de trigramas."""
+        for por_raiz in (False, True):
+            sql = busqueda.sql_busqueda(restaurante_id, consulta, por_raiz=por_raiz)
+            if sql is None:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(*sql)
+                if cursor.fetchall():
+                    return True
+        return False
+
+    @staticmethod
+    def plan(restaurante_id, consulta):
+        prefijo = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+        lineas = []
+        for sql in (
+            busqueda.sql_busqueda(restaurante_id, consulta),
+            busqueda.sql_busqueda(restaurante_id, consulta, por_raiz=True),
+            busqueda.sql_busqueda_aproximada(restaurante_id, consulta),
+        ):
+            if sql is None:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(prefijo + sql[0], sql[1])
+                lineas += [str(fila[-1]) for fila in cursor.fetchall()]
+        return lineas
+
+
+if __name__ == '__main__':
+    entorno.correr(Benchmark)
@@ -0,0 +1,121 @@
+"""
+Prueba de carga del cache por restaurante (ver cache_por_restaurante.py):
+muchos requests simultáneos a la misma respuesta no la recalculan todos.
+
+Lanza --hilos hilos que piden a la vez, sincronizados con una barrera, la
+misma URL pública de un restaurante (variantes con ?fields=, que se arman
+con el ORM), en tres situaciones:
+- sin copia: el cache está vacío, como al arrancar;
+- tras un cambio: el dueño guardó algo y la generación del restaurante cambió;
+- vencida: pasó CACHE_TTL sin cambios.
+
+En cada una cuenta las llamadas a calcular(): tiene que haber una sola por
+URL, no una por hilo. Usa un cache en memoria propio y no escribe en la base
+(el cambio se simula invalidando la generación).
+
+Uso (desde backend/):
+    python scripts/bench_estampida.py
+    python scripts/bench_estampida.py --hilos 50 --restaurante pizzeria-mario
+"""
+import threading
+import time
+
+import entorno  # noqa: F401 (configura Django)
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import override_settings
+from carta_restaurantes import cache_por_restaurante
+from carta_restaurantes.models import Restaurante
+
+
+CACHE_BENCH = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench-estampida'}}
+# Lo justo para que la fase "vencida" no tenga que esperar el TTL de producción
+TTL_BENCH = 1
+
+
+class Benchmark(BaseCommand):
+    help = 'Verifica que los requests simultáneos a una respuesta vencida no la recalculen todos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hilos', type=int, default=30)
+        parser.add_argument('--restaurante', help='Slug; por defecto, el primer restaurante activo')
+
+    def handle(self, *args, **options):
+        restaurante = Restaurante.objects.filter(activo=True).order_by('id')
+        if options['restaurante']:
+            restaurante = restaurante.filter(slug=options['restaurante'])
+        restaurante = restaurante.first()
+        if restaurante is None:
+            raise CommandError('No hay un restaurante activo')
+        publico = f'?restaurante={restaurante.slug}'
+        urls = [f'/api/comidas/{publico}&fields=id,nombre,precio,subcategoria_nombre', f'/api/menu/{publico}&fields=id,nombre,precio']
+        connections.close_all()
+
+        errores = []
+        with override_settings(ALLOWED_HOSTS=['*'], CACHES=CACHE_BENCH, CACHE_TTL=TTL_BENCH):
+            cache.clear()
+            for fase, preparar in (
+                ('sin copia', cache.clear),
+                ('tras un cambio', lambda: cache_por_restaurante.invalidar(restaurante.id)),
+                ('vencida', lambda: time.sleep(TTL_BENCH + 0.1)),
+            ):
+                preparar()
+                for url in urls:
+                    errores += self.fase(fase, url, options['hilos'])
+
+        if errores:
+            for error in errores:
+                self.stdout.write(self.style.ERROR(error))
+            raise CommandError(f'{len(errores)} error(es)')
+        self.stdout.write(self.style.SUCCESS('Cada respuesta se calculó una sola vez por fase, sin importar los requests simultáneos'))
+
+    def fase(self, fase, url, hilos):
+        antes = cache_por_restaurante.estadisticas()
+        barrera = threading.Barrier(hilos)
+        latencias, estados = [], []
+
+        def pedir():
+            try:
+                cliente = Client()
+                barrera.wait()
+                inicio = time.perf_counter()
+                response = cliente.get(url)
+                latencias.append(time.perf_counter() - inicio)
+                estados.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        procesos = [threading.Thread(target=pedir) for _ in range(hilos)]
+        for proceso in procesos:
+            proceso.start()
+        for proceso in procesos:
+            proceso.join()
+        # Con la copia vencida el cálculo sigue en segundo plano después de responder
+        despues = self.esperar_calculo(antes)
+
+        delta = {nombre: despues[nombre] - antes[nombre] for nombre in cache_por_restaurante.CONTADORES}
+        latencias.sort()
+        self.stdout.write(
+            f'{fase:<15} {url:<75} {hilos} requests  cálculos {delta["calculos"]}  '
+            f'aciertos {delta["aciertos"]}  viejas {delta["viejas"]}  esperas {delta["esperas"]}  '
+            f'p50 {latencias[len(latencias) // 2] * 1000:6.1f} ms  máx {latencias[-1] * 1000:6.1f} ms'
+        )
+        errores = [f'{fase} {url}: status {estado}' for estado in set(estados) if estado != 200]
+        if delta['calculos'] != 1:
+            errores.append(f'{fase} {url}: {delta["calculos"]} cálculos para {hilos} requests simultáneos')
+        return errores
+
+    @staticmethod
+    def esperar_calculo(antes, segundos=5):
+        hasta = time.monotonic() + segundos
+        while True:
+            despues = cache_por_restaurante.estadisticas()
+            if despues['calculos'] > antes['calculos'] or time.monotonic() > hasta:
+                return despues
+            time.sleep(0.05)
+
+
+if __name__ == '__main__':
+    entorno.correr(Benchmark)
@@ -0,0 +1,89 @@
+"""
+Benchmark del fan-out de eventos del menú (ver eventos.py).
+
+Abre --conexiones conexiones ociosas al flujo SSE de un restaurante sintético,
+mide la memoria que retienen (tracemalloc) y, tras cambiar la disponibilidad
+de una comida como lo hace update_comida, cuánto tarda el evento en llegar a
+todas. Falla si el evento tarda más de --maximo-ms en llegar a la última o si
+cada conexión retiene más de --maximo-kb.
+
+Mide el broker y el flujo de cada conexión, no el servidor ASGI: sumar lo que
+éste retenga por socket. Los eventos se leen de otra conexión a la base, así
+que el menú sintético se commitea y se borra al terminar.
+
+Uso (desde backend/):
+    python scripts/bench_eventos.py
+    python scripts/bench_eventos.py --conexiones 20000
+    EVENTOS_BROKER=carta_restaurantes.eventos.BrokerEnProceso python scripts/bench_eventos.py
+"""
+import asyncio
+import time
+import tracemalloc
+
+import entorno  # noqa: F401 (configura Django)
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from carta_restaurantes import eventos
+from carta_restaurantes.datos_sinteticos import crear_menu_sintetico
+from carta_restaurantes.models import Comida, VersionMenu
+
+
+class Benchmark(BaseCommand):
+    help = 'Mide memoria por conexión y latencia del fan-out de los eventos SSE del menú'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--conexiones', type=int, default=5000)
+        parser.add_argument('--maximo-ms', type=float, default=500.0)
+        parser.add_argument('--maximo-kb', type=float, default=8.0)
+
+    def handle(self, *args, **options):
+        restaurante = crear_menu_sintetico('bench-eventos', 20)
+        try:
+            memoria, latencias = asyncio.run(self.medir(restaurante.id, options['conexiones']))
+        finally:
+            propietario = restaurante.propietario
+            restaurante.delete()
+            propietario.delete()
+
+        latencias.sort()
+        kb = memoria / options['conexiones'] / 1024
+        self.stdout.write(
+            f'{eventos.obtener_broker().__class__.__name__}: {options["conexiones"]} conexiones, '
+            f'{kb:.2f} KB por conexión, evento en p50 {latencias[len(latencias) // 2]:.1f} ms, '
+            f'p95 {latencias[int(len(latencias) * 0.95)]:.1f} ms, última {latencias[-1]:.1f} ms'
+        )
+        if latencias[-1] > options['maximo_ms'] or kb > options['maximo_kb']:
+            raise CommandError(f'Supera el máximo de {options["maximo_ms"]} ms o {options["maximo_kb"]} KB por conexión')
+        self.stdout.write(self.style.SUCCESS('Fan-out dentro de los máximos'))
+
+    async def medir(self, restaurante_id, conexiones):
+        version = await VersionMenu.objects.filter(restaurante_id=restaurante_id).values_list('numero', flat=True).aget()
+        comida = await Comida.objects.filter(restaurante_id=restaurante_id).order_by('id').afirst()
+        recibidos = []
+
+        async def conexion():
+            async for parte in eventos.flujo(restaurante_id, version):
+                if b'event: menu' in parte:
+                    recibidos.append(time.perf_counter())
+                    return
+
+        tracemalloc.start()
+        antes = tracemalloc.get_traced_memory()[0]
+        tareas = [asyncio.create_task(conexion()) for _ in range(conexiones)]
+        while len(eventos.obtener_broker().suscriptores.get(restaurante_id, ())) < conexiones:
+            await asyncio.sleep(0.01)
+        memoria = tracemalloc.get_traced_memory()[0] - antes
+        tracemalloc.stop()
+
+        def agotar():
+            comida.disponible = not comida.disponible
+            comida.save()
+
+        inicio = time.perf_counter()
+        await sync_to_async(agotar)()
+        await asyncio.wait_for(asyncio.gather(*tareas), 30)
+        return memoria, [(recibido - inicio) * 1000 for recibido in recibidos]
+
+
+if __name__ == '__main__':
+    entorno.correr(Benchmark)
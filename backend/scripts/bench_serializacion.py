@@ -0,0 +1,112 @@
+"""
+Benchmark de serializacion_rapida contra los serializers de DRF.
+
+Crea un menú sintético (por defecto 5.000 comidas) dentro de una transacción
+que se descarta al final y compara filas por segundo de ambos caminos. Que
+los dos den los mismos bytes lo verifica
+carta_restaurantes/tests/test_serializacion.py.
+
+Uso (desde backend/):
+    python scripts/bench_serializacion.py
+    python scripts/bench_serializacion.py --comidas 20000 --repeticiones 5
+"""
+import time
+
+import entorno  # noqa: F401 (configura Django)
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+from carta_restaurantes import serializacion_rapida
+from carta_restaurantes.campos import acotar_queryset
+from carta_restaurantes.datos_sinteticos import crear_menu_sintetico
+from carta_restaurantes.models import Categoria, Subcategoria, Comida, Restaurante
+from carta_restaurantes.serializers import (
+    CategoriaSerializer, SubcategoriaSerializer, ComidaSerializer, MenuSerializer
+)
+
+
+class Benchmark(BaseCommand):
+    help = 'Compara serializacion_rapida contra los serializers de DRF (bytes y filas/segundo)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comidas', type=int, default=5000)
+        parser.add_argument('--repeticiones', type=int, default=3)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            restaurante = crear_menu_sintetico('bench-serializacion', options['comidas'])
+            self.comparar(restaurante, options['repeticiones'])
+            transaction.set_rollback(True)
+
+    def comparar(self, restaurante, repeticiones):
+        renderer = JSONRenderer()
+        comidas = Comida.objects.filter(restaurante=restaurante).order_by('orden', 'id')
+        categorias = Categoria.objects.filter(restaurante=restaurante).order_by('orden', 'nombre')
+        subcategorias = Subcategoria.objects.filter(restaurante=restaurante).order_by('orden', 'nombre')
+        menu_drf = Restaurante.objects.prefetch_related(
+            Prefetch('categorias', queryset=Categoria.objects.order_by('orden', 'nombre')),
+            Prefetch('categorias__subcategorias', queryset=Subcategoria.objects.order_by('orden', 'nombre')),
+            Prefetch(
+                'categorias__subcategorias__comida_set',
+                queryset=Comida.objects.filter(disponible=True).select_related('categoria').order_by('orden', 'id')
+            ),
+        )
+
+        campos = ('id', 'subcategoria_nombre', 'nombre', 'precio')
+        comidas_acotadas = acotar_queryset(
+            comidas, serializacion_rapida.columnas(campos, serializacion_rapida.COLUMNAS_CAMPO_COMIDA)
+        )
+
+        casos = [
+            (
+                'comidas', comidas.count(),
+                lambda: ComidaSerializer(comidas.select_related('categoria', 'subcategoria'), many=True).data,
+                lambda: serializacion_rapida.comidas(comidas),
+            ),
+            (
+                'comidas?fields', comidas.count(),
+                lambda: ComidaSerializer(comidas_acotadas, many=True, campos=campos).data,
+                lambda: serializacion_rapida.comidas(comidas, campos),
+            ),
+            (
+                'subcategorias', subcategorias.count(),
+                lambda: SubcategoriaSerializer(subcategorias.select_related('categoria'), many=True).data,
+                lambda: serializacion_rapida.subcategorias(subcategorias),
+            ),
+            (
+                'categorias', categorias.count(),
+                lambda: CategoriaSerializer(categorias.prefetch_related('subcategorias'), many=True).data,
+                lambda: serializacion_rapida.categorias(categorias),
+            ),
+            (
+                'menu', comidas.filter(disponible=True, subcategoria__isnull=False).count(),
+                lambda: MenuSerializer(menu_drf.get(pk=restaurante.pk)).data,
+                lambda: serializacion_rapida.menu(restaurante),
+            ),
+        ]
+
+        for nombre, filas, drf, rapido in casos:
+            tiempo_drf = self.medir(lambda: renderer.render(drf()), repeticiones)
+            tiempo_rapido = self.medir(lambda: renderer.render(rapido()), repeticiones)
+            self.stdout.write(
+                f'{nombre:<14} {filas:>6} filas  '
+                f'DRF {filas / tiempo_drf:>10,.0f} filas/s  '
+                f'rápido {filas / tiempo_rapido:>10,.0f} filas/s  '
+                f'x{tiempo_drf / tiempo_rapido:.1f}'
+            )
+
+    @staticmethod
+    def medir(funcion, repeticiones):
+        """Mejor tiempo de `repeticiones` corridas."""
+        mejor = None
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion()
+            duracion = time.perf_counter() - inicio
+            mejor = duracion if mejor is None else min(mejor, duracion)
+        return mejor
+
+
+if __name__ == '__main__':
+    entorno.correr(Benchmark)
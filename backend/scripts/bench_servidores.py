@@ -0,0 +1,178 @@
+"""
+Benchmark de los dos servidores sobre el mismo equipo: WSGI con waitress
+(wsgi.py, proceso web del Procfile) contra ASGI con uvicorn (asgi.py con
+VISTAS_ASYNC=True: toda la API servida por ASGI, con las vistas públicas async).
+
+Levanta cada servidor como subproceso en un puerto libre, con DEBUG=False y
+un solo proceso (waitress con --hilos hilos, uvicorn con un event loop), y
+le abre --conexiones conexiones keep-alive concurrentes que piden --url en
+bucle durante --duracion segundos. Informa requests por segundo y latencia
+p50/p99 de cada nivel de concurrencia.
+
+El generador de carga corre en este proceso: en equipos chicos también
+compite por CPU, así que sirve para comparar los servidores entre sí y no
+como techo absoluto.
+
+Uso (desde backend/):
+    python scripts/bench_servidores.py
+    python scripts/bench_servidores.py --conexiones 10,200,1000 --duracion 10
+    python scripts/bench_servidores.py --url "/api/comidas/?restaurante=pizzeria-mario"
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import entorno  # noqa: F401 (configura Django)
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from carta_restaurantes.models import Restaurante
+
+
+def puerto_libre():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def leer_respuesta(reader):
+    """Status de una respuesta HTTP/1.1, leída entera (Content-Length o chunked)."""
+    cabeceras = await reader.readuntil(b'\r\n\r\n')
+    lineas = cabeceras.decode('latin-1').split('\r\n')
+    status = int(lineas[0].split(' ', 2)[1])
+    valores = {}
+    for linea in lineas[1:]:
+        nombre, _, valor = linea.partition(':')
+        valores[nombre.strip().lower()] = valor.strip()
+    if valores.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            largo = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            await reader.readexactly(largo + 2)
+            if largo == 0:
+                break
+    elif 'content-length' in valores:
+        await reader.readexactly(int(valores['content-length']))
+    return status
+
+
+async def cliente(puerto, url, hasta, latencias, errores):
+    pedido = f'GET {url} HTTP/1.1\r\nHost: localhost\r\nAccept-Encoding: gzip\r\n\r\n'.encode()
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', puerto)
+    except OSError:
+        errores.append('conexión')
+        return
+    try:
+        while time.perf_counter() < hasta:
+            inicio = time.perf_counter()
+            writer.write(pedido)
+            status = await leer_respuesta(reader)
+            if status != 200:
+                errores.append(status)
+            latencias.append(time.perf_counter() - inicio)
+    except (OSError, asyncio.IncompleteReadError):
+        errores.append('cortada')
+    finally:
+        writer.close()
+
+
+async def carga(puerto, url, conexiones, duracion):
+    latencias, errores = [], []
+    inicio = time.perf_counter()
+    await asyncio.gather(*[
+        cliente(puerto, url, inicio + duracion, latencias, errores) for _ in range(conexiones)
+    ])
+    return latencias, errores, time.perf_counter() - inicio
+
+
+class Benchmark(BaseCommand):
+    help = 'Compara throughput y latencia de WSGI/waitress contra ASGI/uvicorn con conexiones concurrentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Por defecto, /api/menu/ del primer restaurante activo')
+        parser.add_argument('--conexiones', default='10,100,500', help='Niveles de concurrencia, separados por coma')
+        parser.add_argument('--duracion', type=float, default=5.0, help='Segundos por nivel')
+        parser.add_argument('--hilos', type=int, default=4, help='Hilos de waitress (su valor por defecto)')
+
+    def handle(self, *args, **options):
+        for modulo in ('waitress', 'uvicorn'):
+            try:
+                __import__(modulo)
+            except ImportError:
+                raise CommandError(f'Falta {modulo}: pip install -r requirements.txt')
+
+        url = options['url']
+        if url is None:
+            slug = Restaurante.objects.filter(activo=True).order_by('id').values_list('slug', flat=True).first()
+            if slug is None:
+                raise CommandError('No hay restaurantes activos: indicar --url')
+            url = f'/api/menu/?restaurante={slug}'
+        niveles = [int(nivel) for nivel in options['conexiones'].split(',')]
+
+        servidores = [
+            ('waitress (WSGI)', {}, lambda puerto: [
+                '-m', 'waitress', f'--listen=127.0.0.1:{puerto}', f'--threads={options["hilos"]}',
+                'carta_restaurantes.wsgi:application',
+            ]),
+            ('uvicorn (ASGI)', {'VISTAS_ASYNC': 'True'}, lambda puerto: [
+                '-m', 'uvicorn', '--host', '127.0.0.1', '--port', str(puerto), '--no-access-log',
+                '--log-level', 'warning', 'carta_restaurantes.asgi:application',
+            ]),
+        ]
+        self.stdout.write(f'{url}, {options["duracion"]:.0f} s por nivel')
+        for nombre, entorno_servidor, argumentos in servidores:
+            puerto = puerto_libre()
+            # El log a un archivo y no a un pipe: waitress avisa cada request encolado y llenaría el pipe
+            with tempfile.TemporaryFile() as log:
+                proceso = subprocess.Popen(
+                    [sys.executable, *argumentos(puerto)], cwd=settings.BASE_DIR,
+                    env={**os.environ, 'DEBUG': 'False', **entorno_servidor}, stdout=log, stderr=subprocess.STDOUT,
+                )
+                try:
+                    self.esperar(proceso, log, puerto, url, nombre)
+                    for conexiones in niveles:
+                        latencias, errores, segundos = asyncio.run(carga(puerto, url, conexiones, options['duracion']))
+                        self.informar(nombre, conexiones, latencias, errores, segundos)
+                finally:
+                    proceso.terminate()
+                    proceso.wait(10)
+
+    def esperar(self, proceso, log, puerto, url, nombre):
+        """Espera a que el servidor responda 200 en `url` (y calienta los caches del proceso)."""
+        limite = time.monotonic() + 30
+        while time.monotonic() < limite:
+            if proceso.poll() is not None:
+                log.seek(0)
+                raise CommandError(f'{nombre} terminó al arrancar:\n{log.read().decode()}')
+            try:
+                latencias, errores, _ = asyncio.run(carga(puerto, url, 1, 0.2))
+            except OSError:
+                latencias, errores = [], ['conexión']
+            if latencias and not errores:
+                return
+            if errores and errores[0] not in ('conexión', 'cortada'):
+                raise CommandError(f'{nombre}: {url} responde {errores[0]}')
+            time.sleep(0.2)
+        raise CommandError(f'{nombre} no respondió en 30 s')
+
+    def informar(self, nombre, conexiones, latencias, errores, segundos):
+        if not latencias:
+            self.stdout.write(self.style.ERROR(f'{nombre:<16} {conexiones:>5} conexiones: sin respuestas ({len(errores)} errores)'))
+            return
+        latencias.sort()
+        p50 = latencias[len(latencias) // 2] * 1000
+        p99 = latencias[min(int(len(latencias) * 0.99), len(latencias) - 1)] * 1000
+        linea = (
+            f'{nombre:<16} {conexiones:>5} conexiones: {len(latencias) / segundos:8.0f} req/s  '
+            f'p50 {p50:7.1f} ms  p99 {p99:7.1f} ms'
+        )
+        if errores:
+            linea += f'  {len(errores)} errores'
+        self.stdout.write(linea)
+
+
+if __name__ == '__main__':
+    entorno.correr(Benchmark)
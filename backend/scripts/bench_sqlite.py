@@ -0,0 +1,217 @@
+"""
+Prueba de concurrencia de SQLite con varios workers (ver SQLITE_WAL y
+SQLITE_PRAGMAS en settings.py).
+
+Copia la base a un archivo temporal, le agrega un menú sintético y mide la
+latencia de --lectores procesos que piden el menú público en bucle: primero
+solos y después mientras --escritores procesos reordenan categorías,
+subcategorías y comidas por los endpoints del admin (lo que hace el dueño
+al arrastrar). Cada proceso tiene su propia conexión, como cada worker de
+gunicorn.
+
+Corre dos veces sobre copias iguales: con la configuración de settings.py
+en modo WAL (como la usan los servidores, con SQLITE_WAL=True) y sin ella
+(journal rollback, timeout de 5 s de sqlite3), para comparar. Falla si con
+la configuración hay errores o si la p99 de las lecturas con escrituras
+supera --maximo (3 por defecto) veces la p99 sin ellas. Es un control de
+regresiones: pasar no quiere decir que la latencia no cambie con
+escrituras, solo que no llega a triplicarse.
+
+No lo corren los tests y no muestra un beneficio medible de los ajustes: en
+un equipo chico lectores y escritores además compiten por CPU, y las dos
+corridas quedan dentro del ruido (p99 con escrituras de x1.1 a x2.3 de la
+p99 sin ellas, con y sin ajustes).
+
+Uso (desde backend/):
+    python scripts/bench_sqlite.py
+    python scripts/bench_sqlite.py --lectores 3 --escritores 2 --duracion 10
+"""
+import multiprocessing
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import entorno  # noqa: F401 (configura Django)
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+from carta_restaurantes.datos_sinteticos import SIN_CACHE, crear_menu_sintetico
+from carta_restaurantes.models import Categoria, Comida, Subcategoria
+from carta_restaurantes.snapshots import reconstruir_snapshots
+
+
+class Benchmark(BaseCommand):
+    help = 'Mide la latencia de las lecturas de SQLite mientras los endpoints de reordenamiento escriben'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lectores', type=int, default=3, help='Procesos lectores (los workers de gunicorn.conf.py)')
+        parser.add_argument('--escritores', type=int, default=1)
+        parser.add_argument('--duracion', type=float, default=5.0, help='Segundos de cada fase')
+        parser.add_argument('--comidas', type=int, default=200)
+        parser.add_argument('--maximo', type=float, default=3.0, help='p99 con escrituras / p99 sin escrituras')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('La base configurada no es SQLite')
+        configuracion = connection.settings_dict
+        original, opciones = configuracion['NAME'], configuracion['OPTIONS']
+        pragmas = {**settings.SQLITE_PRAGMAS_WAL, **settings.SQLITE_PRAGMAS}
+        configurada = {**opciones, 'init_command': ';'.join(f'PRAGMA {pragma}={valor}' for pragma, valor in pragmas.items())}
+        connections.close_all()
+
+        resultados = {}
+        try:
+            with tempfile.TemporaryDirectory() as directorio, override_settings(ALLOWED_HOSTS=['*'], CACHES=SIN_CACHE):
+                for modo, opciones_modo in (('configurada', configurada), ('sin ajustes', {})):
+                    copia = Path(directorio) / f'{modo.replace(" ", "_")}.sqlite3'
+                    self.copiar(original, copia, wal=opciones_modo is configurada)
+                    # Los procesos abren sus conexiones con esta configuración
+                    configuracion.update(NAME=copia, OPTIONS=opciones_modo)
+                    try:
+                        resultados[modo] = self.medir(options)
+                    finally:
+                        connections.close_all()
+        finally:
+            configuracion.update(NAME=original, OPTIONS=opciones)
+
+        for modo, fases in resultados.items():
+            for fase, (latencias, errores, escrituras) in fases.items():
+                self.informar(modo, fase, latencias, errores, escrituras)
+
+        solo, con_escrituras = resultados['configurada']['solo lecturas'], resultados['configurada']['con escrituras']
+        errores = len(solo[1]) + len(con_escrituras[1])
+        if errores:
+            raise CommandError(f'{errores} errores con la configuración de settings.py: {con_escrituras[1][:3]}')
+        proporciones = {modo: self.proporcion(fases) for modo, fases in resultados.items()}
+        self.stdout.write('p99 con escrituras / p99 sin escrituras: ' + ', '.join(
+            f'{modo} x{proporcion:.1f}' for modo, proporcion in proporciones.items()
+        ))
+        if proporciones['configurada'] > options['maximo']:
+            raise CommandError(f'La p99 de las lecturas crece {proporciones["configurada"]:.1f} veces con escrituras')
+        self.stdout.write(self.style.SUCCESS(f'Sin errores; p99 de las lecturas por debajo de x{options["maximo"]:.1f} con escrituras'))
+
+    def proporcion(self, fases):
+        solo, con_escrituras = fases['solo lecturas'][0], fases['con escrituras'][0]
+        if not solo or not con_escrituras:
+            return float('inf')
+        return self.p99(con_escrituras) / self.p99(solo)
+
+    @staticmethod
+    def copiar(original, copia, wal):
+        origen, destino = sqlite3.connect(original), sqlite3.connect(copia)
+        try:
+            origen.backup(destino)
+            destino.execute(f'PRAGMA journal_mode={"WAL" if wal else "DELETE"}')
+        finally:
+            origen.close()
+            destino.close()
+
+    def medir(self, options):
+        """
+        Returns:
+            dict {fase: (latencias de lectura en s, errores, escrituras)}
+        """
+        restaurante = crear_menu_sintetico('bench-sqlite', options['comidas'])
+        reconstruir_snapshots(restaurante.id)
+        token = Token.objects.create(user=restaurante.propietario)
+        publico = f'?restaurante={restaurante.slug}'
+        urls = [f'/api/menu/{publico}', f'/api/comidas/{publico}', f'/api/comidas/{publico}&fields=id,nombre,precio']
+        reordenamientos = [
+            ('/api/admin/categorias/orden/', list(Categoria.objects.filter(restaurante=restaurante).values_list('id', flat=True))),
+            ('/api/admin/subcategorias/orden/', list(Subcategoria.objects.filter(restaurante=restaurante).values_list('id', flat=True))),
+            ('/api/admin/comidas/orden/', list(Comida.objects.filter(restaurante=restaurante).values_list('id', flat=True)[:50])),
+        ]
+        connections.close_all()
+
+        # fork: cada proceso hereda Django ya configurado, sin conexiones abiertas
+        contexto = multiprocessing.get_context('fork')
+        fases = {}
+        for fase, escritores in (('solo lecturas', 0), ('con escrituras', options['escritores'])):
+            cola = contexto.Queue()
+            hasta = time.time() + options['duracion']
+            procesos = [
+                contexto.Process(target=self.leer, args=(urls, hasta, cola))
+                for _ in range(options['lectores'])
+            ] + [
+                contexto.Process(target=self.escribir, args=(token.key, reordenamientos, hasta, cola))
+                for _ in range(escritores)
+            ]
+            for proceso in procesos:
+                proceso.start()
+            latencias, errores, escrituras = [], [], 0
+            for _ in procesos:
+                latencias_proceso, errores_proceso, escrituras_proceso = cola.get()
+                latencias += latencias_proceso
+                errores += errores_proceso
+                escrituras += escrituras_proceso
+            for proceso in procesos:
+                proceso.join()
+            fases[fase] = (latencias, errores, escrituras)
+        return fases
+
+    @staticmethod
+    def leer(urls, hasta, cola):
+        cliente = Client()
+        latencias, errores = [], []
+        while time.time() < hasta:
+            inicio = time.perf_counter()
+            try:
+                response = cliente.get(random.choice(urls))
+            except OperationalError as error:
+                errores.append(str(error))
+                continue
+            latencias.append(time.perf_counter() - inicio)
+            if response.status_code != 200:
+                errores.append(f'lectura: status {response.status_code}')
+        cola.put((latencias, errores, 0))
+
+    @staticmethod
+    def escribir(token, reordenamientos, hasta, cola):
+        cliente = Client(HTTP_AUTHORIZATION=f'Token {token}')
+        errores, escrituras = [], 0
+        while time.time() < hasta:
+            url, ids = random.choice(reordenamientos)
+            orden = random.sample(range(len(ids)), len(ids))
+            try:
+                response = cliente.post(
+                    url, {'orders': [{'id': id_, 'orden': n} for id_, n in zip(ids, orden)]},
+                    content_type='application/json',
+                )
+            except OperationalError as error:
+                errores.append(str(error))
+                continue
+            if response.status_code == 200:
+                escrituras += 1
+            else:
+                # Los endpoints de reordenamiento devuelven el error de la base como 400
+                errores.append(f'escritura: {response.status_code} {response.json().get("error")}')
+        cola.put(([], errores, escrituras))
+
+    @staticmethod
+    def p99(latencias):
+        latencias = sorted(latencias)
+        return latencias[min(int(len(latencias) * 0.99), len(latencias) - 1)]
+
+    def informar(self, modo, fase, latencias, errores, escrituras):
+        if not latencias:
+            self.stdout.write(self.style.ERROR(f'{modo:<12} {fase:<15} sin lecturas ({len(errores)} errores)'))
+            return
+        latencias = sorted(latencias)
+        linea = (
+            f'{modo:<12} {fase:<15} {len(latencias):>6} lecturas  p50 {latencias[len(latencias) // 2] * 1000:6.1f} ms  '
+            f'p99 {self.p99(latencias) * 1000:7.1f} ms  máx {latencias[-1] * 1000:7.1f} ms'
+        )
+        if escrituras:
+            linea += f'  {escrituras} escrituras'
+        if errores:
+            linea += f'  {len(errores)} errores'
+        self.stdout.write(linea)
+
+
+if __name__ == '__main__':
+    entorno.correr(Benchmark)
@@ -0,0 +1,27 @@
+"""
+Entorno - Configuración de Django para los scripts de benchmark y de verificación
+de esta carpeta
+
+Se importa antes que cualquier módulo de carta_restaurantes:
+
+    import entorno  # noqa: F401 (configura Django)
+
+Los scripts se corren desde backend/, como manage.py:
+
+    python scripts/bench_serializacion.py --comidas 20000
+"""
+import os
+import sys
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'carta_restaurantes.settings')
+django.setup()
+
+
+def correr(comando):
+    """Corre un BaseCommand con los argumentos de la línea de comandos (--help, --verbosity, etc.)."""
+    nombre = Path(sys.argv[0]).stem
+    comando().run_from_argv([sys.argv[0], nombre, *sys.argv[1:]])
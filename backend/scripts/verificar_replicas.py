@@ -0,0 +1,140 @@
+"""
+Verificación del ruteo a réplicas (ver replicas.py).
+
+Recorre con el test client los endpoints de un restaurante y cuenta las
+queries de cada base:
+- los públicos no tocan la primaria (`default`);
+- los del admin no tocan las réplicas;
+- después de que el dueño guarda un cambio, las lecturas públicas de ese
+  restaurante van a la primaria durante REPLICAS_PEGAJOSO_SEGUNDOS, para
+  cualquier cliente (sin cookies ni credenciales), y después vuelven a las
+  réplicas.
+
+Las réplicas tienen que tener los datos del restaurante: localmente alcanza
+con una copia del archivo SQLite. Lo que escribe el script (el token del
+dueño y el cambio de una comida) se descarta al final; los avisos de
+on_commit del cambio se corren dentro de esa transacción.
+
+Uso (desde backend/):
+    cp db.sqlite3 replica.sqlite3
+    DATABASE_REPLICAS=replica.sqlite3 python scripts/verificar_replicas.py
+    DATABASE_REPLICAS=postgres://localhost/carta_replica python scripts/verificar_replicas.py --restaurante pizzeria-mario
+"""
+import time
+from contextlib import ExitStack
+
+import entorno  # noqa: F401 (configura Django)
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.models import Token
+from carta_restaurantes import cache_por_restaurante, restaurantes_cache
+from carta_restaurantes.datos_sinteticos import CACHE_LOCAL, urls_de_verificacion
+from carta_restaurantes.models import Comida, Restaurante
+
+
+class Verificacion(BaseCommand):
+    help = 'Verifica que las vistas públicas lean de las réplicas y el admin de la primaria'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurante', help='Slug; por defecto, el primer restaurante activo con comidas')
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('No hay réplicas configuradas: definir DATABASE_REPLICAS (ver settings.py)')
+        restaurante = self.restaurante(options['restaurante'])
+        urls = urls_de_verificacion(restaurante)
+        errores = []
+
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['*'], CACHES=CACHE_LOCAL):
+            token, _ = Token.objects.get_or_create(user=restaurante.propietario)
+            admin = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+            self.stdout.write('Públicos, sin cambios recientes')
+            errores += self.recorrer(Client(), restaurante, urls['publico'], prohibida='default')
+            self.stdout.write('Admin')
+            errores += self.recorrer(admin, restaurante, urls['admin'], prohibida='replicas')
+
+            comida = Comida.objects.filter(restaurante=restaurante).order_by('id').first()
+            with TestCase.captureOnCommitCallbacks(execute=True):
+                response = admin.patch(
+                    f'/api/admin/comidas/{comida.id}/', {'disponible': not comida.disponible},
+                    content_type='application/json',
+                )
+            if response.status_code != 200:
+                raise CommandError(f'PATCH de la comida {comida.id}: status {response.status_code}')
+
+            self.stdout.write('Públicos, recién cambiado (cliente sin cookies)')
+            errores += self.recorrer(Client(), restaurante, urls['publico'], prohibida='replicas', resolucion_en_replica=True)
+            time.sleep(settings.REPLICAS_PEGAJOSO_SEGUNDOS)
+            self.stdout.write(f'Públicos, {settings.REPLICAS_PEGAJOSO_SEGUNDOS} s después')
+            errores += self.recorrer(Client(), restaurante, urls['publico'], prohibida='default')
+            transaction.set_rollback(True)
+
+        if errores:
+            for error in errores:
+                self.stdout.write(self.style.ERROR(error))
+            raise CommandError(f'{len(errores)} error(es) de ruteo')
+        self.stdout.write(self.style.SUCCESS(
+            f'Ruteo correcto: públicos en {", ".join(settings.DATABASE_REPLICAS)}, admin y lectura de lo propio en default'
+        ))
+
+    @staticmethod
+    def restaurante(slug):
+        restaurantes = Restaurante.objects.filter(activo=True).select_related('propietario')
+        if slug:
+            restaurantes = restaurantes.filter(slug=slug)
+        else:
+            restaurantes = restaurantes.filter(
+                comidas__subcategoria__isnull=False, comidas__disponible=True
+            ).order_by('id').distinct()
+        restaurante = restaurantes.first()
+        if restaurante is None:
+            raise CommandError('No hay un restaurante activo con comidas para recorrer')
+        return restaurante
+
+    def recorrer(self, cliente, restaurante, urls, prohibida, resolucion_en_replica=False):
+        """
+        Pide cada URL contando las queries de cada base.
+
+        Args:
+            prohibida: 'default' o 'replicas', las bases que no deben recibir queries
+            resolucion_en_replica: no cuenta las queries a las réplicas sobre la tabla de
+                restaurantes: la resolución del slug es la que dice si el restaurante cambió
+
+        Returns:
+            lista de errores
+        """
+        errores = []
+        for url in urls:
+            # Sin el cache del slug ni el de respuestas: la resolución y las lecturas también se cuentan
+            restaurantes_cache.limpiar()
+            cache_por_restaurante.invalidar(restaurante.id)
+            with ExitStack() as pila:
+                capturas = {
+                    alias: pila.enter_context(CaptureQueriesContext(connections[alias]))
+                    for alias in ['default', *settings.DATABASE_REPLICAS]
+                }
+                response = cliente.get(url)
+            if response.status_code != 200:
+                errores.append(f'{url}: status {response.status_code}')
+                continue
+            por_base = {alias: len(captura) for alias, captura in capturas.items()}
+            en_replicas = sum(
+                1 for alias, captura in capturas.items() if alias != 'default' for query in captura
+                if not (resolucion_en_replica and f'FROM "{Restaurante._meta.db_table}"' in query['sql'])
+            )
+            mal = por_base['default'] if prohibida == 'default' else en_replicas
+            linea = f'  {url:<70} ' + '  '.join(f'{alias} {cantidad:>2}' for alias, cantidad in por_base.items())
+            if mal:
+                errores.append(f'{url}: {mal} queries en {prohibida}')
+                self.stdout.write(self.style.ERROR(f'{linea}  mal'))
+            else:
+                self.stdout.write(f'{linea}  ok')
+        return errores
+
+
+if __name__ == '__main__':
+    entorno.correr(Verificacion)
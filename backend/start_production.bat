@@ -13,4 +13,6 @@ python manage.py collectstatic --noinput
 
 echo Iniciando servidor con Waitress en puerto 8000...
 echo Accede a: http://localhost:8000
+set DATABASE_AUTOTEST=True
+set SQLITE_WAL=True
 waitress-serve --host=0.0.0.0 --port=8000 carta_restaurantes.wsgi:application
\ No newline at end of file
@@ -14,4 +14,6 @@ python manage.py collectstatic --noinput
 
 Write-Host "Iniciando servidor con Waitress en puerto 8000..." -ForegroundColor Green
 Write-Host "Accede a: http://localhost:8000" -ForegroundColor Yellow
+$env:DATABASE_AUTOTEST = "True"
+$env:SQLITE_WAL = "True"
 waitress-serve --host=0.0.0.0 --port=8000 carta_restaurantes.wsgi:application
\ No newline at end of file
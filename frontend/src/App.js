@@ -33,44 +33,29 @@ function App() {
     document.body.style.fontFamily = "'Montserrat', sans-serif";
   }, []);
 
-  // Cargar categorías cuando tengamos el slug del restaurante
+  // Cargar el menú completo (categorías → subcategorías → comidas) en una sola petición
   useEffect(() => {
     if (restauranteSlug) {
-      fetch(`${API_BASE}/api/categorias/?restaurante=${restauranteSlug}`)
+      fetch(`${API_BASE}/api/menu/?restaurante=${restauranteSlug}`)
         .then(res => res.json())
         .then(data => {
-          setCategorias(data);
-          console.log('Categorías cargadas para', restauranteSlug, ':', data);
+          setCategorias(data.categorias || []);
+          console.log('Menú cargado para', restauranteSlug, ':', data);
         })
         .catch(error => {
-          console.error('Error cargando categorías:', error);
+          console.error('Error cargando menú:', error);
           setCategorias([]);
         });
     }
   }, [restauranteSlug, API_BASE]);
 
-  // Cargar subcategorías y sus comidas cuando se selecciona una categoría
+  // Las subcategorías y sus comidas ya vienen en el menú: no hace falta pedirlas
   useEffect(() => {
-    if (categoriaSeleccionada && restauranteSlug) {
-      // Primero obtenemos las subcategorías
-      fetch(`${API_BASE}/api/categorias/${categoriaSeleccionada}/subcategorias/?restaurante=${restauranteSlug}`)
-        .then(res => res.json())
-        .then(async (subcategorias) => {
-          // Para cada subcategoría, obtenemos sus comidas
-          const subcategoriasConComidas = await Promise.all(
-            subcategorias.map(async (subcategoria) => {
-              const comidasResponse = await fetch(`${API_BASE}/api/subcategorias/${subcategoria.id}/comidas/?restaurante=${restauranteSlug}`);
-              const comidas = await comidasResponse.json();
-              return {
-                ...subcategoria,
-                comidas: comidas
-              };
-            })
-          );
-          setSubcategoriasConComidas(subcategoriasConComidas);
-        });
+    if (categoriaSeleccionada) {
+      const categoria = categorias.find(cat => cat.id === categoriaSeleccionada);
+      setSubcategoriasConComidas(categoria ? categoria.subcategorias : []);
     }
-  }, [categoriaSeleccionada]);
+  }, [categoriaSeleccionada, categorias]);
 
   const volverACategorias = () => {
     setCategoriaSeleccionada(null);